@@ -0,0 +1,97 @@
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+
+
+class AnalysisResults:
+    """
+    Per-building outputs of an analysis, one NumPy array per output field.
+
+    The arrays are aligned with the rows of the inventory the analysis ran on, which
+    is kept by reference and never modified.  The results are only joined to the
+    inventory when exported with `to_dataframe` or `to_csv`.
+    """
+
+    def __init__(
+        self,
+        inventory: pd.DataFrame,
+        columns: Dict[str, np.ndarray],
+        float_dtype: Optional[np.dtype] = None,
+        original_order: Optional[np.ndarray] = None,
+    ):
+        """
+        Initializes an AnalysisResults object.
+
+        Args:
+            inventory (pd.DataFrame): The building rows the results are aligned with.
+            columns (Dict[str, np.ndarray]): Output arrays keyed by field name.
+            float_dtype (np.dtype, optional): Float dtype the float outputs are stored
+                in, e.g. float32 to halve their memory.  None keeps their dtypes.
+            original_order (np.ndarray, optional): Input position of each row, as set
+                by `AbstractBuildingPoints.spatial_sort`.  Exports are put back in
+                input order.
+        """
+        self.inventory = inventory
+        self.original_order = original_order
+        self._columns: Dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if len(values) != len(inventory):
+                raise ValueError(f"Result '{name}' has {len(values)} rows, expected {len(inventory)}.")
+            if float_dtype is not None and values.dtype.kind == "f":
+                values = values.astype(float_dtype, copy=False)
+            self._columns[name] = values
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the output fields, in the order they were computed."""
+        return list(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the output arrays."""
+        return sum(values.nbytes for values in self._columns.values())
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self.inventory)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the outputs alone as a DataFrame indexed like the inventory."""
+        return self._in_original_order(pd.DataFrame(self._columns, index=self.inventory.index))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns a new DataFrame of the inventory joined with the outputs.
+
+        Outputs replace inventory columns of the same name; the inventory itself is
+        left untouched.
+        """
+        outputs = pd.DataFrame(self._columns, index=self.inventory.index)
+        kept = self.inventory.drop(
+            columns=[name for name in self._columns if name in self.inventory.columns]
+        )
+        return self._in_original_order(pd.concat([kept, outputs], axis=1))
+
+    def to_csv(self, path: str, index: bool = False) -> None:
+        """
+        Writes the inventory joined with the outputs to a CSV file.
+
+        Args:
+            path (str): Output file.
+            index (bool): Whether to write the index.
+        """
+        self.to_dataframe().to_csv(path, index=index)
+
+    def _in_original_order(self, frame: pd.DataFrame) -> pd.DataFrame:
+        if self.original_order is None:
+            return frame
+        return frame.iloc[np.argsort(self.original_order)]
@@ -0,0 +1,211 @@
+from typing import Any, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from fortis.engine.analyses.scenario_runner import ScenarioRunner
+from fortis.engine.models.abstract_flood_depth_grid import AbstractFloodDepthGrid
+
+# Loss assumed beyond the rarest scenario: none, or the rarest scenario's loss down to
+# an exceedance probability of 0.
+TAIL_MODES = ("truncate", "constant")
+
+
+class AnnualLoss:
+    """
+    Average annual loss (AAL) and loss exceedance curves, accumulated one scenario at a
+    time.
+
+    Scenarios are added in order of increasing return period, each as one loss per
+    building.  The AAL is the trapezoidal integral of loss over annual exceedance
+    probability (1 / return period), accumulated per building and per aggregation
+    unit as each scenario arrives, so only the previous scenario's losses are kept
+    rather than the buildings x scenarios matrix.  Per-unit and portfolio losses are
+    kept for every scenario to give their exceedance curves.  Missing (NaN) losses
+    count as 0.
+    """
+
+    def __init__(
+        self,
+        n_buildings: int,
+        units: Optional[Sequence] = None,
+        tail: str = "truncate",
+        zero_loss_probability: Optional[float] = None,
+    ):
+        """
+        Initializes an AnnualLoss object.
+
+        Args:
+            n_buildings (int): Number of buildings in every loss array.
+            units (Sequence, optional): Aggregation unit of each building, e.g. a
+                census block or county.  Buildings with a missing unit count towards
+                the portfolio only.
+            tail (str): "truncate" or "constant", see `TAIL_MODES`.
+            zero_loss_probability (float, optional): Exceedance probability at which
+                losses are 0, e.g. 1.0.  Losses are interpolated linearly from 0 there
+                to the most frequent scenario.  By default the integral starts at the
+                most frequent scenario.
+        """
+        if tail not in TAIL_MODES:
+            raise ValueError(f"tail must be one of {TAIL_MODES}.")
+        if zero_loss_probability is not None and not 0 < zero_loss_probability <= 1:
+            raise ValueError("zero_loss_probability must be in (0, 1].")
+        if units is not None and len(units) != n_buildings:
+            raise ValueError("units must have one entry per building.")
+        self.n_buildings = n_buildings
+        self.tail = tail
+        self.zero_loss_probability = zero_loss_probability
+
+        if units is None:
+            self.unit_codes = np.full(n_buildings, -1, dtype=np.intp)
+            self.unit_labels = pd.Index([])
+        else:
+            codes, self.unit_labels = pd.factorize(pd.Series(units))
+            self.unit_codes = codes.astype(np.intp)
+
+        self.return_periods: List[float] = []
+        # Per-unit and portfolio loss of every scenario, for the exceedance curves.
+        self._unit_losses: List[np.ndarray] = []
+        self._portfolio_losses: List[float] = []
+        # Integrals up to the latest scenario, and that scenario's losses.
+        self._building_aal = np.zeros(n_buildings)
+        self._unit_aal = np.zeros(len(self.unit_labels))
+        self._previous: Optional[np.ndarray] = None
+
+    def add(self, return_period: float, losses: np.ndarray) -> None:
+        """
+        Adds the losses of the next scenario.
+
+        Args:
+            return_period (float): Return period (years) of the scenario, greater than
+                that of the previous scenario.
+            losses (np.ndarray): Loss of each building.
+        """
+        losses = np.nan_to_num(np.asarray(losses, dtype=float))
+        if losses.shape != (self.n_buildings,):
+            raise ValueError(f"losses must have {self.n_buildings} entries.")
+        if return_period <= 0:
+            raise ValueError("return_period must be positive.")
+        if self.return_periods and return_period <= self.return_periods[-1]:
+            raise ValueError("Scenarios must be added in order of increasing return period.")
+
+        unit_losses = self._by_unit(losses)
+        probability = 1.0 / return_period
+        if self._previous is not None:
+            width = 1.0 / self.return_periods[-1] - probability
+            self._building_aal += width * (self._previous + losses) / 2
+            self._unit_aal += width * (self._unit_losses[-1] + unit_losses) / 2
+        elif self.zero_loss_probability is not None:
+            if self.zero_loss_probability < probability:
+                raise ValueError("zero_loss_probability must be at least 1 / return_period.")
+            width = self.zero_loss_probability - probability
+            self._building_aal += width * losses / 2
+            self._unit_aal += width * unit_losses / 2
+
+        self.return_periods.append(float(return_period))
+        self._unit_losses.append(unit_losses)
+        self._portfolio_losses.append(float(losses.sum()))
+        self._previous = losses
+
+    def add_batch(self, return_periods: Sequence[float], losses: np.ndarray) -> None:
+        """
+        Adds consecutive scenarios from a (buildings x scenarios) block, e.g. a
+        batch from `ScenarioRunner.iter_batches`.
+
+        Args:
+            return_periods (Sequence[float]): Return period of each column.
+            losses (np.ndarray): Loss of each building in each scenario.
+        """
+        if losses.shape[1] != len(return_periods):
+            raise ValueError("losses must have one column per return period.")
+        for column, return_period in enumerate(return_periods):
+            self.add(return_period, losses[:, column])
+
+    @property
+    def building_aal(self) -> np.ndarray:
+        """Average annual loss of each building."""
+        return self._building_aal + self._tail(self._previous)
+
+    @property
+    def unit_aal(self) -> pd.Series:
+        """Average annual loss of each aggregation unit."""
+        last = self._unit_losses[-1] if self._unit_losses else None
+        return pd.Series(self._unit_aal + self._tail(last), index=self.unit_labels)
+
+    @property
+    def portfolio_aal(self) -> float:
+        """Average annual loss of all buildings."""
+        return float(self.building_aal.sum())
+
+    def ep_curve(self, unit: Any = None) -> pd.DataFrame:
+        """
+        Returns the loss of every scenario against its annual exceedance probability.
+
+        Args:
+            unit: An aggregation unit label.  Defaults to the whole portfolio.
+
+        Returns:
+            pd.DataFrame: Columns 'return_period', 'exceedance_probability' and 'loss',
+            by increasing return period.
+        """
+        if unit is None:
+            losses = self._portfolio_losses
+        else:
+            position = self.unit_labels.get_indexer([unit])[0]
+            if position < 0:
+                raise ValueError(f"Unknown aggregation unit: {unit}.")
+            losses = [unit_losses[position] for unit_losses in self._unit_losses]
+        return_periods = np.array(self.return_periods)
+        return pd.DataFrame(
+            {
+                "return_period": return_periods,
+                "exceedance_probability": 1.0 / return_periods,
+                "loss": np.array(losses, dtype=float),
+            }
+        )
+
+    def _by_unit(self, losses: np.ndarray) -> np.ndarray:
+        """Sums building losses by aggregation unit."""
+        assigned = self.unit_codes >= 0
+        return np.bincount(
+            self.unit_codes[assigned], weights=losses[assigned], minlength=len(self.unit_labels)
+        )
+
+    def _tail(self, last: Optional[np.ndarray]) -> Union[np.ndarray, float]:
+        """Returns the integral beyond the rarest scenario."""
+        if last is None or self.tail == "truncate":
+            return 0.0
+        return last / self.return_periods[-1]
+
+
+def scenario_annual_loss(
+    runner: ScenarioRunner,
+    depth_grids: Sequence[Union[AbstractFloodDepthGrid, str]],
+    return_periods: Sequence[float],
+    units: Optional[Sequence] = None,
+    output: str = "total_loss",
+    **kwargs,
+) -> AnnualLoss:
+    """
+    Runs return period scenarios batch by batch into an AnnualLoss.
+
+    Args:
+        runner (ScenarioRunner): Runner prepared for the buildings.
+        depth_grids (Sequence[Union[AbstractFloodDepthGrid, str]]): One depth grid or
+            raster path per return period, in any order.
+        return_periods (Sequence[float]): Return period (years) of each grid.
+        units (Sequence, optional): Aggregation unit of each building.
+        output (str): The loss output of the runner, see `SCENARIO_OUTPUTS`.
+        **kwargs: Passed to AnnualLoss (tail, zero_loss_probability).
+
+    Returns:
+        AnnualLoss: The accumulated AAL and exceedance curves.
+    """
+    if len(depth_grids) != len(return_periods):
+        raise ValueError("depth_grids must have one entry per return period.")
+    order = np.argsort(return_periods, kind="stable")
+    grids = [depth_grids[i] for i in order]
+    periods = [return_periods[i] for i in order]
+
+    annual_loss = AnnualLoss(len(runner), units, **kwargs)
+    for start, losses in runner.iter_batches(grids, output):
+        annual_loss.add_batch(periods[start : start + losses.shape[1]], losses)
+    return annual_loss
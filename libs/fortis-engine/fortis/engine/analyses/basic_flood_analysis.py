@@ -1,6 +1,9 @@
-import geopandas as gpd
+import pandas as pd
 from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
-from fortis.engine.models.abstract_flood_depth_grid import AbstractFloodDepthGrid
+from fortis.engine.models.abstract_flood_depth_grid import (
+    AbstractFloodDepthGrid,
+    building_depths_with_coverage,
+)
 from fortis.engine.vulnerability.abstract_vulnerability_function import (
     AbstractVulnerabilityFunction,
 )
@@ -44,11 +47,13 @@ class BasicFloodAnalysis:
         # Number of stories
         # Occupancy class
 
-        gdf: gpd.GeoDataFrame = self.buildings.gdf
+        gdf: pd.DataFrame = self.buildings.frame
         fields = self.buildings.fields
 
         # Apply the depth grid to the buildings
-        gdf[fields.flood_depth] = self.depth_grid.get_depth_vectorized(gdf.geometry)
+        gdf[fields.flood_depth], _ = building_depths_with_coverage(
+            self.depth_grid, self.buildings
+        )
 
         # Apply the vulnerability function to the buildings
         self.vulnerability_func.apply_damage_percentages(self.buildings)
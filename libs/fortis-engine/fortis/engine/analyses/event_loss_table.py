@@ -0,0 +1,342 @@
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from fortis.engine.analyses.result_writers import ResultWriter
+from fortis.engine.analyses.scenario_runner import ScenarioRunner
+from fortis.engine.models.abstract_flood_depth_grid import AbstractFloodDepthGrid
+
+EVENT_COLUMN = "event_id"
+BUILDING_COLUMN = "building"
+# Loss components stored for every wet building in every event.
+LOSS_COLUMNS = ("building_loss", "content_loss", "inventory_loss")
+# Pseudo column of the queries: the sum of the loss components.
+TOTAL = "total_loss"
+# Bumped whenever the layout of event loss tables changes.
+TABLE_VERSION = 1
+DEFAULT_ROW_GROUP_SIZE = 1_000_000
+
+
+class EventLossWriter(ResultWriter):
+    """
+    Writes a sparse event loss table: one row per (event, wet building) with the
+    building, content and inventory losses.
+
+    The table is a directory of row groups, one .npy file per column per group, and a
+    manifest.  Rows are buffered and written a row group at a time, and the manifest
+    is replaced after each group, so the table is readable up to the last group even
+    if the run is interrupted.  Read it with `EventLossTable`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        float_dtype: Any = "float32",
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        overwrite: bool = False,
+    ):
+        """
+        Initializes an EventLossWriter object.
+
+        Args:
+            path (str): Output directory.  It may be missing, empty, or hold an event
+                loss table, which is replaced.
+            float_dtype: Dtype the losses are stored in.
+            row_group_size (int): Rows buffered before a row group is written.
+            overwrite (bool): Delete whatever is at `path` instead of refusing paths
+                that do not hold an event loss table.
+        """
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be positive.")
+        if os.path.exists(path) and not overwrite and not _is_replaceable(path):
+            raise ValueError(
+                f"{path} exists and is not an event loss table; pass overwrite=True to replace it."
+            )
+        self.path = path
+        self.float_dtype = np.dtype(float_dtype)
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self._row_groups: List[int] = []
+        self._buffer: List[Dict[str, np.ndarray]] = []
+        self._buffered = 0
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        os.makedirs(path)
+        self._write_manifest()
+
+    def write(self, results: pd.DataFrame) -> None:
+        """
+        Appends rows with an event_id, building and loss component columns.
+
+        Missing loss components are stored as 0.
+
+        Args:
+            results (pd.DataFrame): The rows.
+        """
+        for column in (EVENT_COLUMN, BUILDING_COLUMN):
+            if column not in results.columns:
+                raise ValueError(f"Event losses need a '{column}' column.")
+        self.write_event_rows(
+            results[EVENT_COLUMN].to_numpy(),
+            results[BUILDING_COLUMN].to_numpy(),
+            {column: results[column].to_numpy() for column in LOSS_COLUMNS if column in results.columns},
+        )
+
+    def write_event(
+        self, event_id: int, buildings: np.ndarray, losses: Mapping[str, np.ndarray]
+    ) -> None:
+        """
+        Appends the losses of one event.
+
+        Args:
+            event_id (int): The event.
+            buildings (np.ndarray): Index of each wet building.
+            losses (Mapping[str, np.ndarray]): Loss components, aligned with `buildings`.
+        """
+        self.write_event_rows(np.full(len(buildings), event_id), buildings, losses)
+
+    def write_event_rows(
+        self, event_ids: np.ndarray, buildings: np.ndarray, losses: Mapping[str, np.ndarray]
+    ) -> None:
+        """
+        Appends rows given as arrays.
+
+        Args:
+            event_ids (np.ndarray): Integer event ID of each row.
+            buildings (np.ndarray): Building index of each row.
+            losses (Mapping[str, np.ndarray]): Loss components keyed by the names in
+                `LOSS_COLUMNS`.  Missing components are stored as 0.
+        """
+        unknown = set(losses) - set(LOSS_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown loss columns: {sorted(unknown)}.")
+        rows = {
+            EVENT_COLUMN: np.asarray(event_ids, dtype=np.int64),
+            BUILDING_COLUMN: np.asarray(buildings, dtype=np.int64),
+        }
+        for column in LOSS_COLUMNS:
+            values = losses.get(column)
+            rows[column] = (
+                np.zeros(len(rows[EVENT_COLUMN]), dtype=self.float_dtype)
+                if values is None
+                else np.nan_to_num(np.asarray(values, dtype=self.float_dtype))
+            )
+        if any(len(values) != len(rows[EVENT_COLUMN]) for values in rows.values()):
+            raise ValueError("All event loss columns must have the same length.")
+
+        self._buffer.append(rows)
+        self._buffered += len(rows[EVENT_COLUMN])
+        if self._buffered >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered rows as a row group."""
+        if self._buffered == 0:
+            return
+        group = len(self._row_groups)
+        for column in self.columns:
+            values = np.concatenate([rows[column] for rows in self._buffer])
+            np.save(os.path.join(self.path, f"{group:05d}.{column}.npy"), values)
+        self._row_groups.append(self._buffered)
+        self.rows_written += self._buffered
+        self._buffer = []
+        self._buffered = 0
+        self._write_manifest()
+
+    def close(self) -> None:
+        """Writes any buffered rows."""
+        self.flush()
+
+    @property
+    def columns(self) -> List[str]:
+        """The stored columns."""
+        return [EVENT_COLUMN, BUILDING_COLUMN, *LOSS_COLUMNS]
+
+    def _write_manifest(self) -> None:
+        """Replaces the manifest, so readers never see a partial one."""
+        manifest = {
+            "version": TABLE_VERSION,
+            "columns": self.columns,
+            "row_groups": self._row_groups,
+        }
+        partial = os.path.join(self.path, "manifest.json.partial")
+        with open(partial, "w", encoding="utf-8") as out:
+            json.dump(manifest, out)
+        os.replace(partial, os.path.join(self.path, "manifest.json"))
+
+
+def _is_replaceable(path: str) -> bool:
+    """Whether `path` is an empty directory or one holding an event loss table."""
+    if not os.path.isdir(path):
+        return False
+    if not os.listdir(path):
+        return True
+    try:
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return False
+    return isinstance(manifest, dict) and {"version", "columns", "row_groups"} <= set(manifest)
+
+
+class EventLossTable:
+    """
+    Reads a sparse event loss table written by `EventLossWriter`.
+
+    Columns are memory mapped and the aggregation queries walk the row groups one at
+    a time, so tables larger than memory can be queried.  Buildings that are absent
+    for an event had no loss in it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes an EventLossTable object.
+
+        Args:
+            path (str): Directory written by `EventLossWriter`.
+        """
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest["version"] != TABLE_VERSION:
+            raise ValueError(f"Unsupported event loss table version: {manifest['version']}.")
+        self.path = path
+        self.columns: List[str] = manifest["columns"]
+        self.row_groups: List[int] = manifest["row_groups"]
+
+    def __len__(self) -> int:
+        return sum(self.row_groups)
+
+    def event_losses(self, column: str = TOTAL) -> pd.Series:
+        """
+        Sums a loss over the buildings of each event.
+
+        Args:
+            column (str): A loss component, or "total_loss".
+
+        Returns:
+            pd.Series: Loss by event ID, sorted by event ID.  Events without any wet
+            building are absent.
+        """
+        totals: Dict[int, float] = {}
+        for group in self._groups([EVENT_COLUMN], column):
+            events, inverse = np.unique(group[EVENT_COLUMN], return_inverse=True)
+            sums = np.bincount(inverse, weights=group[column], minlength=len(events))
+            for event, value in zip(events.tolist(), sums.tolist(), strict=True):
+                totals[event] = totals.get(event, 0.0) + value
+        return pd.Series(totals, dtype=float, name=column).sort_index()
+
+    def building_losses(
+        self,
+        n_buildings: int,
+        column: str = TOTAL,
+        event_rates: Optional[Mapping[int, float]] = None,
+    ) -> np.ndarray:
+        """
+        Sums a loss over the events of each building.
+
+        With the annual rate of every event, this is each building's average annual
+        loss.
+
+        Args:
+            n_buildings (int): Number of buildings in the inventory.
+            column (str): A loss component, or "total_loss".
+            event_rates (Mapping[int, float], optional): Weight of each event ID, e.g.
+                its annual rate.  Events without a rate weigh 0.
+
+        Returns:
+            np.ndarray: Loss of each building index.
+        """
+        totals = np.zeros(n_buildings)
+        rates = None if event_rates is None else pd.Series(event_rates, dtype=float)
+        columns = [BUILDING_COLUMN] + ([EVENT_COLUMN] if rates is not None else [])
+        for group in self._groups(columns, column):
+            weights = np.asarray(group[column], dtype=float)
+            if rates is not None:
+                weights = weights * rates.reindex(group[EVENT_COLUMN]).fillna(0.0).to_numpy()
+            totals += np.bincount(group[BUILDING_COLUMN], weights=weights, minlength=n_buildings)
+        return totals
+
+    def to_frame(self, events: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """
+        Loads the table, or the rows of some events, as a DataFrame.
+
+        Args:
+            events (Sequence[int], optional): Event IDs to keep.  Defaults to all.
+
+        Returns:
+            pd.DataFrame: The rows, in the order they were written.
+        """
+        frames = []
+        for group in self._groups(self.columns):
+            frame = pd.DataFrame({column: np.asarray(group[column]) for column in self.columns})
+            if events is not None:
+                frame = frame[np.isin(frame[EVENT_COLUMN].to_numpy(), list(events))]
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame({column: np.array([], dtype=np.int64) for column in self.columns})
+        return pd.concat(frames, ignore_index=True)
+
+    def _groups(self, columns: Sequence[str], loss: Optional[str] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Yields the memory mapped columns of each row group, with `loss` computed if it is the total."""
+        if loss is not None and loss != TOTAL and loss not in LOSS_COLUMNS:
+            raise ValueError(f"Unknown loss column: {loss}.")
+        for group in range(len(self.row_groups)):
+            arrays = {column: self._load(group, column) for column in columns}
+            if loss == TOTAL:
+                arrays[TOTAL] = sum(
+                    np.asarray(self._load(group, column), dtype=float) for column in LOSS_COLUMNS
+                )
+            elif loss is not None:
+                arrays[loss] = self._load(group, loss)
+            yield arrays
+
+    def _load(self, group: int, column: str) -> np.ndarray:
+        """Memory maps one column of a row group."""
+        return np.load(os.path.join(self.path, f"{group:05d}.{column}.npy"), mmap_mode="r")
+
+
+def scenario_event_losses(
+    runner: ScenarioRunner,
+    depth_grids: Sequence[Union[AbstractFloodDepthGrid, str]],
+    event_ids: Sequence[int],
+    writer: EventLossWriter,
+) -> int:
+    """
+    Runs a catalog of events batch by batch into an event loss table.
+
+    Only wet buildings are written: covered by the grid with a positive flood depth
+    and a positive loss.  Buildings are identified by their position in input order.
+
+    Args:
+        runner (ScenarioRunner): Runner prepared for the buildings.
+        depth_grids (Sequence[Union[AbstractFloodDepthGrid, str]]): One depth grid or
+            raster path per event.
+        event_ids (Sequence[int]): ID of each event.
+        writer (EventLossWriter): The event loss table.
+
+    Returns:
+        int: The number of rows written.
+    """
+    if len(depth_grids) != len(event_ids):
+        raise ValueError("depth_grids must have one entry per event ID.")
+    components = [name for name in LOSS_COLUMNS if name != "inventory_loss" or runner.has_inventory]
+    original_order = runner.buildings.original_order
+
+    written = 0
+    for start, outputs in runner.iter_output_batches(depth_grids, ["flood_depth", *components]):
+        losses = {name: np.nan_to_num(outputs[name]) for name in components}
+        wet = (np.nan_to_num(outputs["flood_depth"]) > 0) & (sum(losses.values()) > 0)
+        for column in range(wet.shape[1]):
+            rows = np.flatnonzero(wet[:, column])
+            positions = rows if original_order is None else original_order[rows]
+            writer.write_event(
+                event_ids[start + column],
+                positions,
+                {name: values[rows, column] for name, values in losses.items()},
+            )
+            written += len(rows)
+    return written
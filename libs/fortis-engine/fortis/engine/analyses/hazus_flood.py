@@ -1,16 +1,24 @@
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
 import numpy as np
 import pandas as pd
 import geopandas as gpd
 from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
-from fortis.engine.models.abstract_flood_depth_grid import AbstractFloodDepthGrid
+from fortis.engine.models.abstract_flood_depth_grid import (
+    AbstractFloodDepthGrid,
+    building_depths_with_coverage,
+)
+from fortis.engine.analyses.analysis_results import AnalysisResults
+from fortis.engine.analyses.event_loss_table import EventLossWriter, scenario_event_losses
+from fortis.engine.analyses.hazus_tables import (
+    DEBRIS_WEIGHT_COLUMNS,
+    debris_foundation_types,
+    debris_intervals,
+    restoration_intervals,
+)
+from fortis.engine.analyses.scenario_runner import ScenarioRunner
 from fortis.engine.vulnerability.abstract_vulnerability_function import AbstractVulnerabilityFunction
-
-try:
-    # Python 3.9+
-    import importlib.resources as resources
-except ImportError:
-    # For earlier versions, install importlib_resources
-    import importlib_resources as resources
+from fortis.engine.vulnerability.damage_data import DamageData, get_damage_data
+from fortis.engine.vulnerability.default_flood import DefaultFloodFunction
 
 
 class HazusFloodAnalysis:
@@ -19,6 +27,9 @@ class HazusFloodAnalysis:
         buildings: AbstractBuildingPoints,
         vulnerability_func: AbstractVulnerabilityFunction,
         depth_grid: AbstractFloodDepthGrid,
+        footprints: Optional[gpd.GeoSeries] = None,
+        zonal_stat: str = "max",
+        damage_data: Optional[DamageData] = None,
     ):
         """
         Initializes a HazusFloodAnalysis object.
@@ -27,29 +38,36 @@ class HazusFloodAnalysis:
             buildings (BuildingPoints): BuildingPoints object.
             vulnerability_func (VulnerabilityFunction): VulnerabilityFunction object.
             hazard (Hazard): Hazard object.
+            footprints (GeoSeries, optional): Building footprint polygons indexed like
+                the buildings.  When given, the flood depth of each building is
+                `zonal_stat` over its footprint instead of the depth at its point.
+            zonal_stat (str): "max", "mean" or "min", used with `footprints`.
+            damage_data (DamageData, optional): The Hazus tables.  Defaults to the
+                process-wide tables from `get_damage_data`.
         """
         self.buildings = buildings
         self.vulnerability_func = vulnerability_func
         self.depth_grid = depth_grid
+        self.footprints = footprints
+        self.zonal_stat = zonal_stat
+        # Buildings covered by the depth grid, set by calculate_losses.
+        self.covered: Optional[np.ndarray] = None
 
-        with (
-            resources.files("fortis.data")
-            .joinpath("flDebris.csv")
-            .open("r", encoding="utf-8-sig") as debris_file
-        ):
-            debris_df = pd.read_csv(debris_file)
-            self.debris = self._index_debris_lookup(debris_df)
-        with (
-            resources.files("fortis.data")
-            .joinpath("flRsFnGBS.csv")
-            .open("r", encoding="utf-8-sig") as restoration_file
-        ):
-            restoration_df = pd.read_csv(restoration_file)
-            self.restoration = self._index_restoration_lookup(restoration_df)
+        if damage_data is None:
+            damage_data = get_damage_data()
+        self.damage_data = damage_data
+        self.debris = debris_intervals(damage_data)
+        self.restoration = restoration_intervals(damage_data)
 
     def calculate_losses(self):
         """
-        Calculates risk for each building.
+        Calculates risk for each building, writing the outputs into the buildings'
+        frame.
+
+        Besides the loss, debris and restoration fields, the debris weights the debris
+        is computed from (`DEBRIS_WEIGHT_COLUMNS`: FinishWt, StructureWt and
+        FoundationWt) are kept as output columns, as in `calculate_results`.  Drop
+        them from the frame if they are not wanted.
 
         Returns:
             pandas.DataFrame or geopandas.GeoDataFrame: Building data with risk metrics.
@@ -64,11 +82,15 @@ class HazusFloodAnalysis:
         # Number of stories
         # Occupancy class
 
-        gdf: gpd.GeoDataFrame = self.buildings.gdf
+        # The attribute table; point geometries are never built for the analysis.
+        gdf: pd.DataFrame = self.buildings.frame
         fields = self.buildings.fields
+        float_dtype = self.buildings.float_dtype
 
-        # Apply the depth grid to the buildings
-        gdf[fields.flood_depth] = self.depth_grid.get_depth_vectorized(gdf.geometry)
+        # Apply the depth grid to the buildings.  Buildings outside the grid are
+        # skipped by every later stage and keep NaN results.
+        depths, self.covered = self._sample_depths(gdf)
+        gdf[fields.flood_depth] = np.asarray(depths, dtype=float_dtype)
 
         # From the flooded depth based on other attributes determine the depth in structure.
         gdf[fields.depth_in_structure] = (
@@ -76,204 +98,245 @@ class HazusFloodAnalysis:
         )
 
         # Apply the vulnerability function to the buildings
-        self.vulnerability_func.apply_damage_percentages()
+        if self.covered.all():
+            self.vulnerability_func.apply_damage_percentages()
+        else:
+            gdf.loc[~self.covered, fields.depth_in_structure] = np.nan
+            self.vulnerability_func.apply_damage_percentages(mask=self.covered)
 
         # Do the loss calculations
-        gdf[fields.building_loss] = (
-            gdf[fields.building_damage_percent] / 100.0 * gdf[fields.building_cost]
-        )
-        gdf[fields.content_loss] = (
-            gdf[fields.content_damage_percent] / 100.0 * gdf[fields.content_cost]
-        )
-
-        # Using an inline conditional to get a column or supply a default Series:
-        inventory_cost_series = (
-            gdf[fields.inventory_cost]
-            if fields.inventory_cost in gdf.columns
-            else pd.Series(0, index=gdf.index)
-        )
+        for column, values in self._loss_columns(gdf, gdf).items():
+            gdf[column] = values
 
-        if fields.inventory_damage_percent in gdf.columns:
-            gdf[fields.inventory_loss] = (
-                gdf[fields.inventory_damage_percent] / 100.0 * inventory_cost_series
-            )
-
-        
         # Debris
         self._vectorized_debris_calculation()
         
         # Restoration
         self._vectorized_restoration_calculation()
 
-    def _index_debris_lookup(self, lookup_df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Index the debris lookup table for fast access.
+    def calculate_results(self, float_dtype: Any = None) -> AnalysisResults:
         """
-        # 1. Create the combined key.
-        lookup_df['merge_key'] = lookup_df['SOccup'] + '_' + lookup_df['FoundType']
+        Calculates risk for each building into a results container, leaving the
+        buildings untouched.
 
-        # 2. Create the Interval column using the minimum and maximum flood depths.
-        lookup_df['Interval'] = lookup_df.apply(
-            lambda row: pd.Interval(row['MinFloodDepth'], row['MaxFloodDepth'], closed='left'),
-            axis=1
+        Every output field is computed into its own array, so several analyses can run
+        on the same inventory without overwriting each other.  The outputs are only
+        joined to the inventory on export.
+
+        Args:
+            float_dtype: Dtype of the float outputs, e.g. "float32".  Defaults to the
+                buildings' float dtype.
+
+        Returns:
+            AnalysisResults: The outputs, keyed by the building field names.
+
+        Raises:
+            ValueError: If the vulnerability function has no `damage_percentages`.
+        """
+        if not hasattr(self.vulnerability_func, "damage_percentages"):
+            raise ValueError(
+                f"{type(self.vulnerability_func).__name__} has no damage_percentages; "
+                "use calculate_losses, which only needs apply_damage_percentages."
+            )
+        gdf: pd.DataFrame = self.buildings.frame
+        fields = self.buildings.fields
+        building_dtype = self.buildings.float_dtype
+
+        depths, self.covered = self._sample_depths(gdf)
+        flood_depth = np.asarray(depths, dtype=building_dtype)
+        depth_in_structure = flood_depth - gdf[fields.first_floor_height].to_numpy()
+        mask = None
+        if not self.covered.all():
+            depth_in_structure = np.where(self.covered, depth_in_structure, np.nan)
+            mask = self.covered
+
+        columns: Dict[str, Any] = {
+            fields.flood_depth: flood_depth,
+            fields.depth_in_structure: depth_in_structure,
+        }
+        columns.update(self.vulnerability_func.damage_percentages(depth_in_structure, mask))
+        columns.update(self._loss_columns(columns, gdf))
+        weights, _ = self._debris_weights(gdf, depth_in_structure, building_dtype)
+        columns.update(weights)
+        columns.update(self._debris_columns(columns, gdf[fields.area]))
+        restoration, _ = self._restoration_days(gdf, depth_in_structure, building_dtype)
+        columns.update(restoration)
+
+        return AnalysisResults(
+            gdf,
+            columns,
+            np.dtype(float_dtype) if float_dtype is not None else None,
+            self.buildings.original_order,
         )
 
-        # Set 'MinFloodDepth' as a temporary index to help with grouping.
-        lookup_df = lookup_df.set_index('MinFloodDepth')
+    def write_event_losses(
+        self,
+        writer: EventLossWriter,
+        event_ids: Union[int, Sequence[int]],
+        depth_grids: Optional[Sequence[Union[AbstractFloodDepthGrid, str]]] = None,
+    ) -> int:
+        """
+        Appends event losses to a sparse event loss table, see `scenario_event_losses`.
+
+        The events are evaluated batch by batch by a ScenarioRunner over the buildings,
+        so a catalog passed in one call shares the damage curve lookups and pixel
+        indices.  Only the building, content and inventory losses are computed, and
+        the buildings are left untouched.
+
+        Args:
+            writer (EventLossWriter): The event loss table.
+            event_ids (Union[int, Sequence[int]]): ID of each event in `depth_grids`,
+                or the ID of the analysis's own depth grid.
+            depth_grids (Sequence[Union[AbstractFloodDepthGrid, str]], optional): One
+                depth grid or raster path per event.  Defaults to the analysis's depth
+                grid.
 
-        # 3. Group by the combined key and create a nested index.
-        lookup_df = lookup_df.groupby('merge_key')[['Interval', 'FinishWt', 'StructureWt', 'FoundationWt']].apply(
-            lambda x: x.set_index('Interval')
+        Returns:
+            int: The number of rows written.
+        """
+        if self.footprints is not None:
+            raise ValueError("Event loss tables sample building points; footprints are not supported.")
+        if not isinstance(self.vulnerability_func, DefaultFloodFunction):
+            raise ValueError("Event loss tables need the Hazus curves of a DefaultFloodFunction.")
+        if depth_grids is None:
+            depth_grids = [self.depth_grid]
+        if np.ndim(event_ids) == 0:
+            event_ids = [event_ids]
+        runner = ScenarioRunner(
+            self.buildings, self.vulnerability_func.flood_type, damage_data=self.damage_data
         )
-        # Reset index so that we can create an IntervalIndex column.
-        lookup_df = lookup_df.reset_index()
-        lookup_df['IntervalIndex'] = pd.IntervalIndex(lookup_df['Interval'])
-        lookup_df = lookup_df.set_index('merge_key')
-
-        # Expand intervals to numeric columns for vector matching.
-        lookup_df['interval_left'] = lookup_df['Interval'].apply(lambda x: x.left)
-        lookup_df['interval_right'] = lookup_df['Interval'].apply(lambda x: x.right)
-
-        return lookup_df
-
-    def _index_restoration_lookup(self, lookup_df: pd.DataFrame) -> pd.DataFrame:
-        # 1. Create the Interval column using the minimum and maximum flood depths.
-        lookup_df['Interval'] = lookup_df.apply(
-            lambda row: pd.Interval(row['Min_Depth'], row['Max_Depth'], closed='left'),
-            axis=1
+        return scenario_event_losses(runner, depth_grids, event_ids, writer)
+
+    def _sample_depths(self, gdf: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples the flood depth of every building, at its point or over its footprint."""
+        if self.footprints is None:
+            return building_depths_with_coverage(self.depth_grid, self.buildings)
+        return self.depth_grid.get_zonal_depth_with_coverage(
+            self._aligned_footprints(gdf), self.zonal_stat
         )
 
-        # Set 'MinDepth' as a temporary index to help with grouping.
-        lookup_df = lookup_df.set_index('Min_Depth')
+    def _loss_columns(self, percentages: Mapping[str, Any], gdf: pd.DataFrame) -> Dict[str, Any]:
+        """Computes the losses from the damage percentages, taken from `percentages`, and the costs in `gdf`."""
+        fields = self.buildings.fields
+        losses = {
+            fields.building_loss: (
+                percentages[fields.building_damage_percent] / 100.0 * gdf[fields.building_cost]
+            ),
+            fields.content_loss: (
+                percentages[fields.content_damage_percent] / 100.0 * gdf[fields.content_cost]
+            ),
+        }
 
-        # 2. Group by 'SOccup' and create a nested index of intervals.
-        lookup_df = lookup_df.groupby('SOccup')[['Interval', 'Min_Restor_Days', 'Max_Restor_Days']].apply(
-            lambda x: x.set_index('Interval')
+        # Using an inline conditional to get a column or supply a default Series:
+        inventory_cost_series = (
+            gdf[fields.inventory_cost]
+            if fields.inventory_cost in gdf.columns
+            else pd.Series(0, index=gdf.index, dtype=self.buildings.float_dtype)
         )
-        lookup_df = lookup_df.reset_index()
 
-        # 3. Create an IntervalIndex and set 'SOccup' as the main grouping index.
-        lookup_df['IntervalIndex'] = pd.IntervalIndex(lookup_df['Interval'])
-        lookup_df = lookup_df.set_index('SOccup')
-
-        # Expand intervals to numeric columns for vector matching.
-        lookup_df['interval_left'] = lookup_df['Interval'].apply(lambda x: x.left)
-        lookup_df['interval_right'] = lookup_df['Interval'].apply(lambda x: x.right)
+        if fields.inventory_damage_percent in percentages:
+            losses[fields.inventory_loss] = (
+                percentages[fields.inventory_damage_percent] / 100.0 * inventory_cost_series
+            )
+        return losses
 
-        return lookup_df
+    def _aligned_footprints(self, gdf: pd.DataFrame) -> gpd.GeoSeries:
+        """Returns the footprints in the row order of the buildings, matched on the index."""
+        if len(self.footprints) != len(gdf) or not self.footprints.index.isin(gdf.index).all():
+            raise ValueError("footprints must have one polygon per building, indexed like the buildings.")
+        return self.footprints.reindex(gdf.index)
 
     def _vectorized_debris_calculation(self):
-        # Get building GeoDataFrame and the fields reference.
-        gdf = self.buildings.gdf
+        """
+        Looks up the debris weights of every covered building in one pass over the
+        flattened debris table, keyed by occupancy and foundation type.
+        """
+        gdf = self.buildings.frame
         fields = self.buildings.fields
 
-        # Work on a copy of the debris lookup DataFrame.
-        debris_lookup_df = self.debris
-
-        # Map building foundation types (in-place update) based on your provided logic.
-        gdf['FoundType'] = gdf[fields.foundation_type].map(
-            lambda x: 'Slab' if x in (6, 7) else ('Footing' if 1 <= x <= 5 else None)
+        # Covered buildings with a debris key get their weights, NaN where no interval
+        # holds their depth; every other row is reset to NaN.
+        weights, written = self._debris_weights(
+            gdf, gdf[fields.depth_in_structure], self.buildings.float_dtype
         )
+        for col, values in weights.items():
+            self._write_rows(gdf, col, written, values)
 
-        # Create the lookup key in the buildings dataframe
-        gdf['merge_key'] = gdf[fields.occupancy_type] + '_' + gdf['FoundType']
-
-        # Ensure columns exist for newly assigned weights
-        for col in ['FinishWt', 'StructureWt', 'FoundationWt']:
-            if col not in gdf.columns:
-                gdf[col] = np.nan
-
-        # Prepare a column for depth offset
-        gdf['depth_offset'] = np.nan
-
-        # For efficiency, group the debris table by merge_key and build numeric boundaries to perform fast interval lookups.
-        grouped_lookup = dict(tuple(debris_lookup_df.groupby('merge_key')))
-
-        # Process each key once
-        unique_keys = gdf['merge_key'].dropna().unique()
-        for key in unique_keys:
-            if key not in grouped_lookup:
-                continue
-
-            sub_lookup = grouped_lookup[key]
-            # Sorted arrays of interval boundaries
-            starts = sub_lookup['interval_left'].values
-            ends = sub_lookup['interval_right'].values
-
-            # Select relevant buildings
-            mask = gdf['merge_key'] == key
-            depths = gdf.loc[mask, fields.depth_in_structure].values
-
-            # Use searchsorted to find the appropriate interval index for each depth
-            # We look for the interval such that interval_left <= depth < interval_right
-            idx = np.searchsorted(starts, depths, side='right') - 1  # Potential match
-            
-            # Build arrays to hold results
-            finish_wts = np.full_like(depths, np.nan, dtype=float)
-            structure_wts = np.full_like(depths, np.nan, dtype=float)
-            foundation_wts = np.full_like(depths, np.nan, dtype=float)
-            depth_offsets = np.full_like(depths, np.nan, dtype=float)
-
-            valid = (idx >= 0) & (idx < len(starts)) & (depths >= starts[idx]) & (depths < ends[idx])
-            valid_idx = idx[valid]
-
-            # Grab matching weights
-            finish_wts[valid] = sub_lookup['FinishWt'].values[valid_idx]
-            structure_wts[valid] = sub_lookup['StructureWt'].values[valid_idx]
-            foundation_wts[valid] = sub_lookup['FoundationWt'].values[valid_idx]
-            depth_offsets[valid] = depths[valid] - starts[valid_idx]
-
-            # Assign results back
-            gdf.loc[mask, 'FinishWt'] = finish_wts
-            gdf.loc[mask, 'StructureWt'] = structure_wts
-            gdf.loc[mask, 'FoundationWt'] = foundation_wts
-            gdf.loc[mask, 'depth_offset'] = depth_offsets
-
-        # Clean up and compute debris columns
-        gdf.drop(columns=['FoundType', 'merge_key'], inplace=True)
-        gdf[fields.debris_finish] = gdf[fields.area] * gdf["FinishWt"] / 1000
-        gdf[fields.debris_foundation] = gdf[fields.area] * gdf["FoundationWt"] / 1000
-        gdf[fields.debris_structure] = gdf[fields.area] * gdf["StructureWt"] / 1000
-        gdf[fields.debris_total] = (
-            gdf[fields.debris_finish]
-            + gdf[fields.debris_foundation]
-            + gdf[fields.debris_structure]
-        )
+        for col, values in self._debris_columns(gdf, gdf[fields.area]).items():
+            gdf[col] = values
 
-    def _vectorized_restoration_calculation(self):
+    def _debris_weights(
+        self, gdf: pd.DataFrame, depth_in_structure: Any, float_dtype: np.dtype
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
         """
-        Vectorized restoration calculation using np.searchsorted for interval matching.
-        Matches based on building occupancy_type and depth_in_structure.
+        Returns the FinishWt, StructureWt and FoundationWt debris weights, NaN where no
+        interval applies, and the mask of covered buildings with a debris key.
         """
-        gdf = self.buildings.gdf
         fields = self.buildings.fields
-        restor_df = self.restoration
 
-        # Group the restoration lookup for interval matching
-        grouped_lookup = dict(tuple(restor_df.groupby('SOccup')))
-        unique_keys = gdf[fields.occupancy_type].dropna().unique()
-
-        for key in unique_keys:
-            if key not in grouped_lookup:
-                continue
+        codes = self.debris.key_codes(
+            gdf[fields.occupancy_type], debris_foundation_types(gdf[fields.foundation_type])
+        )
+        rows, keyed = self.debris.lookup(codes, depth_in_structure)
 
-            sub_restor = grouped_lookup[key]
-            starts = sub_restor['interval_left'].values
-            ends = sub_restor['interval_right'].values
-            mask = gdf[fields.occupancy_type] == key
-            depths = gdf.loc[mask, fields.depth_in_structure].values
+        weights = {
+            col: self.debris.gather(rows, col, float_dtype)
+            for col in DEBRIS_WEIGHT_COLUMNS
+        }
+        return weights, keyed & self._covered_mask(gdf)
 
-            # Index of the correct interval
-            idx = np.searchsorted(starts, depths, side='right') - 1
+    def _debris_columns(self, weights: Mapping[str, Any], area: Any) -> Dict[str, Any]:
+        """Computes the debris (tons) from the debris weights and the building area."""
+        fields = self.buildings.fields
+        finish = area * weights["FinishWt"] / 1000
+        foundation = area * weights["FoundationWt"] / 1000
+        structure = area * weights["StructureWt"] / 1000
+        return {
+            fields.debris_finish: finish,
+            fields.debris_foundation: foundation,
+            fields.debris_structure: structure,
+            fields.debris_total: finish + foundation + structure,
+        }
 
-            min_days_vec = np.full_like(depths, np.nan, dtype=float)
-            max_days_vec = np.full_like(depths, np.nan, dtype=float)
+    def _vectorized_restoration_calculation(self):
+        """
+        Looks up the restoration days of every covered building in one pass over the
+        flattened restoration table, keyed by occupancy.
+        """
+        gdf = self.buildings.frame
+        fields = self.buildings.fields
 
-            valid = (idx >= 0) & (idx < len(starts)) & (depths >= starts[idx]) & (depths < ends[idx])
-            valid_idx = idx[valid]
+        days, written = self._restoration_days(
+            gdf, gdf[fields.depth_in_structure], self.buildings.float_dtype
+        )
+        for col, values in days.items():
+            self._write_rows(gdf, col, written, values)
 
-            min_days_vec[valid] = sub_restor['Min_Restor_Days'].values[valid_idx]
-            max_days_vec[valid] = sub_restor['Max_Restor_Days'].values[valid_idx]
+    def _restoration_days(
+        self, gdf: pd.DataFrame, depth_in_structure: Any, float_dtype: np.dtype
+    ) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        Returns the minimum and maximum restoration days, NaN where no interval applies,
+        and the mask of covered buildings whose occupancy has restoration intervals.
+        """
+        fields = self.buildings.fields
+        codes = self.restoration.key_codes(gdf[fields.occupancy_type])
+        rows, keyed = self.restoration.lookup(codes, depth_in_structure)
+        days = {
+            fields.restoration_minimum: self.restoration.gather(rows, 'Min_Restor_Days', float_dtype),
+            fields.restoration_maximum: self.restoration.gather(rows, 'Max_Restor_Days', float_dtype),
+        }
+        return days, keyed & self._covered_mask(gdf)
+
+    def _write_rows(self, gdf: pd.DataFrame, column: str, mask: np.ndarray, values: np.ndarray):
+        """
+        Replaces a column with values on the masked rows and NaN elsewhere, so rows
+        left out of a later run never keep the results of an earlier one.
+        """
+        gdf[column] = np.where(mask, values, np.nan).astype(values.dtype, copy=False)
 
-            gdf.loc[mask, fields.restoration_minimum] = min_days_vec
-            gdf.loc[mask, fields.restoration_maximum] = max_days_vec
+    def _covered_mask(self, gdf: pd.DataFrame) -> np.ndarray:
+        """Returns the depth grid coverage mask, or all True before any sampling."""
+        if self.covered is None:
+            return np.ones(len(gdf), dtype=bool)
+        return self.covered
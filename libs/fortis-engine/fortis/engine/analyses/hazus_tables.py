@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from fortis.engine.analyses.interval_table import IntervalTable
+from fortis.engine.vulnerability.damage_data import DamageData
+
+# Debris weights (tons per 1000 sq ft) of the Hazus debris table.  The analysis keeps
+# them in its outputs next to the debris they give.
+DEBRIS_WEIGHT_COLUMNS = ('FinishWt', 'StructureWt', 'FoundationWt')
+
+def debris_intervals(damage_data: DamageData) -> IntervalTable:
+    """Returns the debris weights by occupancy and foundation type, built once per process."""
+    return damage_data.memoize(
+        "debris_intervals",
+        lambda: IntervalTable.from_frame(
+            damage_data.table("flDebris"),
+            ['SOccup', 'FoundType'],
+            'MinFloodDepth',
+            'MaxFloodDepth',
+            list(DEBRIS_WEIGHT_COLUMNS),
+        ),
+    )
+
+
+def restoration_intervals(damage_data: DamageData) -> IntervalTable:
+    """Returns the restoration days by occupancy, built once per process."""
+    return damage_data.memoize(
+        "restoration_intervals",
+        lambda: IntervalTable.from_frame(
+            damage_data.table("flRsFnGBS"),
+            ['SOccup'],
+            'Min_Depth',
+            'Max_Depth',
+            ['Min_Restor_Days', 'Max_Restor_Days'],
+        ),
+    )
+
+
+def debris_foundation_types(foundation: pd.Series) -> np.ndarray:
+    """
+    Maps foundation types to the Hazus debris foundation type: Slab for slab (7) and
+    fill (6), Footing for the other foundations (1-5), "" otherwise, including
+    missing foundation types.
+    """
+    # Nullable integer columns give NA in the masks; those buildings match neither.
+    slab = foundation.isin([6, 7]).fillna(False).to_numpy(dtype=bool)
+    footing = foundation.between(1, 5).fillna(False).to_numpy(dtype=bool)
+    return np.select([slab, footing], ['Slab', 'Footing'], default='')
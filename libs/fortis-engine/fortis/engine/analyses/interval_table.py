@@ -0,0 +1,163 @@
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+def encode_keys(levels: List[pd.Index], keys: Sequence[Sequence]) -> np.ndarray:
+    """
+    Encodes key values as integers over the product of the key levels.
+
+    Args:
+        levels (List[pd.Index]): Distinct values of each key column.
+        keys (Sequence[Sequence]): Values of each key column.
+
+    Returns:
+        np.ndarray: Integer keys, -1 where any value is not in its level.
+    """
+    codes = np.zeros(len(keys[0]), dtype=np.intp)
+    unknown = np.zeros(len(keys[0]), dtype=bool)
+    for level, values in zip(levels, keys):
+        level_codes = level.get_indexer(values)
+        unknown |= level_codes < 0
+        codes = codes * len(level) + level_codes
+    codes[unknown] = -1
+    return codes
+
+
+class IntervalTable:
+    """
+    Lookup table of half-open [start, end) depth intervals grouped by key, flattened
+    into one array per column.
+
+    Keys are integer coded over the product of the key columns' distinct values and
+    the rows are sorted by (key, start), so the rows of key `k` are
+    `offsets[k]:offsets[k + 1]`.  Looking up any number of buildings is one
+    searchsorted over (key, start rank) codes and a gather.
+    """
+
+    def __init__(
+        self,
+        levels: List[pd.Index],
+        codes: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        values: Dict[str, np.ndarray],
+    ):
+        """
+        Initializes an IntervalTable object.
+
+        Args:
+            levels (List[pd.Index]): Distinct values of each key column.
+            codes (np.ndarray): Integer key of each row, see `key_codes`.
+            starts (np.ndarray): Inclusive interval start of each row.
+            ends (np.ndarray): Exclusive interval end of each row.
+            values (Dict[str, np.ndarray]): Value columns, aligned with the rows.
+        """
+        order = np.lexsort((starts, codes))
+        self.levels = levels
+        self.codes = np.asarray(codes)[order]
+        self.starts = np.asarray(starts, dtype=float)[order]
+        self.ends = np.asarray(ends, dtype=float)[order]
+        self.values = {name: np.asarray(column)[order] for name, column in values.items()}
+        self.offsets = np.searchsorted(
+            self.codes, np.arange(int(np.prod([len(level) for level in levels])) + 1)
+        )
+        # Starts are compared through their rank among all distinct starts, which
+        # keeps the combined (key, start) codes exact integers.
+        self.breaks = np.unique(self.starts)
+        self._positions = self._combined(
+            self.codes, np.searchsorted(self.breaks, self.starts, side="right")
+        )
+
+    @classmethod
+    def from_frame(
+        cls,
+        frame: pd.DataFrame,
+        key_columns: Sequence[str],
+        start_column: str,
+        end_column: str,
+        value_columns: Sequence[str],
+    ) -> "IntervalTable":
+        """
+        Builds the table from a DataFrame with one row per interval.
+
+        Args:
+            frame (pd.DataFrame): The lookup table.
+            key_columns (Sequence[str]): Columns the intervals are grouped by.
+            start_column (str): Inclusive interval start column.
+            end_column (str): Exclusive interval end column.
+            value_columns (Sequence[str]): Columns returned by lookups.
+
+        Returns:
+            IntervalTable: The table.
+        """
+        levels = [pd.Index(frame[column].unique()) for column in key_columns]
+        return cls(
+            levels,
+            encode_keys(levels, [frame[column] for column in key_columns]),
+            frame[start_column].to_numpy(dtype=float),
+            frame[end_column].to_numpy(dtype=float),
+            {column: frame[column].to_numpy() for column in value_columns},
+        )
+
+    def key_codes(self, *keys: Sequence) -> np.ndarray:
+        """
+        Encodes key values, one sequence per key column, as integer keys.
+
+        Args:
+            *keys: Values of each key column, e.g. the buildings' occupancies.
+
+        Returns:
+            np.ndarray: Integer keys, -1 where any value is not in the table.
+        """
+        return encode_keys(self.levels, keys)
+
+    def lookup(self, codes: np.ndarray, depths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the interval holding each depth among the rows of its key.
+
+        Args:
+            codes (np.ndarray): Integer key of each building, from `key_codes`.
+            depths (np.ndarray): Depth of each building.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The matching row of each building (-1 where
+            no interval holds the depth), and the mask of buildings whose key has
+            rows in the table.
+        """
+        depths = np.asarray(depths, dtype=float)
+        known = codes >= 0
+        safe_codes = np.where(known, codes, 0)
+        first = self.offsets[safe_codes]
+        keyed = known & (self.offsets[safe_codes + 1] > first)
+
+        # The last row of the key starting at or before the depth: interval_left <= depth.
+        ranks = np.searchsorted(self.breaks, depths, side="right")
+        rows = np.searchsorted(self._positions, self._combined(safe_codes, ranks), side="right") - 1
+        candidate = np.maximum(rows, 0)
+        valid = (
+            keyed
+            & (rows >= first)
+            & (depths >= self.starts[candidate])
+            & (depths < self.ends[candidate])
+        )
+        return np.where(valid, rows, -1), keyed
+
+    def gather(self, rows: np.ndarray, column: str, dtype=float) -> np.ndarray:
+        """
+        Returns a value column for looked up rows, NaN where `rows` is -1.
+
+        Args:
+            rows (np.ndarray): Rows from `lookup`.
+            column (str): Value column.
+            dtype: Float dtype of the result.
+
+        Returns:
+            np.ndarray: The values.
+        """
+        values = np.append(self.values[column].astype(dtype), np.nan).astype(dtype)
+        return values[rows]
+
+    def _combined(self, codes: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+        """Combines keys and start ranks into codes sorted like (key, start)."""
+        return codes.astype(np.int64) * (len(self.breaks) + 1) + ranks
@@ -0,0 +1,65 @@
+import os
+from abc import ABC, abstractmethod
+import pandas as pd
+
+
+class ResultWriter(ABC):
+    """Receives analysis results chunk by chunk and persists them incrementally."""
+
+    @abstractmethod
+    def write(self, results: pd.DataFrame) -> None:
+        """Appends one chunk of results."""
+        pass
+
+    def close(self) -> None:
+        """Flushes and releases the output."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CsvResultWriter(ResultWriter):
+    """
+    Appends result chunks to a single CSV file.
+
+    The header is written with the first chunk; later chunks must have the same
+    columns, which are reordered to match the header.
+    """
+
+    def __init__(self, path: str, index: bool = False):
+        """
+        Initializes a CsvResultWriter object.
+
+        Args:
+            path (str): Output CSV path.  An existing file is replaced.
+            index (bool): Also write the row index.
+        """
+        self.path = path
+        self.index = index
+        self.rows_written = 0
+        self._columns = None
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, results: pd.DataFrame) -> None:
+        """
+        Appends one chunk of results.
+
+        Args:
+            results (pd.DataFrame): The chunk, e.g. a buildings GeoDataFrame.
+
+        Raises:
+            ValueError: If the chunk columns differ from the first chunk.
+        """
+        if self._columns is None:
+            self._columns = list(results.columns)
+        elif set(results.columns) != set(self._columns):
+            raise ValueError("All result chunks must have the same columns.")
+        results[self._columns].to_csv(
+            self.path, mode="a", header=self.rows_written == 0, index=self.index
+        )
+        self.rows_written += len(results)
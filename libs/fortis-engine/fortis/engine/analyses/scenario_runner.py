@@ -0,0 +1,283 @@
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
+import numpy as np
+from fortis.engine.analyses.hazus_tables import (
+    DEBRIS_WEIGHT_COLUMNS,
+    debris_foundation_types,
+    debris_intervals,
+)
+from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
+from fortis.engine.models.abstract_flood_depth_grid import (
+    AbstractFloodDepthGrid,
+    building_depths_with_coverage,
+)
+from fortis.engine.models.flood_depth_grid import FloodDepthGrid
+from fortis.engine.models.raster_sampling import pixel_indices
+from fortis.engine.models.reprojection import project_coordinates
+from fortis.engine.vulnerability.damage_data import DamageData, get_damage_data
+from fortis.engine.vulnerability.default_flood import DefaultFloodFunction
+
+DEFAULT_BATCH_SIZE = 8
+# Per-scenario outputs of ScenarioRunner.run.
+SCENARIO_OUTPUTS = (
+    "building_loss",
+    "content_loss",
+    "inventory_loss",
+    "total_loss",
+    "debris_total",
+    "flood_depth",
+)
+
+
+def open_depth_grid(path: str) -> FloodDepthGrid:
+    """Opens a raster for the scenario runner: block sampling, NaN outside the raster."""
+    return FloodDepthGrid(path, sampling="block", out_of_bounds="mask")
+
+
+class ScenarioRunner:
+    """
+    Evaluates one inventory against any number of depth grids (events or return
+    periods).
+
+    Everything that depends only on the buildings is prepared once: the damage
+    function IDs and their curve rows, first floor heights, costs, debris keys, and
+    the pixel indices of the buildings on each distinct grid layout (CRS, transform
+    and shape).  Each scenario is then a pixel gather, a curve interpolation and a few
+    multiplications.  Scenarios are evaluated `batch_size` at a time, so the working
+    set is (buildings x batch_size) whatever the number of scenarios.
+    """
+
+    def __init__(
+        self,
+        buildings: AbstractBuildingPoints,
+        flood_type: str = "R",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        damage_data: Optional[DamageData] = None,
+        grid_opener: Callable[[str], AbstractFloodDepthGrid] = open_depth_grid,
+    ):
+        """
+        Initializes a ScenarioRunner object.
+
+        Args:
+            buildings (AbstractBuildingPoints): The buildings.  They are not modified.
+            flood_type (str): The type of flood (R, CV, CA).
+            batch_size (int): Scenarios evaluated together.
+            damage_data (DamageData, optional): The Hazus tables.  Defaults to the
+                process-wide tables from `get_damage_data`.
+            grid_opener (Callable[[str], AbstractFloodDepthGrid]): Opens scenarios
+                given as raster paths.  Grids it opens are closed once sampled.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive.")
+        if damage_data is None:
+            damage_data = get_damage_data()
+        self.buildings = buildings
+        self.batch_size = batch_size
+        self.grid_opener = grid_opener
+        # Pixel indices of the buildings, keyed by grid layout.
+        self._pixels: Dict[tuple, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+        frame = buildings.frame
+        fields = buildings.fields
+        vulnerability = DefaultFloodFunction(buildings, flood_type, damage_data)
+        ids = vulnerability.damage_ids()
+
+        # (curves, curve row of each building, cost of each building) per loss output.
+        self._losses = {
+            "building_loss": (
+                vulnerability.bdf_curves,
+                vulnerability.bdf_curves.rows(ids[fields.bddf_id]),
+                frame[fields.building_cost].to_numpy(dtype=float),
+            ),
+            "content_loss": (
+                vulnerability.cdf_curves,
+                vulnerability.cdf_curves.rows(ids[fields.cddf_id]),
+                frame[fields.content_cost].to_numpy(dtype=float),
+            ),
+        }
+        if fields.iddf_id in ids:
+            inventory_cost = (
+                frame[fields.inventory_cost].to_numpy(dtype=float)
+                if fields.inventory_cost in frame.columns
+                else np.zeros(len(frame))
+            )
+            self._losses["inventory_loss"] = (
+                vulnerability.idf_curves,
+                vulnerability.idf_curves.rows(ids[fields.iddf_id]),
+                inventory_cost,
+            )
+        self.first_floor_height = frame[fields.first_floor_height].to_numpy(dtype=float)
+
+        self.debris = debris_intervals(damage_data)
+        self.debris_codes = self.debris.key_codes(
+            frame[fields.occupancy_type], debris_foundation_types(frame[fields.foundation_type])
+        )
+        self.area = frame[fields.area].to_numpy(dtype=float)
+
+    @property
+    def has_inventory(self) -> bool:
+        """Whether the buildings have inventory damage function IDs."""
+        return "inventory_loss" in self._losses
+
+    def __len__(self) -> int:
+        return len(self.first_floor_height)
+
+    def run(
+        self,
+        depth_grids: Sequence[Union[AbstractFloodDepthGrid, str]],
+        output: str = "total_loss",
+        out: Optional[np.ndarray] = None,
+        float_dtype: Any = float,
+    ) -> np.ndarray:
+        """
+        Evaluates every scenario and returns one column per depth grid.
+
+        Buildings outside a grid, on NoData pixels or without a damage curve are NaN
+        for that scenario.  "total_loss" is the building loss plus the content and
+        inventory losses, counting those as 0 where the building has no curve for them.
+        "flood_depth" is the sampled depth itself.
+
+        Args:
+            depth_grids (Sequence[Union[AbstractFloodDepthGrid, str]]): The scenarios,
+                as depth grids or raster paths.
+            output (str): One of `SCENARIO_OUTPUTS`.
+            out (np.ndarray, optional): (buildings x scenarios) array to write into,
+                e.g. a np.memmap for matrices larger than memory.
+            float_dtype: Dtype of the matrix when `out` is not given.
+
+        Returns:
+            np.ndarray: The (buildings x scenarios) matrix, in the buildings' row order.
+        """
+        self._check_output(output)
+        shape = (len(self), len(depth_grids))
+        if out is None:
+            out = np.empty(shape, dtype=float_dtype)
+        elif out.shape != shape:
+            raise ValueError(f"out must have shape {shape}.")
+
+        for start, values in self.iter_batches(depth_grids, output):
+            out[:, start : start + values.shape[1]] = values
+        return out
+
+    def iter_batches(
+        self,
+        depth_grids: Sequence[Union[AbstractFloodDepthGrid, str]],
+        output: str = "total_loss",
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Evaluates the scenarios `batch_size` at a time, for consumers that reduce them
+        as they come (see `AnnualLoss`) instead of keeping the whole matrix.
+
+        Args:
+            depth_grids (Sequence[Union[AbstractFloodDepthGrid, str]]): The scenarios,
+                as depth grids or raster paths.
+            output (str): One of `SCENARIO_OUTPUTS`.
+
+        Yields:
+            Tuple[int, np.ndarray]: The position of the batch's first scenario and its
+            (buildings x batch) matrix, as described in `run`.
+        """
+        for start, values in self.iter_output_batches(depth_grids, [output]):
+            yield start, values[output]
+
+    def iter_output_batches(
+        self,
+        depth_grids: Sequence[Union[AbstractFloodDepthGrid, str]],
+        outputs: Sequence[str],
+    ) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """
+        Like `iter_batches`, but computes several outputs from each batch of sampled
+        depths, so every grid is sampled once whatever the number of outputs.
+
+        Args:
+            depth_grids (Sequence[Union[AbstractFloodDepthGrid, str]]): The scenarios,
+                as depth grids or raster paths.
+            outputs (Sequence[str]): Some of `SCENARIO_OUTPUTS`.
+
+        Yields:
+            Tuple[int, Dict[str, np.ndarray]]: The position of the batch's first
+            scenario and its (buildings x batch) matrix of each output.
+        """
+        for output in outputs:
+            self._check_output(output)
+        for start in range(0, len(depth_grids), self.batch_size):
+            batch = depth_grids[start : start + self.batch_size]
+            depths = np.column_stack([self.sample_depths(grid) for grid in batch])
+            yield start, {output: self._evaluate(depths, output) for output in outputs}
+
+    def sample_depths(self, depth_grid: Union[AbstractFloodDepthGrid, str]) -> np.ndarray:
+        """
+        Samples one scenario at every building.
+
+        Nearest-pixel grids that expose `pixel_layout` reuse the pixel indices cached
+        for their layout; other grids are sampled with `building_depths_with_coverage`.
+
+        Args:
+            depth_grid (Union[AbstractFloodDepthGrid, str]): Depth grid or raster path.
+
+        Returns:
+            np.ndarray: Flood depth of each building, NaN where it is not covered.
+        """
+        if isinstance(depth_grid, str):
+            grid = self.grid_opener(depth_grid)
+            try:
+                return self.sample_depths(grid)
+            finally:
+                if hasattr(grid, "close"):
+                    grid.close()
+
+        if (
+            getattr(depth_grid, "interpolation", "nearest") != "nearest"
+            or not hasattr(depth_grid, "pixel_layout")
+        ):
+            depths, covered = building_depths_with_coverage(depth_grid, self.buildings)
+            return np.where(covered, depths, np.nan)
+
+        rows, cols, inside = self._pixel_indices(*depth_grid.pixel_layout())
+        if depth_grid.out_of_bounds == "raise" and not inside.all():
+            raise ValueError("Some coordinates are outside the raster bounds.")
+        depths = np.full(len(self), np.nan)
+        if inside.any():
+            depths[inside] = depth_grid.sample_pixels(rows[inside], cols[inside])
+        return depths
+
+    def _check_output(self, output: str) -> None:
+        """Raises a ValueError for outputs the runner cannot compute."""
+        if output not in SCENARIO_OUTPUTS:
+            raise ValueError(f"output must be one of {SCENARIO_OUTPUTS}.")
+        if output == "inventory_loss" and not self.has_inventory:
+            raise ValueError("The buildings have no inventory damage function IDs.")
+
+    def _pixel_indices(
+        self, crs: Any, transform: Any, height: int, width: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the buildings' pixel indices on a grid layout, computed once per layout."""
+        key = (crs, tuple(transform), height, width)
+        if key not in self._pixels:
+            x, y = project_coordinates(self.buildings.x, self.buildings.y, self.buildings.crs, crs)
+            self._pixels[key] = pixel_indices(transform, x, y, height, width)
+        return self._pixels[key]
+
+    def _evaluate(self, depths: np.ndarray, output: str) -> np.ndarray:
+        """Computes an output for a (buildings x batch) matrix of flood depths."""
+        if output == "flood_depth":
+            return depths
+        batch = depths.shape[1]
+        depth_in_structure = (depths - self.first_floor_height[:, None]).ravel()
+
+        if output == "debris_total":
+            rows, _ = self.debris.lookup(np.repeat(self.debris_codes, batch), depth_in_structure)
+            weights = sum(self.debris.gather(rows, column) for column in DEBRIS_WEIGHT_COLUMNS)
+            return (np.repeat(self.area, batch) * weights / 1000).reshape(depths.shape)
+
+        def loss(name: str) -> np.ndarray:
+            curves, rows, cost = self._losses[name]
+            percent = curves.interpolate_rows(np.repeat(rows, batch), depth_in_structure)
+            return (percent / 100.0 * np.repeat(cost, batch)).reshape(depths.shape)
+
+        if output != "total_loss":
+            return loss(output)
+        total = loss("building_loss")
+        for name in ["content_loss", "inventory_loss"]:
+            if name in self._losses:
+                total += np.nan_to_num(loss(name))
+        return total
@@ -0,0 +1,118 @@
+from typing import Optional
+import pandas as pd
+from fortis.engine.analyses.hazus_flood import HazusFloodAnalysis
+from fortis.engine.analyses.result_writers import ResultWriter
+from fortis.engine.models.abstract_flood_depth_grid import AbstractFloodDepthGrid
+from fortis.engine.models.building_schema import BuildingSchema
+from fortis.engine.models.fast_buildings import FastBuildings
+from fortis.engine.vulnerability.abstract_vulnerability_function import AbstractVulnerabilityFunction
+
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+# Rows read to estimate the in-memory size of one building.
+SAMPLE_ROWS = 1000
+# Working set of a chunk relative to its loaded size: output columns (depths,
+# damage ids and percentages, losses, debris, restoration) and temporaries.
+WORKING_SET_FACTOR = 4
+
+
+def estimate_chunk_size(
+    csv_file: str,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    schema: Optional[BuildingSchema] = None,
+) -> int:
+    """
+    Picks the number of buildings per chunk that keeps the analysis within a memory budget.
+
+    The size of one building is measured on the first rows of the file, as loaded,
+    and scaled by the working set of the analysis.
+
+    Args:
+        csv_file (str): Path to the FAST UDF CSV file.
+        memory_budget (int): Bytes available to one chunk.
+        schema (BuildingSchema, optional): Column types the chunks will be loaded with.
+
+    Returns:
+        int: Buildings per chunk, at least 1.
+    """
+    if memory_budget < 1:
+        raise ValueError("memory_budget must be positive.")
+    sample = FastBuildings.from_dataframe(
+        pd.read_csv(csv_file, nrows=SAMPLE_ROWS), schema=schema
+    ).frame
+    if len(sample) == 0:
+        return 1
+    row_bytes = sample.memory_usage(deep=True).sum() / len(sample)
+    return max(1, int(memory_budget // (row_bytes * WORKING_SET_FACTOR)))
+
+
+class StreamingHazusFloodAnalysis:
+    """
+    Runs HazusFloodAnalysis over a FAST UDF CSV file one chunk of buildings at a time.
+
+    Every chunk goes through depth sampling, vulnerability, losses, debris and
+    restoration and is handed to a ResultWriter before the next one is read, so
+    memory is bounded by the chunk size rather than the inventory size.  The lookup
+    tables of the analysis and the vulnerability function are loaded once and
+    reused for every chunk.
+    """
+
+    def __init__(
+        self,
+        csv_file: str,
+        vulnerability_func: AbstractVulnerabilityFunction,
+        depth_grid: AbstractFloodDepthGrid,
+        writer: ResultWriter,
+        chunk_size: Optional[int] = None,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        spatial_order: Optional[str] = None,
+        schema: Optional[BuildingSchema] = None,
+    ):
+        """
+        Initializes a StreamingHazusFloodAnalysis object.
+
+        Args:
+            csv_file (str): Path to the FAST UDF CSV file.
+            vulnerability_func (VulnerabilityFunction): Vulnerability function.  Its
+                `buildings` are replaced by each chunk in turn, so it can be created
+                with buildings=None.
+            depth_grid (AbstractFloodDepthGrid): The depth grid.
+            writer (ResultWriter): Receives the results of every chunk, in input order.
+            chunk_size (int, optional): Buildings per chunk.  Defaults to a size derived
+                from `memory_budget` (see `estimate_chunk_size`).
+            memory_budget (int): Bytes available to one chunk when chunk_size is not set.
+            spatial_order (str, optional): "hilbert" or "morton" ordering within each chunk.
+            schema (BuildingSchema, optional): Column types applied to each chunk.
+        """
+        self.csv_file = csv_file
+        self.writer = writer
+        self.schema = schema
+        self.chunk_size = chunk_size or estimate_chunk_size(
+            csv_file, memory_budget, schema
+        )
+        self.spatial_order = spatial_order
+        self.vulnerability_func = vulnerability_func
+        self.analysis = HazusFloodAnalysis(None, vulnerability_func, depth_grid)
+        self.chunks_processed = 0
+        self.buildings_processed = 0
+
+    def run(self) -> int:
+        """
+        Processes the whole file and closes the writer.
+
+        Returns:
+            int: Number of buildings processed.
+        """
+        try:
+            for buildings in FastBuildings.iter_csv(
+                self.csv_file, self.chunk_size, self.spatial_order, self.schema
+            ):
+                self.analysis.buildings = buildings
+                self.vulnerability_func.buildings = buildings
+                self.analysis.covered = None
+                self.analysis.calculate_losses()
+                self.writer.write(buildings.frame_in_original_order())
+                self.chunks_processed += 1
+                self.buildings_processed += len(buildings.frame)
+        finally:
+            self.writer.close()
+        return self.buildings_processed
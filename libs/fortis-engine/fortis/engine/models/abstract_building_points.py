@@ -1,9 +1,15 @@
-from typing import Dict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
 import geopandas as gpd
 from abc import ABC, abstractmethod
 from fortis.engine.models.building_mapping import BuildingMapping
+from fortis.engine.models.building_schema import BuildingSchema
+from fortis.engine.models.inventory_cache import InventoryCache, cache_key
+from fortis.engine.models.reprojection import read_only_copy
+from fortis.engine.models.spatial_ordering import spatial_order
 
-""" 
+"""
 Foundation Types:
 C: Crawl (5)
 B: Basement (4)
@@ -14,11 +20,212 @@ F: Fill (6)
 W: Solid Wall (3)
 """
 
+# What inventory loaders return: a GeoDataFrame, or the attribute table with the
+# point coordinates and their CRS so the geometry can be built on demand.
+LoadedInventory = Union[gpd.GeoDataFrame, Tuple[pd.DataFrame, np.ndarray, np.ndarray, Any]]
+
+
 class AbstractBuildingPoints(ABC):
     def __init__(self, overrides: Dict[str, str] = None):
         self.fields: BuildingMapping = BuildingMapping(overrides)
+        # Position in the input of each current row, set by spatial_sort.
+        self.original_order: Optional[np.ndarray] = None
+        # Declared column types, set by loaders that apply a schema.
+        self.schema: Optional[BuildingSchema] = None
+        # Buildings are held either as a GeoDataFrame or, until a caller asks for
+        # `gdf`, as an attribute table plus coordinate arrays.
+        self._gdf: Optional[gpd.GeoDataFrame] = None
+        self._frame: Optional[pd.DataFrame] = None
+        self._x: Optional[np.ndarray] = None
+        self._y: Optional[np.ndarray] = None
+        self._crs: Any = None
 
     @property
     @abstractmethod
     def gdf(self) -> gpd.GeoDataFrame:
         pass
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        The building attribute table the analyses read and write.
+
+        This is the GeoDataFrame once it has been built, and otherwise the table
+        without geometry, so running an analysis never builds point geometries.
+        """
+        if self._gdf is not None:
+            return self._gdf
+        if self._frame is not None:
+            return self._frame
+        return self.gdf
+
+    @property
+    def x(self) -> np.ndarray:
+        """X coordinate (longitude) of every building, in row order.  Must not be modified."""
+        if self._x is None:
+            self._x = read_only_copy(self.gdf.geometry.x.to_numpy(dtype=float))
+        return self._x
+
+    @property
+    def y(self) -> np.ndarray:
+        """Y coordinate (latitude) of every building, in row order.  Must not be modified."""
+        if self._y is None:
+            self._y = read_only_copy(self.gdf.geometry.y.to_numpy(dtype=float))
+        return self._y
+
+    @property
+    def crs(self) -> Any:
+        """CRS of the building coordinates."""
+        if self._gdf is not None or self._frame is None:
+            return self.gdf.crs
+        return self._crs
+
+    @property
+    def float_dtype(self) -> np.dtype:
+        """Float dtype of the analysis columns: the schema's, or float64 without one."""
+        return self.schema.float_dtype if self.schema is not None else np.dtype("float64")
+
+    def _set_frame(self, df: pd.DataFrame, x: np.ndarray, y: np.ndarray, crs: Any) -> None:
+        """
+        Holds the buildings as an attribute table and coordinate arrays.
+
+        The coordinates are copied into read-only arrays the buildings own, so later
+        edits to `df` do not reach them and their projections can be memoized.
+
+        Args:
+            df (pd.DataFrame): Attribute columns, without geometry.
+            x (np.ndarray): X coordinates, aligned with the rows of `df`.
+            y (np.ndarray): Y coordinates, aligned with the rows of `df`.
+            crs: CRS of the coordinates.
+        """
+        self._gdf = None
+        self._frame = df
+        self._x = read_only_copy(x)
+        self._y = read_only_copy(y)
+        self._crs = crs
+
+    def _set_loaded(self, loaded: LoadedInventory) -> None:
+        """Holds what an inventory loader returned."""
+        if isinstance(loaded, gpd.GeoDataFrame):
+            self._gdf, self._frame, self._x, self._y = loaded, None, None, None
+        else:
+            self._set_frame(*loaded)
+
+    def _geodataframe(self) -> gpd.GeoDataFrame:
+        """
+        Returns the buildings GeoDataFrame, building the point geometry on first use.
+
+        From then on the GeoDataFrame replaces the attribute table as `frame`.
+        """
+        if self._gdf is None:
+            self._gdf = gpd.GeoDataFrame(
+                self._frame,
+                geometry=gpd.points_from_xy(self._x, self._y),
+                crs=self._crs,
+            )
+            self._frame = None
+        return self._gdf
+
+    def apply_schema(self, schema: BuildingSchema) -> None:
+        """
+        Casts the building columns to a declared schema and keeps it for the analyses.
+
+        Args:
+            schema (BuildingSchema): The schema to apply.
+        """
+        schema.apply(self.frame, self.fields)
+        self.schema = schema
+
+    def _load_with_cache(
+        self,
+        source_path: str,
+        loader: Callable[[], LoadedInventory],
+        cache_dir: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        schema: Optional[BuildingSchema] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Loads the buildings from the inventory cache, or with `loader` on a miss.
+
+        On a miss the parsed buildings are stored in the cache with the schema
+        applied and their point coordinates as plain arrays.  Cache hits never
+        build point geometries.
+
+        Args:
+            source_path (str): The inventory file, hashed into the cache key.
+            loader (Callable[[], LoadedInventory]): Parses the inventory.
+            cache_dir (str, optional): Cache directory.  None disables the cache.
+            columns (Sequence[str], optional): Projected columns, part of the cache key.
+            schema (BuildingSchema, optional): Schema applied at load time.
+            options (Dict[str, Any], optional): Other loader options, part of the cache key.
+        """
+        cache = key = None
+        if cache_dir is not None:
+            cache = InventoryCache(cache_dir)
+            key = cache_key(source_path, self.fields, columns, schema, options)
+            cached = cache.load(key)
+            if cached is not None:
+                self._set_frame(*cached)
+                self.schema = schema
+                return
+
+        self._set_loaded(loader())
+        if schema is not None:
+            self.apply_schema(schema)
+        if cache is not None:
+            frame = self.frame
+            if isinstance(frame, gpd.GeoDataFrame):
+                frame = pd.DataFrame(frame.drop(columns=frame.geometry.name))
+            cache.store(key, frame, self.x, self.y, self.crs)
+
+    def spatial_sort(self, method: str = "hilbert") -> None:
+        """
+        Reorders the buildings along a space-filling curve for raster locality.
+
+        Neighbouring buildings end up in neighbouring rows, so block based depth
+        sampling and every later stage walk memory in a cache friendly order.  The
+        index labels are kept and the permutation is stored in `original_order`
+        so results can be put back in input order with `restore_order`.
+
+        Args:
+            method (str): "hilbert" or "morton".
+        """
+        x, y = self.x, self.y
+        order = spatial_order(x, y, method)
+        if self._gdf is not None:
+            self._gdf = self._gdf.take(order)
+        else:
+            self._frame = self._frame.take(order)
+        self._x, self._y = read_only_copy(x[order]), read_only_copy(y[order])
+        self.original_order = (
+            order if self.original_order is None else self.original_order[order]
+        )
+
+    def restore_order(self, values: np.ndarray) -> np.ndarray:
+        """
+        Puts an array aligned with the current rows back into input order.
+
+        Args:
+            values (np.ndarray): Per-building values in the current row order.
+
+        Returns:
+            np.ndarray: The values in the order the buildings were loaded.
+        """
+        if self.original_order is None:
+            return values
+        restored = np.empty_like(values)
+        restored[self.original_order] = values
+        return restored
+
+    def frame_in_original_order(self) -> pd.DataFrame:
+        """Returns `frame` in the order the buildings were loaded, without building geometry."""
+        if self.original_order is None:
+            return self.frame
+        return self.frame.iloc[np.argsort(self.original_order)]
+
+    def gdf_in_original_order(self) -> gpd.GeoDataFrame:
+        """Returns the buildings GeoDataFrame in the order the buildings were loaded."""
+        if self.original_order is None:
+            return self.gdf
+        return self.gdf.iloc[np.argsort(self.original_order)]
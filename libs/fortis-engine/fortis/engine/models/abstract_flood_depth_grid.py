@@ -1,6 +1,8 @@
+from typing import Any, Tuple
 import numpy as np
 import geopandas as gpd
 from abc import ABC, abstractmethod
+from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
 
 
 class AbstractFloodDepthGrid(ABC):
@@ -13,3 +15,90 @@ class AbstractFloodDepthGrid(ABC):
     def get_depth_vectorized(self, geometry: gpd.GeoSeries) -> np.ndarray:
         """Returns flood depth for multiple locations in a vectorized way; must be implemented by subclasses."""
         pass
+
+    def get_depth_with_coverage(
+        self, geometry: gpd.GeoSeries
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns flood depths and a boolean mask of the locations the grid covers; by default every location is covered."""
+        depths = self.get_depth_vectorized(geometry)
+        return depths, np.ones(depths.shape, dtype=bool)
+
+    def get_depth_with_coverage_xy(
+        self, x: np.ndarray, y: np.ndarray, crs: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns flood depths and the coverage mask at coordinate arrays; by default through a GeoSeries of points."""
+        return self.get_depth_with_coverage(
+            gpd.GeoSeries(gpd.points_from_xy(x, y), crs=crs)
+        )
+
+    @abstractmethod
+    def extent(self) -> gpd.GeoSeries:
+        """Returns the area covered by the grid as a GeoSeries in the grid CRS, e.g. to filter inventories; must be implemented by subclasses."""
+        pass
+
+    def get_zonal_depth_with_coverage(
+        self, footprints: gpd.GeoSeries, stat: str = "max"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a depth statistic over each building footprint and the coverage mask.
+
+        Grids without zonal support sample each footprint at its representative
+        point, whatever the statistic.
+
+        Args:
+            footprints (GeoSeries): Building footprint polygons.
+            stat (str): "max", "mean" or "min".
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Depth per footprint and the boolean coverage mask.
+        """
+        return self.get_depth_with_coverage(footprints.representative_point())
+
+    def get_zonal_depth(self, footprints: gpd.GeoSeries, stat: str = "max") -> np.ndarray:
+        """Returns a depth statistic over each building footprint."""
+        depths, _ = self.get_zonal_depth_with_coverage(footprints, stat)
+        return depths
+
+
+def depths_with_coverage(
+    depth_grid: AbstractFloodDepthGrid, geometry: gpd.GeoSeries
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Samples a depth grid and its coverage mask, accepting grids that only provide
+    `get_depth_vectorized` (treated as covering every location).
+
+    Args:
+        depth_grid (AbstractFloodDepthGrid): The depth grid.
+        geometry (GeoSeries): Building locations.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Flood depths and the boolean coverage mask.
+    """
+    if hasattr(depth_grid, "get_depth_with_coverage"):
+        return depth_grid.get_depth_with_coverage(geometry)
+    depths = np.asarray(depth_grid.get_depth_vectorized(geometry), dtype=float)
+    return depths, np.ones(depths.shape, dtype=bool)
+
+
+def building_depths_with_coverage(
+    depth_grid: AbstractFloodDepthGrid, buildings: AbstractBuildingPoints
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Samples a depth grid at the buildings' coordinate arrays, without building point
+    geometries when the grid accepts coordinates directly.
+
+    Args:
+        depth_grid (AbstractFloodDepthGrid): The depth grid.
+        buildings (AbstractBuildingPoints): The buildings.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Flood depths and the boolean coverage mask.
+    """
+    if hasattr(depth_grid, "get_depth_with_coverage_xy"):
+        return depth_grid.get_depth_with_coverage_xy(buildings.x, buildings.y, buildings.crs)
+    points = gpd.GeoSeries(
+        gpd.points_from_xy(buildings.x, buildings.y),
+        index=buildings.frame.index,
+        crs=buildings.crs,
+    )
+    return depths_with_coverage(depth_grid, points)
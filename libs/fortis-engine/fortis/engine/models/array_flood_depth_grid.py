@@ -0,0 +1,308 @@
+from typing import Any, Optional, Tuple
+import numpy as np
+import geopandas as gpd
+import rasterio
+import shapely
+from affine import Affine
+from pyproj import CRS
+from rasterio.transform import array_bounds
+from rasterio.windows import Window
+from .abstract_flood_depth_grid import AbstractFloodDepthGrid
+from .flood_depth_grid import INTERPOLATION_MODES, NODATA_FALLBACKS, OUT_OF_BOUNDS_MODES
+from .reprojection import project_coordinates, projected_xy
+from .zonal_sampling import ZONAL_STATS, fill_slivers, zonal_reduce
+from .raster_sampling import (
+    bilinear_neighbours,
+    interpolate_bilinear,
+    nodata_mask,
+    pixel_indices,
+)
+
+# Window size used to batch footprints for zonal statistics.
+ZONAL_BLOCK_SHAPE = (256, 256)
+
+
+class ArrayFloodDepthGrid(AbstractFloodDepthGrid):
+    """
+    Flood depth grid held in a NumPy array, without any file I/O.
+
+    Coordinates are turned into pixel indices with the inverse affine transform and
+    gathered with a single fancy-indexing operation, which suits depth grids produced
+    in memory, benchmarks that should not measure I/O and fast tests.
+    """
+
+    def __init__(
+        self,
+        array: np.ndarray,
+        transform: Affine,
+        crs: Any,
+        nodata: Optional[float] = None,
+        interpolation: str = "nearest",
+        nodata_fallback: str = "nearest",
+        out_of_bounds: str = "raise",
+        fill_value: float = np.nan,
+    ):
+        """
+        Initializes an ArrayFloodDepthGrid object.
+
+        Args:
+            array (np.ndarray): 2D array of depths, rows from north to south.
+            transform (Affine): Affine transform from pixel to CRS coordinates.
+            crs: CRS of the grid (anything pyproj accepts, e.g. "EPSG:4326").
+            nodata (float, optional): Value marking missing depths.  NaN is always missing.
+            interpolation (str): "nearest" or "bilinear", as for FloodDepthGrid.
+            nodata_fallback (str): "nearest" or "ignore", as for FloodDepthGrid.
+            out_of_bounds (str): "raise" or "mask", as for FloodDepthGrid.
+            fill_value (float): Depth returned for uncovered points when out_of_bounds="mask".
+        """
+        array = np.asarray(array)
+        if array.ndim != 2:
+            raise ValueError(f"array must be 2D, got {array.ndim} dimensions.")
+        if interpolation not in INTERPOLATION_MODES:
+            raise ValueError(
+                f"interpolation must be one of {INTERPOLATION_MODES}, got '{interpolation}'."
+            )
+        if nodata_fallback not in NODATA_FALLBACKS:
+            raise ValueError(
+                f"nodata_fallback must be one of {NODATA_FALLBACKS}, got '{nodata_fallback}'."
+            )
+        if out_of_bounds not in OUT_OF_BOUNDS_MODES:
+            raise ValueError(
+                f"out_of_bounds must be one of {OUT_OF_BOUNDS_MODES}, got '{out_of_bounds}'."
+            )
+        self.array = array
+        self.transform = transform
+        self.crs = CRS.from_user_input(crs)
+        self.nodata = nodata
+        self.interpolation = interpolation
+        self.nodata_fallback = nodata_fallback
+        self.out_of_bounds = out_of_bounds
+        self.fill_value = fill_value
+        self.height, self.width = array.shape
+        west, south, east, north = array_bounds(self.height, self.width, transform)
+        self.bounds = rasterio.coords.BoundingBox(west, south, east, north)
+
+    @classmethod
+    def from_file(cls, data_source: str, band: int = 1, **kwargs) -> "ArrayFloodDepthGrid":
+        """
+        Reads one band of a raster into memory.
+
+        Args:
+            data_source (str): Path to the raster file.
+            band (int): Band to read.
+            **kwargs: Passed to the ArrayFloodDepthGrid constructor.
+
+        Returns:
+            ArrayFloodDepthGrid: The in-memory grid.
+        """
+        with rasterio.open(data_source) as dataset:
+            return cls(
+                dataset.read(band), dataset.transform, dataset.crs, dataset.nodata, **kwargs
+            )
+
+    def get_depth(self, lon: float, lat: float) -> float:
+        """
+        Extracts flood depth value at a given location.
+
+        Args:
+            lon (float): X coordinate in the grid CRS.
+            lat (float): Y coordinate in the grid CRS.
+
+        Returns:
+            float: Flood depth value.
+        """
+        x, y = np.array([lon], dtype=float), np.array([lat], dtype=float)
+        if not self._coverage(x, y)[0]:
+            if self.out_of_bounds == "mask":
+                return self.fill_value
+            raise ValueError(f"Coordinates ({lon}, {lat}) are outside raster bounds.")
+        return float(self.sample_coordinates(x, y)[0])
+
+    def get_depth_vectorized(self, geometry: gpd.GeoSeries) -> np.ndarray:
+        """
+        Extracts flood depth for multiple locations in a vectorized way, handling NoData.
+
+        Args:
+            geometry (GeoSeries): A GeoSeries of Point geometries.
+
+        Returns:
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData
+            and `fill_value` for points outside the grid when out_of_bounds="mask".
+        """
+        depths, _ = self.get_depth_with_coverage(geometry)
+        return depths
+
+    def get_depth_with_coverage(
+        self, geometry: gpd.GeoSeries
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts flood depths together with a mask of the points inside the grid.
+
+        Args:
+            geometry (GeoSeries): A GeoSeries of Point geometries.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Flood depths (`fill_value` where uncovered)
+            and the boolean coverage mask.
+
+        Raises:
+            TypeError: If `geometry` is not a GeoSeries.
+            ValueError: If the GeoSeries has no CRS, or any point is outside the grid
+                and out_of_bounds="raise".
+        """
+        if not isinstance(geometry, gpd.GeoSeries):
+            raise TypeError("geometry must be a GeoSeries.")
+        if geometry.crs is None:
+            raise ValueError("GeoSeries must have a CRS set.")
+
+        return self._depths_with_coverage(*projected_xy(geometry, self.crs))
+
+    def get_depth_with_coverage_xy(
+        self, x: np.ndarray, y: np.ndarray, crs: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts flood depths and the coverage mask at coordinate arrays.
+
+        Args:
+            x (np.ndarray): X coordinates.
+            y (np.ndarray): Y coordinates.
+            crs: CRS of the coordinates.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Flood depths and the boolean coverage mask.
+        """
+        return self._depths_with_coverage(*project_coordinates(x, y, crs, self.crs))
+
+    def _depths_with_coverage(
+        self, x: np.ndarray, y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples grid-CRS coordinates, applying the out_of_bounds mode."""
+        covered = self._coverage(x, y)
+        if self.out_of_bounds == "raise" and not covered.all():
+            raise ValueError("Some coordinates are outside the raster bounds.")
+
+        depths = np.full(len(x), self.fill_value, dtype=float)
+        if covered.any():
+            depths[covered] = self.sample_coordinates(x[covered], y[covered])
+        return depths, covered
+
+    def get_zonal_depth_with_coverage(
+        self, footprints: gpd.GeoSeries, stat: str = "max", all_touched: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reduces the depths under every building footprint to one value per building.
+
+        Behaves like `FloodDepthGrid.get_zonal_depth_with_coverage`, slicing the array
+        instead of reading raster windows.
+
+        Args:
+            footprints (GeoSeries): Building footprint polygons.
+            stat (str): "max", "mean" or "min" of the valid depths under the footprint.
+            all_touched (bool): Use every pixel touched by the footprint.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Depth per footprint and the boolean mask of
+            footprints intersecting the grid.
+        """
+        if not isinstance(footprints, gpd.GeoSeries):
+            raise TypeError("footprints must be a GeoSeries.")
+        if footprints.crs is None:
+            raise ValueError("GeoSeries must have a CRS set.")
+        if stat not in ZONAL_STATS:
+            raise ValueError(f"stat must be one of {ZONAL_STATS}, got '{stat}'.")
+
+        if footprints.crs != self.crs:
+            footprints = footprints.to_crs(self.crs)
+        geoms = footprints.to_numpy()
+        covered = shapely.intersects(geoms, shapely.box(*self.bounds))
+        if self.out_of_bounds == "raise" and not covered.all():
+            raise ValueError("Some footprints are outside the raster bounds.")
+
+        depths = np.full(len(geoms), self.fill_value, dtype=float)
+        if not covered.any():
+            return depths, covered
+
+        values, counts = zonal_reduce(
+            geoms[covered],
+            self._read_window,
+            self.transform,
+            self.height,
+            self.width,
+            ZONAL_BLOCK_SHAPE,
+            self.nodata,
+            stat,
+            all_touched,
+        )
+        fill_slivers(
+            values, counts, geoms[covered], self._coverage, self.sample_coordinates
+        )
+        depths[covered] = values
+        return depths, covered
+
+    def extent(self) -> gpd.GeoSeries:
+        """Returns the grid bounds as a one-polygon GeoSeries in the grid CRS."""
+        return gpd.GeoSeries([shapely.box(*self.bounds)], crs=self.crs)
+
+    def sample_coordinates(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Samples the grid at grid-CRS coordinates inside its bounds.
+
+        Args:
+            x (np.ndarray): X coordinates in the grid CRS.
+            y (np.ndarray): Y coordinates in the grid CRS.
+
+        Returns:
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData.
+        """
+        if self.interpolation == "bilinear":
+            rows, cols, weights = bilinear_neighbours(
+                self.transform, x, y, self.height, self.width
+            )
+            values = self.sample_pixels(rows.ravel(), cols.ravel()).reshape(rows.shape)
+            return interpolate_bilinear(values, weights, self.nodata_fallback)
+
+        rows, cols, _ = pixel_indices(self.transform, x, y, self.height, self.width)
+        return self.sample_pixels(rows, cols)
+
+    def pixel_layout(self) -> Tuple[Any, Affine, int, int]:
+        """Returns the (CRS, transform, height, width) that pixel indices refer to."""
+        return self.crs, self.transform, self.height, self.width
+
+    def sample_pixels(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Gathers values at integer pixel indices inside the grid.
+
+        Args:
+            rows (np.ndarray): Row indices.
+            cols (np.ndarray): Column indices.
+
+        Returns:
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData.
+        """
+        values = self.array[rows, cols].astype(float)
+        values[nodata_mask(values, self.nodata)] = np.nan
+        return values
+
+    def _coverage(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Returns True for every coordinate inside the grid bounds."""
+        return (
+            (x >= self.bounds.left) & (x <= self.bounds.right)
+            & (y >= self.bounds.bottom) & (y <= self.bounds.top)
+        )
+
+    def _read_window(self, window: Window) -> np.ndarray:
+        """Returns a window of the array."""
+        return self.array[
+            window.row_off : window.row_off + window.height,
+            window.col_off : window.col_off + window.width,
+        ]
+
+    def close(self):
+        """Releases nothing; present for parity with the file-backed grids."""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+import numpy as np
+
+
+class BlockCache:
+    """
+    Least-recently-used cache of decoded raster blocks bounded by a byte budget.
+
+    Blocks are stored as the NumPy arrays returned by the loader. When adding a block
+    would exceed the budget, the least recently used blocks are evicted first. Blocks
+    larger than the whole budget are returned but never stored.  The cache is safe
+    to share between threads; blocks are decoded outside the lock.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initializes a BlockCache object.
+
+        Args:
+            max_bytes (int): Maximum number of bytes of block data to keep. 0 disables caching.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be zero or positive.")
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._blocks: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Returns the cached block for `key`, calling `loader` on a miss.
+
+        Args:
+            key (Hashable): Block key, e.g. (band, block_row, block_col).
+            loader (Callable[[], np.ndarray]): Reads and decodes the block.
+
+        Returns:
+            np.ndarray: The block data.
+        """
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self.hits += 1
+                self._blocks.move_to_end(key)
+                return block
+            self.misses += 1
+
+        block = loader()
+        with self._lock:
+            self._put(key, block)
+        return block
+
+    def _put(self, key: Hashable, block: np.ndarray) -> None:
+        """Stores a block, evicting least recently used blocks to stay within budget."""
+        if block.nbytes > self.max_bytes or key in self._blocks:
+            return
+        while self._blocks and self.current_bytes + block.nbytes > self.max_bytes:
+            _, evicted = self._blocks.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            self.evictions += 1
+        self._blocks[key] = block
+        self.current_bytes += block.nbytes
+
+    def clear(self) -> None:
+        """Drops all cached blocks.  Counters are kept."""
+        with self._lock:
+            self._blocks.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache counters and current usage."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "blocks": len(self._blocks),
+            "current_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._blocks)
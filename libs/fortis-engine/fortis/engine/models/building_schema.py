@@ -0,0 +1,79 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+from fortis.engine.models.building_mapping import BuildingMapping
+
+FLOAT_DTYPES = ("float32", "float64")
+
+
+class BuildingSchema:
+    """
+    Declared column types for building inventories, applied at load time.
+
+    Occupancy codes become a categorical, foundation type and number of stories
+    small integers, and costs, areas, heights and depths use `float_dtype`.  Columns
+    of the mapping that are missing from the inventory are ignored.
+    """
+
+    def __init__(self, float_dtype: str = "float32"):
+        """
+        Initializes a BuildingSchema object.
+
+        Args:
+            float_dtype (str): "float32" or "float64" for costs, areas, heights,
+                depths and every float column the analyses add.
+        """
+        if float_dtype not in FLOAT_DTYPES:
+            raise ValueError(
+                f"float_dtype must be one of {FLOAT_DTYPES}, got '{float_dtype}'."
+            )
+        self.float_dtype = np.dtype(float_dtype)
+
+    def dtypes(self, fields: BuildingMapping) -> Dict[str, str]:
+        """
+        Returns the declared dtype of every input column of the mapping.
+
+        Args:
+            fields (BuildingMapping): The inventory's field mapping.
+
+        Returns:
+            Dict[str, str]: Column name to dtype.
+        """
+        float_name = self.float_dtype.name
+        return {
+            fields.occupancy_type: "category",
+            fields.foundation_type: "int8",
+            fields.number_stories: "int8",
+            fields.first_floor_height: float_name,
+            fields.area: float_name,
+            fields.building_cost: float_name,
+            fields.content_cost: float_name,
+            fields.inventory_cost: float_name,
+            fields.flood_depth: float_name,
+            fields.depth_in_structure: float_name,
+        }
+
+    def apply(self, df: pd.DataFrame, fields: BuildingMapping) -> pd.DataFrame:
+        """
+        Casts the inventory columns to the declared dtypes, in place.
+
+        Integer columns with missing values use the nullable "Int8" instead.
+
+        Args:
+            df (pd.DataFrame): The loaded inventory.
+            fields (BuildingMapping): The inventory's field mapping.
+
+        Returns:
+            pd.DataFrame: `df`, for chaining.
+        """
+        for column, dtype in self.dtypes(fields).items():
+            if column not in df.columns:
+                continue
+            if dtype == "int8" and df[column].isna().any():
+                dtype = "Int8"
+            df[column] = df[column].astype(dtype)
+        return df
+
+
+# Schema with every compact option enabled.
+COMPACT_SCHEMA = BuildingSchema(float_dtype="float32")
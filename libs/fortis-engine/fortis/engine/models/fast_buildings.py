@@ -1,58 +1,164 @@
 import os
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
+from fortis.engine.models.building_schema import BuildingSchema
+
+# Default overrides for the building mapping of FAST UDF files.
+FAST_OVERRIDES = {
+    "id": "FltyId",
+    "occupancy_type": "Occ",
+    # All of these below here should be the defaults but if that changes overridding
+    "first_floor_height": "FirstFloorHt",
+    "foundation_type": "FoundationType",
+    "number_stories": "NumStories",
+    "area": "Area",
+    "building_cost": "Cost",
+    "content_cost": "ContentCost",
+    "inventory_cost": "InventoryCostUSD",
+    # These can be added if missing below this line
+    "flood_depth": "FloodDepth",
+    "depth_in_structure": "DepthInStructure",
+    "bddf_id": "BldgDamageFnID",
+    "building_damage_percent": "BldgDmgPct",
+    "building_loss": "BldgLossUSD",
+    "cddf_id": "CDDF_ID",
+    "content_damage_percent": "ContDmgPct",
+    "content_loss": "ContentLossUSD",
+    "iddf_id": "IDDF_ID",
+    "inventory_damage_percent": "InvDmgPct",
+    "inventory_loss": "InventoryLossUSD",
+    "debris_finish": "DebrisFinish",
+    "debris_foundation": "DebrisFoundation",
+    "debris_structure": "DebrisStructure",
+    "debris_total": "DebrisTotal",
+}
+
 
 class FastBuildings(AbstractBuildingPoints):
-    def __init__(self, csv_file: str):
-        
-        # Provide the default overrides for the building mapping
-        overrides = {
-            "id": "FltyId",
-            "occupancy_type": "Occ",
-            # All of these below here should be the defaults but if that changes overridding
-            "first_floor_height": "FirstFloorHt",
-            "foundation_type": "FoundationType",
-            "number_stories": "NumStories",
-            "area": "Area",
-            "building_cost": "Cost",
-            "content_cost": "ContentCost",
-            "inventory_cost": "InventoryCostUSD",
-            # These can be added if missing below this line
-            "flood_depth": "FloodDepth",
-            "depth_in_structure": "DepthInStructure",
-            "bddf_id": "BldgDamageFnID",
-            "building_damage_percent": "BldgDmgPct",
-            "building_loss": "BldgLossUSD",
-            "cddf_id": "CDDF_ID",
-            "content_damage_percent": "ContDmgPct",
-            "content_loss": "ContentLossUSD",
-            "iddf_id": "IDDF_ID",
-            "inventory_damage_percent": "InvDmgPct",
-            "inventory_loss": "InventoryLossUSD",
-            "debris_finish": "DebrisFinish",
-            "debris_foundation": "DebrisFoundation",
-            "debris_structure": "DebrisStructure",
-            "debris_total": "DebrisTotal",
-        }
-
-        super().__init__(overrides)
-
-        # If csv_file does not have a drive letter, assume relative to cwd.
-        drive, _ = os.path.splitdrive(csv_file)
-        if not drive:
-            csv_path = os.path.join(os.getcwd(), csv_file)
-        else:
-            csv_path = csv_file
+    def __init__(
+        self,
+        csv_file: str,
+        spatial_order: Optional[str] = None,
+        schema: Optional[BuildingSchema] = None,
+        cache_dir: Optional[str] = None,
+        mapped_columns_only: bool = False,
+    ):
+        """
+        Initializes FastBuildings from a FAST UDF CSV file.
 
+        Args:
+            csv_file (str): Path to the CSV file.  Relative paths are resolved against the cwd.
+            spatial_order (str, optional): "hilbert" or "morton" to sort the buildings along
+                a space-filling curve after loading.  See `spatial_sort`.
+            schema (BuildingSchema, optional): Column types applied at load time, e.g.
+                `COMPACT_SCHEMA`.  Defaults to pandas type inference.
+            cache_dir (str, optional): Directory of the binary inventory cache.  The
+                parsed buildings are stored there keyed by the CSV contents, mapping,
+                columns and schema, and later runs load them without parsing the CSV.
+            mapped_columns_only (bool): Load only the columns named in the building
+                mapping plus the coordinates.
+        """
+        super().__init__(FAST_OVERRIDES)
+
+        csv_path = _resolve_path(csv_file)
+        columns = self._mapped_columns(csv_path) if mapped_columns_only else None
         # Load the GeoDataFrame from the CSV file
-        df = pd.read_csv(csv_path)
-        # Vectorized loading of the geodataframe from x y columns
-        gdf = gpd.GeoDataFrame(
-            df, geometry=gpd.points_from_xy(df.Longitude, df.Latitude), crs="EPSG:4326"
+        self._load_with_cache(
+            csv_path,
+            lambda: _with_coordinates(pd.read_csv(csv_path, usecols=columns)),
+            cache_dir,
+            columns,
+            schema,
         )
-        self._gdf = gdf
+        if spatial_order is not None:
+            self.spatial_sort(spatial_order)
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        spatial_order: Optional[str] = None,
+        schema: Optional[BuildingSchema] = None,
+    ) -> "FastBuildings":
+        """
+        Builds FastBuildings from an already loaded FAST UDF table.
+
+        Args:
+            df (pd.DataFrame): FAST UDF rows with Longitude/Latitude columns.
+            spatial_order (str, optional): "hilbert" or "morton", see `spatial_sort`.
+            schema (BuildingSchema, optional): Column types to apply.
+
+        Returns:
+            FastBuildings: The buildings, keeping the index of `df`.
+        """
+        buildings = cls.__new__(cls)
+        AbstractBuildingPoints.__init__(buildings, FAST_OVERRIDES)
+        buildings._set_frame(*_with_coordinates(df))
+        if schema is not None:
+            buildings.apply_schema(schema)
+        if spatial_order is not None:
+            buildings.spatial_sort(spatial_order)
+        return buildings
+
+    @classmethod
+    def iter_csv(
+        cls,
+        csv_file: str,
+        chunk_size: int,
+        spatial_order: Optional[str] = None,
+        schema: Optional[BuildingSchema] = None,
+    ) -> Iterator["FastBuildings"]:
+        """
+        Reads a FAST UDF CSV file in chunks of at most `chunk_size` buildings.
+
+        The row index keeps counting across chunks, so every building keeps the
+        label it would have when the whole file is loaded.
+
+        Args:
+            csv_file (str): Path to the CSV file.  Relative paths are resolved against the cwd.
+            chunk_size (int): Number of buildings per chunk.
+            spatial_order (str, optional): "hilbert" or "morton", applied within each chunk.
+            schema (BuildingSchema, optional): Column types applied to each chunk.
+
+        Yields:
+            FastBuildings: One chunk of buildings.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        with pd.read_csv(_resolve_path(csv_file), chunksize=chunk_size) as reader:
+            for df in reader:
+                yield cls.from_dataframe(df, spatial_order, schema)
+
+    def _mapped_columns(self, csv_path: str) -> List[str]:
+        """Returns the CSV columns named in the mapping plus the coordinates, in file order."""
+        wanted = set(self.fields.get_values().values()) | {"Longitude", "Latitude"}
+        header = pd.read_csv(csv_path, nrows=0).columns
+        return [column for column in header if column in wanted]
 
     @property
     def gdf(self) -> gpd.GeoDataFrame:
-        return self._gdf
\ No newline at end of file
+        """The buildings GeoDataFrame; the point geometry is built on first access."""
+        return self._geodataframe()
+
+
+def _resolve_path(csv_file: str) -> str:
+    """If csv_file does not have a drive letter, assume relative to cwd."""
+    drive, _ = os.path.splitdrive(csv_file)
+    if not drive:
+        return os.path.join(os.getcwd(), csv_file)
+    return csv_file
+
+
+def _with_coordinates(
+    df: pd.DataFrame,
+) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray, str]:
+    """Pairs a UDF table with views of its x y columns; no geometry is built."""
+    return (
+        df,
+        df["Longitude"].to_numpy(dtype=float),
+        df["Latitude"].to_numpy(dtype=float),
+        "EPSG:4326",
+    )
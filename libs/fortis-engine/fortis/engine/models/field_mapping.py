@@ -47,6 +47,10 @@ class FieldMapping(Generic[T]):
         """Retrieves the current value for the given internal property name."""
         return self._values.get(property_name)
 
+    def get_values(self) -> Dict[str, str]:
+        """Returns a copy of every internal property name and its current value."""
+        return dict(self._values)
+
     def set_value(self, property_name: str, value: str) -> None:
         """Sets the value for the given internal property name."""
         self._values[property_name] = value
@@ -1,19 +1,162 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple
 import numpy as np
 import geopandas as gpd
 import rasterio
+import shapely
+from affine import Affine
+from rasterio.windows import Window
 from .abstract_flood_depth_grid import AbstractFloodDepthGrid
+from .block_cache import BlockCache
+from .reprojection import project_coordinates, projected_xy
+from .wet_mask import WetMask
+from .zonal_sampling import ZONAL_STATS, fill_slivers, zonal_reduce
+from .raster_sampling import (
+    bilinear_neighbours,
+    block_window,
+    gather_from_blocks,
+    interpolate_bilinear,
+    nodata_mask,
+    pixel_indices,
+)
+
+SAMPLING_MODES = ("point", "block")
+PRELOAD_MODES = ("memory", "memmap")
+INTERPOLATION_MODES = ("nearest", "bilinear")
+NODATA_FALLBACKS = ("nearest", "ignore")
+OUT_OF_BOUNDS_MODES = ("raise", "mask")
+DEFAULT_CACHE_BYTES = 128 * 1024 * 1024
 
 
 class FloodDepthGrid(AbstractFloodDepthGrid):
-    def __init__(self, data_source: str):
+    def __init__(
+        self,
+        data_source: str,
+        sampling: str = "point",
+        cache_bytes: Optional[int] = None,
+        preload: Optional[str] = None,
+        memmap_path: Optional[str] = None,
+        interpolation: str = "nearest",
+        nodata_fallback: str = "nearest",
+        out_of_bounds: str = "raise",
+        fill_value: float = np.nan,
+        workers: int = 1,
+        skip_dry: bool = False,
+        wet_mask_path: Optional[str] = None,
+        dry_value: float = 0.0,
+    ):
         """
         Initializes a FloodDepthGrid object.
 
         Args:
             data_source (str): Path to the raster file.
+            sampling (str): How `get_depth_vectorized` reads the raster.
+                "point" samples each coordinate through `DatasetReader.sample`, or
+                gathers from the band when it is preloaded.
+                "block" converts coordinates to pixel indices with the inverse
+                affine transform, reads every touched raster block once and
+                gathers the depths with NumPy indexing.
+            cache_bytes (int, optional): Byte budget of the LRU cache of decoded
+                blocks used by block reads (sampling="block", bilinear, or
+                `sample_pixels`).  0 disables the cache.  Defaults to
+                `DEFAULT_CACHE_BYTES`.  Passing it where the cache is never used, with
+                preload or with nearest point sampling, raises a ValueError.
+            preload (str, optional): "memory" reads the whole band into RAM once.
+                "memmap" writes an uncompressed copy of the band to `memmap_path`
+                (reused while newer than the raster) and memory-maps it.  Depths are
+                then gathered from the array without decoding, in either sampling
+                mode and by `get_depth`.
+            memmap_path (str, optional): Location of the uncompressed copy used by
+                preload="memmap".  Defaults to `<data_source>.band1.npy`.
+            interpolation (str): "nearest" returns the value of the cell containing
+                the point.  "bilinear" interpolates between the four surrounding cell
+                centres; the neighbours are gathered through block reads in a single
+                pass whatever the sampling mode.
+            nodata_fallback (str): For bilinear interpolation, "nearest" uses the
+                nearest cell when any neighbour is NoData; "ignore" interpolates
+                over the valid neighbours only.
+            out_of_bounds (str): "raise" rejects a batch containing any point outside
+                the raster.  "mask" returns `fill_value` for those points and reports
+                them through `get_depth_with_coverage`.
+            fill_value (float): Depth returned for uncovered points when out_of_bounds="mask".
+            workers (int): Number of threads used for block reads.  Points are
+                partitioned by block window and every worker thread reads through
+                its own dataset handle, since a DatasetReader cannot be shared
+                between threads.  GDAL releases the GIL while decoding.
+            skip_dry (bool): Consult a wet mask of the blocks holding any positive
+                depth and return `dry_value` for points in dry blocks without reading
+                pixels.  Needs block reads (sampling="block", bilinear or preload);
+                a ValueError is raised otherwise.
+            wet_mask_path (str, optional): Where the wet mask is persisted.  Defaults
+                to `<data_source>.wetmask.npz`; it is built on first use.
+            dry_value (float): Depth returned for points in dry blocks.  Defaults to
+                0.0, i.e. not flooded, which is what the pixels of a dry block hold
+                except for NoData pixels: those read as NaN without skip_dry.  Pass
+                np.nan to treat dry blocks as uncovered instead.
         """
+        if sampling not in SAMPLING_MODES:
+            raise ValueError(
+                f"sampling must be one of {SAMPLING_MODES}, got '{sampling}'."
+            )
+        if preload is not None and preload not in PRELOAD_MODES:
+            raise ValueError(
+                f"preload must be one of {PRELOAD_MODES}, got '{preload}'."
+            )
+        if interpolation not in INTERPOLATION_MODES:
+            raise ValueError(
+                f"interpolation must be one of {INTERPOLATION_MODES}, got '{interpolation}'."
+            )
+        if nodata_fallback not in NODATA_FALLBACKS:
+            raise ValueError(
+                f"nodata_fallback must be one of {NODATA_FALLBACKS}, got '{nodata_fallback}'."
+            )
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if out_of_bounds not in OUT_OF_BOUNDS_MODES:
+            raise ValueError(
+                f"out_of_bounds must be one of {OUT_OF_BOUNDS_MODES}, got '{out_of_bounds}'."
+            )
+        # Nearest point sampling without a preloaded band reads no blocks.
+        block_reads = sampling == "block" or interpolation == "bilinear" or preload is not None
+        if skip_dry and not block_reads:
+            raise ValueError(
+                "skip_dry needs block reads: use sampling='block', "
+                "interpolation='bilinear' or preload."
+            )
+        if cache_bytes is not None and preload is not None:
+            raise ValueError(
+                "cache_bytes has no effect with preload: blocks are read from the preloaded band."
+            )
+        if cache_bytes is not None and not block_reads:
+            raise ValueError(
+                "cache_bytes only applies to block reads: use sampling='block' or "
+                "interpolation='bilinear' (preload reads from memory and needs no cache)."
+            )
         self.data_source = data_source
+        self.sampling = sampling
+        self.interpolation = interpolation
+        self.nodata_fallback = nodata_fallback
+        self.out_of_bounds = out_of_bounds
+        self.fill_value = fill_value
+        self.workers = workers
+        self.skip_dry = skip_dry
+        self.wet_mask_path = wet_mask_path
+        self.dry_value = dry_value
+        self._wet_mask: Optional[WetMask] = None
         self.data = rasterio.open(self.data_source)
+        self._owner_thread = threading.get_ident()
+        self._thread_local = threading.local()
+        self._thread_handles: List[rasterio.DatasetReader] = []
+        self._handles_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.cache = BlockCache(DEFAULT_CACHE_BYTES if cache_bytes is None else cache_bytes)
+        self._band: Optional[np.ndarray] = None
+        if preload == "memory":
+            self._band = self.data.read(1)
+        elif preload == "memmap":
+            self._band = self._open_memmap(memmap_path or f"{data_source}.band1.npy")
 
     def get_depth(self, lon: float, lat: float) -> float:
         """
@@ -29,8 +172,15 @@ class FloodDepthGrid(AbstractFloodDepthGrid):
         # Check if the point is within the raster bounds.  Important for efficiency and correctness.
         if not (self.data.bounds.left <= lon <= self.data.bounds.right and
                 self.data.bounds.bottom <= lat <= self.data.bounds.top):
+            if self.out_of_bounds == "mask":
+                return self.fill_value
             raise ValueError(f"Coordinates ({lon}, {lat}) are outside raster bounds.")
-        
+
+        if self.interpolation == "bilinear":
+            return float(self._sample_bilinear(np.array([lon]), np.array([lat]))[0])
+        if self._band is not None:
+            return float(self._sample_blocks(np.array([lon]), np.array([lat]))[0])
+
         # Use sample to efficiently extract the value.
         try:
             for val in self.data.sample([(lon, lat)], indexes=1):  # Specify indexes=1 to get band 1
@@ -51,11 +201,35 @@ class FloodDepthGrid(AbstractFloodDepthGrid):
             geometry (GeoSeries): A GeoSeries of Point geometries (EPSG:4326).
 
         Returns:
-            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData.
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData
+            and `fill_value` for points outside the raster when out_of_bounds="mask".
 
         Raises:
             TypeError: If `geometry` is not a GeoSeries or if elements are not Points.
-            ValueError: If any coordinates are outside raster bounds.
+            ValueError: If any coordinates are outside raster bounds and out_of_bounds="raise".
+            TypeError: If self.data is not a rasterio DatasetReader.
+        """
+        depths, _ = self.get_depth_with_coverage(geometry)
+        return depths
+
+    def get_depth_with_coverage(
+        self, geometry: gpd.GeoSeries
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts flood depths together with a mask of the points inside the raster.
+
+        The bounds test runs on coordinate arrays and only covered points are sampled.
+
+        Args:
+            geometry (GeoSeries): A GeoSeries of Point geometries.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Flood depths (`fill_value` where uncovered)
+            and the boolean coverage mask.
+
+        Raises:
+            TypeError: If `geometry` is not a GeoSeries or if elements are not Points.
+            ValueError: If any coordinates are outside raster bounds and out_of_bounds="raise".
             TypeError: If self.data is not a rasterio DatasetReader.
         """
 
@@ -71,26 +245,134 @@ class FloodDepthGrid(AbstractFloodDepthGrid):
         if geometry.crs is None:
             raise ValueError("GeoSeries must have a CRS set.")
         
-        # Reproject geometry IF NECESSARY.  This is the key change.
-        if geometry.crs != self.data.crs:
-            geometry = geometry.to_crs(self.data.crs)
-        
-        # Reproject geometry IF NECESSARY.  This is the key change.
-        if geometry.crs != self.data.crs:
-            geometry = geometry.to_crs(self.data.crs)
+        # Reproject the raw coordinates IF NECESSARY, reusing earlier projections
+        # of the same buildings into this CRS.
+        return self._depths_with_coverage(*projected_xy(geometry, self.data.crs))
+
+    def get_depth_with_coverage_xy(
+        self, x: np.ndarray, y: np.ndarray, crs
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts flood depths and the coverage mask at coordinate arrays.
+
+        Same as `get_depth_with_coverage` without any point geometry.
+
+        Args:
+            x (np.ndarray): X coordinates.
+            y (np.ndarray): Y coordinates.
+            crs: CRS of the coordinates.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Flood depths and the boolean coverage mask.
+        """
+        return self._depths_with_coverage(
+            *project_coordinates(x, y, crs, self.data.crs)
+        )
 
+    def _depths_with_coverage(
+        self, x: np.ndarray, y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples raster-CRS coordinates, applying the out_of_bounds mode."""
         # Check bounds for *all* points efficiently.
-        bounds = self.data.bounds
-        if not all(bounds.left <= pt.x <= bounds.right and bounds.bottom <= pt.y <= bounds.top for pt in geometry):
+        covered = self._coverage(x, y)
+        if self.out_of_bounds == "raise" and not covered.all():
             raise ValueError("Some coordinates are outside the raster bounds.")
 
+        depths = np.full(len(x), self.fill_value, dtype=float)
+        if covered.any():
+            depths[covered] = self.sample_coordinates(x[covered], y[covered])
+        return depths, covered
 
-        # Extract (x, y) tuples from the geometry
-        coords = [(pt.x, pt.y) for pt in geometry]
+    def get_zonal_depth_with_coverage(
+        self, footprints: gpd.GeoSeries, stat: str = "max", all_touched: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reduces the depths under every building footprint to one value per building.
+
+        Footprints are rasterized in batches, one raster window per group of
+        neighbouring footprints, and reduced with vectorized group operations (see
+        `zonal_reduce`).  Footprints too small to contain a pixel centre fall back
+        to the depth at their representative point.
+
+        Args:
+            footprints (GeoSeries): Building footprint polygons.
+            stat (str): "max", "mean" or "min" of the valid depths under the footprint.
+            all_touched (bool): Use every pixel touched by the footprint instead of
+                only those whose centre is inside it.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Depth per footprint (np.nan where only
+            NoData is covered, `fill_value` where uncovered) and the boolean mask of
+            footprints intersecting the raster.
+
+        Raises:
+            TypeError: If `footprints` is not a GeoSeries.
+            ValueError: If the GeoSeries has no CRS, `stat` is unknown, or a footprint
+                is outside the raster and out_of_bounds="raise".
+        """
+        if not isinstance(footprints, gpd.GeoSeries):
+            raise TypeError("footprints must be a GeoSeries.")
+        if footprints.crs is None:
+            raise ValueError("GeoSeries must have a CRS set.")
+        if stat not in ZONAL_STATS:
+            raise ValueError(f"stat must be one of {ZONAL_STATS}, got '{stat}'.")
+
+        if footprints.crs != self.data.crs:
+            footprints = footprints.to_crs(self.data.crs)
+        geoms = footprints.to_numpy()
+        covered = shapely.intersects(geoms, shapely.box(*self.data.bounds))
+        if self.out_of_bounds == "raise" and not covered.all():
+            raise ValueError("Some footprints are outside the raster bounds.")
+
+        depths = np.full(len(geoms), self.fill_value, dtype=float)
+        if not covered.any():
+            return depths, covered
+
+        try:
+            values, counts = zonal_reduce(
+                geoms[covered],
+                self._read_window,
+                self.data.transform,
+                self.data.height,
+                self.data.width,
+                self.data.block_shapes[0],
+                self.data.nodata,
+                stat,
+                all_touched,
+            )
+        except rasterio.RasterioIOError as e:
+            raise ValueError(f"Error during raster sampling: {e}")
+
+        fill_slivers(
+            values, counts, geoms[covered], self._coverage, self.sample_coordinates
+        )
+        depths[covered] = values
+        return depths, covered
+
+    def extent(self) -> gpd.GeoSeries:
+        """Returns the raster bounds as a one-polygon GeoSeries in the raster CRS."""
+        return gpd.GeoSeries([shapely.box(*self.data.bounds)], crs=self.data.crs)
+
+    def sample_coordinates(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Samples band 1 at raster-CRS coordinates with the configured sampling mode.
+
+        Args:
+            x (np.ndarray): X coordinates in the raster CRS, inside the raster bounds.
+            y (np.ndarray): Y coordinates in the raster CRS, inside the raster bounds.
+
+        Returns:
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData.
+        """
+        if self.interpolation == "bilinear":
+            return self._sample_bilinear(x, y)
+
+        if self.sampling == "block" or self._band is not None:
+            return self._sample_blocks(x, y)
 
         # Sample the raster for each coordinate, specifying the band index
         try:
-            samples = list(self.data.sample(coords, indexes=1))
+            samples = list(self.data.sample(list(zip(x, y)), indexes=1))
         except rasterio.RasterioIOError as e:
             raise ValueError(f"Error during raster sampling: {e}")
 
@@ -98,6 +380,187 @@ class FloodDepthGrid(AbstractFloodDepthGrid):
         result = np.array([float(val[0]) if val[0] != self.data.nodata else np.nan for val in samples])
         return result
     
+    def _sample_blocks(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Samples band 1 at the given raster-CRS coordinates using block reads.
+
+        Args:
+            x (np.ndarray): X coordinates in the raster CRS.
+            y (np.ndarray): Y coordinates in the raster CRS.
+
+        Returns:
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData.
+
+        """
+        rows, cols, _ = pixel_indices(
+            self.data.transform, x, y, self.data.height, self.data.width
+        )
+        return self.sample_pixels(rows, cols)
+
+    def _sample_bilinear(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Bilinearly interpolates band 1 at the given raster-CRS coordinates.
+
+        The four neighbours of every point are gathered in one block pass, so each
+        touched block is read once no matter how many corners fall inside it.
+
+        Args:
+            x (np.ndarray): X coordinates in the raster CRS.
+            y (np.ndarray): Y coordinates in the raster CRS.
+
+        Returns:
+            np.ndarray: Array of interpolated flood depths.  np.nan where no valid
+            neighbour is available.
+
+        """
+        rows, cols, weights = bilinear_neighbours(
+            self.data.transform, x, y, self.data.height, self.data.width
+        )
+        values = self.sample_pixels(rows.ravel(), cols.ravel()).reshape(rows.shape)
+        return interpolate_bilinear(values, weights, self.nodata_fallback)
+
+    def _coverage(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Returns True for every coordinate inside the raster bounds."""
+        bounds = self.data.bounds
+        return (
+            (x >= bounds.left) & (x <= bounds.right)
+            & (y >= bounds.bottom) & (y <= bounds.top)
+        )
+
+    def pixel_layout(self) -> Tuple[Any, Affine, int, int]:
+        """Returns the (CRS, transform, height, width) that pixel indices refer to."""
+        return self.data.crs, self.data.transform, self.data.height, self.data.width
+
+    def sample_pixels(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Gathers band 1 values at precomputed pixel indices using block reads.
+
+        With skip_dry, points in blocks the wet mask marks as dry get `dry_value`
+        without any pixel read, and a batch entirely within a dry region returns
+        before touching the raster.
+
+        Args:
+            rows (np.ndarray): Integer row indices inside the raster.
+            cols (np.ndarray): Integer column indices inside the raster.
+
+        Returns:
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData.
+        """
+        if not self.skip_dry or len(rows) == 0:
+            return self._gather(rows, cols)
+
+        block_height, block_width = self.data.block_shapes[0]
+        block_rows = rows // block_height
+        block_cols = cols // block_width
+        values = np.full(len(rows), self.dry_value, dtype=float)
+        if not self.wet_mask.any_wet(
+            int(block_rows.min()), int(block_rows.max()),
+            int(block_cols.min()), int(block_cols.max()),
+        ):
+            return values
+
+        wet = self.wet_mask.wet_blocks(block_rows, block_cols)
+        values[wet] = self._gather(rows[wet], cols[wet])
+        return values
+
+    def _gather(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """Reads the blocks touched by the indices (in parallel if configured) and masks NoData."""
+        if self.workers > 1 and self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="fortis-depth"
+            )
+        try:
+            values = gather_from_blocks(
+                self._read_block,
+                rows,
+                cols,
+                self.data.block_shapes[0],
+                executor=self._executor,
+                workers=self.workers,
+            )
+        except rasterio.RasterioIOError as e:
+            raise ValueError(f"Error during raster sampling: {e}")
+
+        values[nodata_mask(values, self.data.nodata)] = np.nan
+        return values
+
+    @property
+    def wet_mask(self) -> WetMask:
+        """The dry-area skip index, loaded from disk or built on first use."""
+        if self._wet_mask is None:
+            self._wet_mask = WetMask.load_or_build(self.data, self.wet_mask_path)
+        return self._wet_mask
+
+    def _read_window(self, window: Window) -> np.ndarray:
+        """Returns a window of band 1, from the preloaded band when available."""
+        if self._band is not None:
+            return self._band[
+                window.row_off : window.row_off + window.height,
+                window.col_off : window.col_off + window.width,
+            ]
+        return self.data.read(1, window=window)
+
+    def _read_block(self, block_row: int, block_col: int) -> np.ndarray:
+        """Returns a single block of band 1, from the preloaded band or the block cache."""
+        window = block_window(
+            block_row,
+            block_col,
+            self.data.block_shapes[0],
+            self.data.height,
+            self.data.width,
+        )
+        if self._band is not None:
+            return self._band[
+                window.row_off : window.row_off + window.height,
+                window.col_off : window.col_off + window.width,
+            ]
+        dataset = self._dataset_for_thread()
+        return self.cache.get(
+            (1, block_row, block_col), lambda: dataset.read(1, window=window)
+        )
+
+    def _dataset_for_thread(self) -> rasterio.DatasetReader:
+        """Returns the calling thread's dataset handle, opening one for worker threads."""
+        if threading.get_ident() == self._owner_thread:
+            return self.data
+        dataset = getattr(self._thread_local, "data", None)
+        if dataset is None:
+            dataset = rasterio.open(self.data_source)
+            self._thread_local.data = dataset
+            with self._handles_lock:
+                self._thread_handles.append(dataset)
+        return dataset
+
+    def _open_memmap(self, path: str) -> np.ndarray:
+        """
+        Memory-maps an uncompressed copy of band 1, writing it first if missing or stale.
+
+        Args:
+            path (str): Location of the .npy copy.
+
+        Returns:
+            np.ndarray: Read-only memory-mapped band.
+        """
+        shape = (self.data.height, self.data.width)
+        dtype = np.dtype(self.data.dtypes[0])
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(
+            self.data_source
+        ):
+            band = np.load(path, mmap_mode="r")
+            if band.shape == shape and band.dtype == dtype:
+                return band
+
+        # Decode block by block so the whole band never has to be held in RAM.
+        band = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+        for _, window in self.data.block_windows(1):
+            band[
+                window.row_off : window.row_off + window.height,
+                window.col_off : window.col_off + window.width,
+            ] = self.data.read(1, window=window)
+        band.flush()
+        del band
+        return np.load(path, mmap_mode="r")
+
     def get_depth_vectorized_old(self, geometry) -> np.ndarray:
         """
         Extracts flood depth for multiple locations in a vectorized way.
@@ -116,7 +579,17 @@ class FloodDepthGrid(AbstractFloodDepthGrid):
         return np.array([sample[0] for sample in samples])
 
     def close(self):
-        """Closes the raster dataset."""
+        """Closes the raster dataset, the worker handles and releases cached blocks."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._handles_lock:
+            for dataset in self._thread_handles:
+                dataset.close()
+            self._thread_handles.clear()
+        self._thread_local = threading.local()
+        self.cache.clear()
+        self._band = None
         self.data.close()
 
     def __enter__(self):
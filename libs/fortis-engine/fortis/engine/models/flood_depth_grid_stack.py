@@ -0,0 +1,183 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import geopandas as gpd
+from .abstract_flood_depth_grid import AbstractFloodDepthGrid, depths_with_coverage
+from .flood_depth_grid import FloodDepthGrid
+from .raster_sampling import pixel_indices
+from .reprojection import projected_xy
+
+
+class FloodDepthGridStack:
+    """
+    Samples several depth grids (e.g. return periods or stochastic events) in one pass.
+
+    The stack is not itself a depth grid: it returns a (locations x grids) matrix
+    rather than one depth per location, so its methods are named after matrices.
+
+    Grids that share a CRS, affine transform and shape form a group whose pixel
+    indices are computed once and reused for every grid in the group, and building
+    coordinates are projected once per CRS.  Grids on a different transform get
+    their own group.  Depth grids that are not a nearest-pixel `FloodDepthGrid`,
+    e.g. bilinear ones, fall back to their own sampling.  Points outside a grid
+    follow that grid's `out_of_bounds` setting.
+    """
+
+    def __init__(
+        self, grids: Sequence[AbstractFloodDepthGrid], names: Optional[List[str]] = None
+    ):
+        """
+        Initializes a FloodDepthGridStack object.
+
+        Args:
+            grids (Sequence[AbstractFloodDepthGrid]): The depth grids, one per scenario.
+            names (List[str], optional): Scenario names, one per grid.  Defaults to
+                the grid data sources when available, else the grid position.
+        """
+        if len(grids) == 0:
+            raise ValueError("FloodDepthGridStack needs at least one grid.")
+        if names is not None and len(names) != len(grids):
+            raise ValueError("names must have one entry per grid.")
+        self.grids = list(grids)
+        self.names = (
+            list(names)
+            if names is not None
+            else [str(getattr(g, "data_source", i)) for i, g in enumerate(self.grids)]
+        )
+
+    @classmethod
+    def from_files(
+        cls, data_sources: Sequence[str], names: Optional[List[str]] = None, **kwargs
+    ) -> "FloodDepthGridStack":
+        """
+        Opens a FloodDepthGrid for every raster file and stacks them.
+
+        Args:
+            data_sources (Sequence[str]): Paths to the raster files.
+            names (List[str], optional): Scenario names, one per file.
+            **kwargs: Passed to each FloodDepthGrid (e.g. cache_bytes, preload).
+
+        Returns:
+            FloodDepthGridStack: The stack.
+        """
+        kwargs.setdefault("sampling", "block")
+        return cls([FloodDepthGrid(source, **kwargs) for source in data_sources], names)
+
+    def get_depths(self, lon: float, lat: float) -> np.ndarray:
+        """
+        Extracts the flood depth at a given location from every grid.
+
+        Args:
+            lon (float): Longitude.
+            lat (float): Latitude.
+
+        Returns:
+            np.ndarray: Flood depth per grid.
+        """
+        return np.array([grid.get_depth(lon, lat) for grid in self.grids], dtype=float)
+
+    def get_depth_matrix(self, geometry: gpd.GeoSeries) -> np.ndarray:
+        """
+        Extracts flood depths for multiple locations from every grid.
+
+        Args:
+            geometry (GeoSeries): A GeoSeries of Point geometries.
+
+        Returns:
+            np.ndarray: (buildings x grids) matrix of flood depths.  np.nan for NoData.
+
+        Raises:
+            TypeError: If `geometry` is not a GeoSeries.
+            ValueError: If the GeoSeries has no CRS, or a point is outside a grid
+                whose out_of_bounds is "raise".
+        """
+        depths, _ = self.get_depth_matrix_with_coverage(geometry)
+        return depths
+
+    def get_depth_matrix_with_coverage(
+        self, geometry: gpd.GeoSeries
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts flood depths and coverage for multiple locations from every grid.
+
+        Args:
+            geometry (GeoSeries): A GeoSeries of Point geometries.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (buildings x grids) depth and coverage matrices.
+        """
+        if not isinstance(geometry, gpd.GeoSeries):
+            raise TypeError("geometry must be a GeoSeries.")
+        if geometry.crs is None:
+            raise ValueError("GeoSeries must have a CRS set.")
+
+        depths = np.full((len(geometry), len(self.grids)), np.nan)
+        covered = np.ones((len(geometry), len(self.grids)), dtype=bool)
+        # Coordinates projected to each CRS, shared by every grid in that CRS.
+        projections: Dict[Any, Tuple[np.ndarray, np.ndarray]] = {}
+        for columns in self._shared_transform_groups().values():
+            lead: FloodDepthGrid = self.grids[columns[0]]
+            data = lead.data
+            x, y = self._projected(geometry, data.crs, projections)
+
+            rows, cols, inside = pixel_indices(
+                data.transform, x, y, data.height, data.width
+            )
+            rows = rows[inside]
+            cols = cols[inside]
+
+            for column in columns:
+                grid: FloodDepthGrid = self.grids[column]
+                if grid.out_of_bounds == "raise" and not inside.all():
+                    raise ValueError("Some coordinates are outside the raster bounds.")
+                depths[:, column] = grid.fill_value
+                depths[inside, column] = grid.sample_pixels(rows, cols)
+                covered[:, column] = inside
+
+        for column, grid in enumerate(self.grids):
+            if _shares_pixel_indices(grid):
+                continue
+            if isinstance(grid, FloodDepthGrid):
+                x, y = self._projected(geometry, grid.data.crs, projections)
+                depths[:, column], covered[:, column] = grid.get_depth_with_coverage_xy(
+                    x, y, grid.data.crs
+                )
+            else:
+                depths[:, column], covered[:, column] = depths_with_coverage(grid, geometry)
+        return depths, covered
+
+    @staticmethod
+    def _projected(
+        geometry: gpd.GeoSeries, crs: Any, projections: Dict[Any, Tuple[np.ndarray, np.ndarray]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the point coordinates in `crs`, projecting them once per CRS."""
+        if crs not in projections:
+            projections[crs] = projected_xy(geometry, crs)
+        return projections[crs]
+
+    def _shared_transform_groups(self) -> Dict[tuple, List[int]]:
+        """Groups the nearest-pixel FloodDepthGrid members by CRS, transform and shape."""
+        groups: Dict[tuple, List[int]] = {}
+        for column, grid in enumerate(self.grids):
+            if not _shares_pixel_indices(grid):
+                continue
+            data = grid.data
+            key = (data.crs, tuple(data.transform), data.height, data.width)
+            groups.setdefault(key, []).append(column)
+        return groups
+
+    def close(self):
+        """Closes every grid that can be closed."""
+        for grid in self.grids:
+            if hasattr(grid, "close"):
+                grid.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _shares_pixel_indices(grid: AbstractFloodDepthGrid) -> bool:
+    """Whether a grid is sampled by gathering the pixels containing the points."""
+    return isinstance(grid, FloodDepthGrid) and grid.interpolation == "nearest"
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from pyproj import CRS
+from fortis.engine.models.building_mapping import BuildingMapping
+from fortis.engine.models.building_schema import BuildingSchema
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    # Without pyarrow, loaders read vector files through their default engine.
+    HAS_PYARROW = False
+
+# Bumped whenever the layout of cached inventories changes.
+CACHE_VERSION = 2
+
+
+def file_digest(path: str, chunk_bytes: int = 1024 * 1024) -> str:
+    """
+    Returns the SHA-256 hex digest of a file, read in chunks.
+
+    Args:
+        path (str): File to hash.
+        chunk_bytes (int): Read size.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(
+    source_path: str,
+    fields: BuildingMapping,
+    columns: Optional[Sequence[str]] = None,
+    schema: Optional[BuildingSchema] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Builds the cache key of a parsed inventory.
+
+    The key covers the source file contents, the field mapping, the projected
+    columns, the schema and any loader options (such as spatial filters), so a
+    change to any of them misses the cache.
+
+    Args:
+        source_path (str): The inventory file.
+        fields (BuildingMapping): The inventory's field mapping.
+        columns (Sequence[str], optional): Projected columns, None for all.
+        schema (BuildingSchema, optional): Schema applied at load time.
+        options (Dict[str, Any], optional): JSON-serializable loader options.
+
+    Returns:
+        str: The hex cache key.
+    """
+    description = {
+        "version": CACHE_VERSION,
+        "source": file_digest(source_path),
+        "mapping": fields.get_values(),
+        "columns": None if columns is None else list(columns),
+        "float_dtype": None if schema is None else schema.float_dtype.name,
+        "options": options or {},
+    }
+    return hashlib.sha256(
+        json.dumps(description, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+class InventoryCache:
+    """
+    Directory of parsed building inventories in a binary columnar format.
+
+    Each inventory is a directory holding one .npy file per array and a manifest.
+    Attribute columns keep their loaded dtypes: categorical columns are stored as
+    codes and categories, nullable and text columns as values and a missing mask.
+    The point coordinates are two plain float arrays, so loading skips text parsing
+    entirely.  Everything is loaded with allow_pickle=False, so a cache directory
+    shared between users cannot run code on load.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Initializes an InventoryCache object.
+
+        Args:
+            cache_dir (str): Directory holding the cached inventories.  Created if missing.
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Returns the directory a cache key is stored in."""
+        return os.path.join(self.cache_dir, key)
+
+    def load(
+        self, key: str
+    ) -> Optional[Tuple[pd.DataFrame, np.ndarray, np.ndarray, Any]]:
+        """
+        Loads a cached inventory.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Tuple[pd.DataFrame, np.ndarray, np.ndarray, Any]]: The attribute
+            columns, the x / y coordinates and the CRS (WKT), or None on a cache miss.
+        """
+        path = self.path(key)
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.isfile(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get("version") != CACHE_VERSION:
+            return None
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), allow_pickle=False)
+
+        columns = {
+            column["name"]: _decode_column(column, load, f"c{i}")
+            for i, column in enumerate(manifest["columns"])
+        }
+        index = manifest["index"]
+        if index["kind"] == "range":
+            labels = pd.RangeIndex(index["start"], index["stop"], index["step"], name=index["name"])
+        else:
+            labels = pd.Index(_decode_column(index, load, "index"), name=index["name"])
+        df = pd.DataFrame(columns, index=labels)
+        return df, load("x").astype(float), load("y").astype(float), manifest["crs"]
+
+    def store(
+        self, key: str, df: pd.DataFrame, x: np.ndarray, y: np.ndarray, crs: Any = None
+    ) -> None:
+        """
+        Stores a parsed inventory.
+
+        The directory is assembled under a temporary name and renamed, so concurrent
+        readers never see a partial cache entry.
+
+        Args:
+            key (str): The cache key.
+            df (pd.DataFrame): Attribute columns, without geometry.
+            x (np.ndarray): X coordinates.
+            y (np.ndarray): Y coordinates.
+            crs: CRS of the coordinates, kept in the manifest as WKT.
+        """
+        path = self.path(key)
+        partial = tempfile.mkdtemp(dir=self.cache_dir, prefix=".partial-")
+        try:
+            def save(name: str, values: np.ndarray) -> None:
+                np.save(os.path.join(partial, f"{name}.npy"), values, allow_pickle=False)
+
+            columns = [
+                _encode_column(str(name), df[name], save, f"c{i}")
+                for i, name in enumerate(df.columns)
+            ]
+            if isinstance(df.index, pd.RangeIndex):
+                index = {
+                    "kind": "range",
+                    "start": df.index.start,
+                    "stop": df.index.stop,
+                    "step": df.index.step,
+                }
+            else:
+                index = _encode_column(None, pd.Series(df.index), save, "index")
+            index["name"] = df.index.name
+            save("x", np.asarray(x, dtype=float))
+            save("y", np.asarray(y, dtype=float))
+            manifest = {
+                "version": CACHE_VERSION,
+                "columns": columns,
+                "index": index,
+                "crs": None if crs is None else CRS.from_user_input(crs).to_wkt(),
+            }
+            with open(os.path.join(partial, "manifest.json"), "w", encoding="utf-8") as out:
+                json.dump(manifest, out)
+            os.replace(partial, path)
+        except OSError:
+            shutil.rmtree(partial, ignore_errors=True)
+            # Another process may have stored the same inventory first.
+            if not os.path.isdir(path):
+                raise
+        except Exception:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+
+
+def _encode_column(
+    name: Optional[str],
+    column: pd.Series,
+    save: Callable[[str, np.ndarray], None],
+    prefix: str,
+) -> Dict[str, Any]:
+    """Saves the arrays of one column under `prefix` and returns its manifest entry."""
+    dtype = column.dtype
+    missing = column.isna().to_numpy()
+    if isinstance(dtype, pd.CategoricalDtype):
+        save(f"{prefix}.codes", column.cat.codes.to_numpy())
+        save(f"{prefix}.categories", _plain_array(pd.Series(dtype.categories)))
+        return {"name": name, "kind": "category", "ordered": bool(dtype.ordered)}
+    if dtype == object or isinstance(dtype, pd.StringDtype):
+        save(f"{prefix}.values", _plain_array(column))
+        save(f"{prefix}.missing", missing)
+        return {"name": name, "kind": "text", "dtype": str(dtype)}
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        if not hasattr(dtype, "numpy_dtype"):
+            raise ValueError(f"Cannot cache column '{name}' of dtype {dtype}.")
+        save(f"{prefix}.values", column.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        save(f"{prefix}.missing", missing)
+        return {"name": name, "kind": "masked", "dtype": str(dtype)}
+    save(f"{prefix}.values", column.to_numpy())
+    return {"name": name, "kind": "numpy"}
+
+
+def _decode_column(entry: Dict[str, Any], load: Callable[[str], np.ndarray], prefix: str) -> Any:
+    """Rebuilds a column saved by `_encode_column`."""
+    kind = entry["kind"]
+    if kind == "category":
+        return pd.Categorical.from_codes(
+            load(f"{prefix}.codes"), load(f"{prefix}.categories"), ordered=entry["ordered"]
+        )
+    values = load(f"{prefix}.values")
+    if kind == "numpy":
+        return values
+    column = pd.Series(values).astype(entry["dtype"] if kind == "masked" else object)
+    column[load(f"{prefix}.missing")] = np.nan if kind == "text" else pd.NA
+    return column.astype(entry["dtype"]).array
+
+
+def _plain_array(values: pd.Series) -> np.ndarray:
+    """Converts text, or other values, to an array that can be saved without pickling."""
+    if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+        return values.fillna("").astype(str).to_numpy(dtype=str)
+    return values.to_numpy()
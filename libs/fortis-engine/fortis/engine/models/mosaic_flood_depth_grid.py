@@ -0,0 +1,264 @@
+import glob
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Sequence, Tuple
+import numpy as np
+import geopandas as gpd
+import rasterio
+import shapely
+from shapely.strtree import STRtree
+from .abstract_flood_depth_grid import AbstractFloodDepthGrid
+from .flood_depth_grid import OUT_OF_BOUNDS_MODES, FloodDepthGrid
+from .reprojection import project_coordinates, projected_xy
+
+PRECEDENCE_RULES = ("first", "last", "max", "min")
+
+
+class MosaicFloodDepthGrid(AbstractFloodDepthGrid):
+    """
+    Flood depth grid made of many raster tiles sharing one CRS.
+
+    Tile footprints are indexed in an STRtree and every building is routed to the
+    tiles containing it with one bulk query.  Tiles are opened lazily as
+    `FloodDepthGrid` objects and at most `max_open` of them stay open, least
+    recently used first out.
+
+    Where tiles overlap, `precedence` decides the depth:
+        first: the first tile (in `data_sources` order) with a valid value.
+        last: the last tile with a valid value.
+        max: the largest valid value.
+        min: the smallest valid value.
+    """
+
+    def __init__(
+        self,
+        data_sources: Sequence[str],
+        precedence: str = "first",
+        max_open: int = 16,
+        out_of_bounds: str = "raise",
+        fill_value: float = np.nan,
+        **grid_kwargs,
+    ):
+        """
+        Initializes a MosaicFloodDepthGrid object.
+
+        Args:
+            data_sources (Sequence[str]): Paths to the raster tiles.
+            precedence (str): Overlap rule, one of "first", "last", "max", "min".
+            max_open (int): Maximum number of tiles kept open at once.
+            out_of_bounds (str): "raise" rejects a batch with any point outside every
+                tile; "mask" returns `fill_value` and reports it in the coverage mask.
+            fill_value (float): Depth returned for uncovered points when out_of_bounds="mask".
+            **grid_kwargs: Passed to each tile's FloodDepthGrid (e.g. cache_bytes,
+                interpolation).  sampling defaults to "block".
+        """
+        if len(data_sources) == 0:
+            raise ValueError("MosaicFloodDepthGrid needs at least one tile.")
+        if precedence not in PRECEDENCE_RULES:
+            raise ValueError(
+                f"precedence must be one of {PRECEDENCE_RULES}, got '{precedence}'."
+            )
+        if out_of_bounds not in OUT_OF_BOUNDS_MODES:
+            raise ValueError(
+                f"out_of_bounds must be one of {OUT_OF_BOUNDS_MODES}, got '{out_of_bounds}'."
+            )
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1.")
+
+        self.data_sources = list(data_sources)
+        self.precedence = precedence
+        self.max_open = max_open
+        self.out_of_bounds = out_of_bounds
+        self.fill_value = fill_value
+        self.grid_kwargs = dict(grid_kwargs)
+        self.grid_kwargs.setdefault("sampling", "block")
+        self.opens = 0
+        self._open_tiles: "OrderedDict[int, FloodDepthGrid]" = OrderedDict()
+
+        # Only the tile headers are read here; pixels are read on demand.
+        self.footprints = []
+        self.crs = None
+        for source in self.data_sources:
+            with rasterio.open(source) as dataset:
+                if self.crs is None:
+                    self.crs = dataset.crs
+                elif dataset.crs != self.crs:
+                    raise ValueError(
+                        f"Tile '{source}' has CRS {dataset.crs}, expected {self.crs}."
+                    )
+                self.footprints.append(shapely.box(*dataset.bounds))
+        self.index = STRtree(self.footprints)
+
+    @classmethod
+    def from_directory(
+        cls, directory: str, pattern: str = "*.tif", **kwargs
+    ) -> "MosaicFloodDepthGrid":
+        """
+        Builds a mosaic from every raster in a directory matching `pattern`.
+
+        Tiles are ordered by file name, which is the order used by "first"/"last".
+
+        Args:
+            directory (str): Directory containing the tiles.
+            pattern (str): Glob pattern of the tile files.
+            **kwargs: Passed to the MosaicFloodDepthGrid constructor.
+
+        Returns:
+            MosaicFloodDepthGrid: The mosaic.
+        """
+        return cls(sorted(glob.glob(os.path.join(directory, pattern))), **kwargs)
+
+    def get_depth(self, lon: float, lat: float) -> float:
+        """
+        Extracts flood depth value at a given location.
+
+        Args:
+            lon (float): X coordinate in the mosaic CRS.
+            lat (float): Y coordinate in the mosaic CRS.
+
+        Returns:
+            float: Flood depth value.
+        """
+        depths, covered = self._sample_coordinates(np.array([lon]), np.array([lat]))
+        if not covered[0] and self.out_of_bounds == "raise":
+            raise ValueError(f"Coordinates ({lon}, {lat}) are outside raster bounds.")
+        return float(depths[0])
+
+    def get_depth_vectorized(self, geometry: gpd.GeoSeries) -> np.ndarray:
+        """
+        Extracts flood depth for multiple locations across the tiles.
+
+        Args:
+            geometry (GeoSeries): A GeoSeries of Point geometries.
+
+        Returns:
+            np.ndarray: Array of flood depth values (float).  Returns np.nan for NoData.
+        """
+        depths, _ = self.get_depth_with_coverage(geometry)
+        return depths
+
+    def get_depth_with_coverage(
+        self, geometry: gpd.GeoSeries
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts flood depths and a mask of the points inside any tile.
+
+        Args:
+            geometry (GeoSeries): A GeoSeries of Point geometries.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Flood depths and the boolean coverage mask.
+
+        Raises:
+            TypeError: If `geometry` is not a GeoSeries.
+            ValueError: If the GeoSeries has no CRS, or a point is outside every tile
+                and out_of_bounds="raise".
+        """
+        if not isinstance(geometry, gpd.GeoSeries):
+            raise TypeError("geometry must be a GeoSeries.")
+        if geometry.crs is None:
+            raise ValueError("GeoSeries must have a CRS set.")
+        return self._depths_with_coverage(*projected_xy(geometry, self.crs))
+
+    def get_depth_with_coverage_xy(
+        self, x: np.ndarray, y: np.ndarray, crs: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts flood depths and the coverage mask at coordinate arrays.
+
+        Args:
+            x (np.ndarray): X coordinates.
+            y (np.ndarray): Y coordinates.
+            crs: CRS of the coordinates.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Flood depths and the boolean coverage mask.
+        """
+        return self._depths_with_coverage(*project_coordinates(x, y, crs, self.crs))
+
+    def _depths_with_coverage(
+        self, x: np.ndarray, y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples mosaic-CRS coordinates, applying the out_of_bounds mode."""
+        depths, covered = self._sample_coordinates(x, y)
+        if self.out_of_bounds == "raise" and not covered.all():
+            raise ValueError("Some coordinates are outside the raster bounds.")
+        return depths, covered
+
+    def extent(self) -> gpd.GeoSeries:
+        """Returns the union of the tile footprints as a GeoSeries in the mosaic CRS."""
+        return gpd.GeoSeries([shapely.union_all(self.footprints)], crs=self.crs)
+
+    def _sample_coordinates(
+        self, x: np.ndarray, y: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Routes mosaic-CRS coordinates to their tiles, samples them and resolves overlaps."""
+        depths = np.full(len(x), self.fill_value, dtype=float)
+        if len(x) == 0:
+            return depths, np.zeros(0, dtype=bool)
+
+        point_idx, tile_idx = self.index.query(
+            shapely.points(x, y), predicate="intersects"
+        )
+        covered = np.zeros(len(x), dtype=bool)
+        covered[point_idx] = True
+        if len(point_idx) == 0:
+            return depths, covered
+
+        # Sample every (point, tile) candidate, one tile at a time.
+        values = np.empty(len(point_idx), dtype=float)
+        order = np.argsort(tile_idx, kind="stable")
+        sorted_tiles = tile_idx[order]
+        starts = np.flatnonzero(np.r_[True, sorted_tiles[1:] != sorted_tiles[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        for start, end in zip(starts, ends):
+            pairs = order[start:end]
+            grid = self._tile(int(sorted_tiles[start]))
+            points = point_idx[pairs]
+            values[pairs] = grid.sample_coordinates(x[points], y[points])
+
+        depths[covered] = np.nan
+        valid = ~np.isnan(values)
+        point_idx, tile_idx, values = point_idx[valid], tile_idx[valid], values[valid]
+        if self.precedence in ("first", "last"):
+            rank = tile_idx if self.precedence == "first" else -tile_idx
+            chosen = np.lexsort((rank, point_idx))
+            first = np.r_[True, point_idx[chosen][1:] != point_idx[chosen][:-1]]
+            winners = chosen[first]
+            depths[point_idx[winners]] = values[winners]
+        elif self.precedence == "max":
+            np.fmax.at(depths, point_idx, values)
+        else:
+            np.fmin.at(depths, point_idx, values)
+        return depths, covered
+
+    def _tile(self, tile: int) -> FloodDepthGrid:
+        """Returns an open tile, opening it and closing the least recently used one if needed."""
+        grid = self._open_tiles.get(tile)
+        if grid is not None:
+            self._open_tiles.move_to_end(tile)
+            return grid
+
+        while len(self._open_tiles) >= self.max_open:
+            _, evicted = self._open_tiles.popitem(last=False)
+            evicted.close()
+        grid = FloodDepthGrid(self.data_sources[tile], **self.grid_kwargs)
+        self._open_tiles[tile] = grid
+        self.opens += 1
+        return grid
+
+    def open_tiles(self) -> Dict[int, str]:
+        """Returns the currently open tiles as {tile index: data source}."""
+        return {tile: self.data_sources[tile] for tile in self._open_tiles}
+
+    def close(self):
+        """Closes every open tile."""
+        for grid in self._open_tiles.values():
+            grid.close()
+        self._open_tiles.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,24 +1,74 @@
+from typing import Any, Dict, List, Optional
 import geopandas as gpd
+import pyogrio
 import zipfile
-import tempfile
 from .abstract_building_points import AbstractBuildingPoints
+from .building_schema import BuildingSchema
+from .inventory_cache import HAS_PYARROW
 
 
 class NSIPoints(AbstractBuildingPoints):
-    def __init__(self, zip_path: str):
+    def __init__(
+        self,
+        zip_path: str,
+        spatial_order: Optional[str] = None,
+        schema: Optional[BuildingSchema] = None,
+        cache_dir: Optional[str] = None,
+        overrides: Dict[str, str] = None,
+        mapped_columns_only: bool = False,
+        bbox: Any = None,
+        mask: Any = None,
+    ):
         """
         Initialize NSIPoints with the path to a zipped gpkg file.
 
+        The gpkg is read in place through GDAL's /vsizip/ virtual file system, with
+        the column list and spatial filter pushed down to the reader (the Arrow
+        reader when pyarrow is installed).
+
         Args:
             zip_path (str): Full path to the zip file containing the gpkg.
+            spatial_order (str, optional): "hilbert" or "morton" to sort the points along
+                a space-filling curve after loading.  See `spatial_sort`.
+            schema (BuildingSchema, optional): Column types applied at load time.
+            cache_dir (str, optional): Directory of the binary inventory cache, keyed by
+                the zip contents, mapping, columns, filters and schema.  Later runs skip
+                the gpkg.
+            overrides (Dict[str, str], optional): Overrides of the building mapping.
+            mapped_columns_only (bool): Read only the columns named in the building mapping.
+            bbox: Only read points within this (minx, miny, maxx, maxy) box in the layer
+                CRS, or within the total bounds of a GeoSeries / GeoDataFrame in any CRS,
+                e.g. `depth_grid.extent()`.
+            mask: Only read points intersecting this geometry (or GeoSeries /
+                GeoDataFrame).  Cannot be combined with bbox.
         """
-
+        super().__init__(overrides)
+        if bbox is not None and mask is not None:
+            raise ValueError("bbox and mask cannot be combined.")
         self.zip_path = zip_path
-        self._gdf = self._extract_and_load(zip_path)
+        self.mapped_columns_only = mapped_columns_only
+        self.bbox = bbox
+        self.mask = mask
+        self._load_with_cache(
+            zip_path,
+            lambda: self._extract_and_load(zip_path),
+            cache_dir,
+            schema=schema,
+            options={
+                "mapped_columns_only": mapped_columns_only,
+                "bbox": _filter_description(bbox),
+                "mask": _filter_description(mask),
+            },
+        )
+        if spatial_order is not None:
+            self.spatial_sort(spatial_order)
 
     def _extract_and_load(self, zip_path: str) -> gpd.GeoDataFrame:
         """
-        Extracts the gpkg file from the zip archive and loads it into a GeoDataFrame.
+        Reads the gpkg file straight from the zip archive into a GeoDataFrame.
+
+        Nothing is extracted to disk; only the requested columns and the features
+        passing the spatial filter are read.
 
         Args:
             zip_path (str): Full path to the zip file.
@@ -26,21 +76,44 @@ class NSIPoints(AbstractBuildingPoints):
         Returns:
             gpd.GeoDataFrame: Loaded geospatial data.
         """
-        # Open the zip archive
+        path = self._vsizip_path(zip_path)
+        columns = self._mapped_columns(path) if self.mapped_columns_only else None
+        return gpd.read_file(
+            path,
+            engine="pyogrio",
+            columns=columns,
+            bbox=self.bbox,
+            mask=self.mask,
+            use_arrow=HAS_PYARROW,
+        )
+
+    @staticmethod
+    def _vsizip_path(zip_path: str) -> str:
+        """Returns the GDAL virtual path of the first gpkg file in the archive."""
+        # Look for a .gpkg file in the archive
         with zipfile.ZipFile(zip_path, "r") as z:
-            # Look for a .gpkg file in the archive
             gpkg_files = [item for item in z.namelist() if item.endswith(".gpkg")]
-            if not gpkg_files:
-                raise ValueError("No gpkg file found in the zip archive")
-            gpkg_file = gpkg_files[0]
-            # Extract the gpkg file to a temporary directory
-            temp_dir = tempfile.mkdtemp()
-            extracted_path = z.extract(gpkg_file, path=temp_dir)
+        if not gpkg_files:
+            raise ValueError("No gpkg file found in the zip archive")
+        return f"/vsizip/{zip_path}/{gpkg_files[0]}"
 
-        # Read the extracted gpkg file into a GeoDataFrame
-        return gpd.read_file(extracted_path)
+    def _mapped_columns(self, path: str) -> List[str]:
+        """Returns the layer fields named in the building mapping, in layer order."""
+        wanted = set(self.fields.get_values().values())
+        return [field for field in pyogrio.read_info(path)["fields"] if field in wanted]
 
     @property
     def gdf(self) -> gpd.GeoDataFrame:
         """Returns the GeoDataFrame containing the extracted data."""
-        return self._gdf
+        return self._geodataframe()
+
+
+def _filter_description(spatial_filter: Any) -> Optional[str]:
+    """Describes a bbox or mask filter for the cache key."""
+    if spatial_filter is None:
+        return None
+    if isinstance(spatial_filter, (gpd.GeoSeries, gpd.GeoDataFrame)):
+        return f"{spatial_filter.crs}:{spatial_filter.union_all().wkt}"
+    if hasattr(spatial_filter, "wkt"):
+        return spatial_filter.wkt
+    return repr(tuple(spatial_filter))
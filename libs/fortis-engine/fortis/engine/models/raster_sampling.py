@@ -0,0 +1,283 @@
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from affine import Affine
+from rasterio.windows import Window
+
+# Fraction of a pixel within which points count as on the right/bottom raster edge.
+EDGE_TOLERANCE = 1e-6
+
+
+def coords_to_pixels(
+    transform: Affine, x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts map coordinates to fractional pixel coordinates using the inverse affine transform.
+
+    Args:
+        transform (Affine): The raster's affine transform.
+        x (np.ndarray): X (easting/longitude) coordinates in the raster CRS.
+        y (np.ndarray): Y (northing/latitude) coordinates in the raster CRS.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Fractional (row, col) arrays.
+    """
+    inverse = ~transform
+    cols = inverse.a * x + inverse.b * y + inverse.c
+    rows = inverse.d * x + inverse.e * y + inverse.f
+    return rows, cols
+
+
+def pixel_indices(
+    transform: Affine, x: np.ndarray, y: np.ndarray, height: int, width: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Converts map coordinates to integer (row, col) pixel indices.
+
+    Points on the right or bottom edge of the raster are snapped into the last
+    row/column, matching the inclusive bounds test used by the depth grids.
+
+    Args:
+        transform (Affine): The raster's affine transform.
+        x (np.ndarray): X coordinates in the raster CRS.
+        y (np.ndarray): Y coordinates in the raster CRS.
+        height (int): Number of raster rows.
+        width (int): Number of raster columns.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Row indices, column indices and a
+        boolean mask of the points that fall inside the raster.
+    """
+    fractional_rows, fractional_cols = coords_to_pixels(transform, x, y)
+    rows = np.floor(fractional_rows)
+    cols = np.floor(fractional_cols)
+    # Snap the closed right/bottom edge into the raster, but not points beyond it.
+    rows = np.where(np.isclose(fractional_rows, height, rtol=0, atol=EDGE_TOLERANCE), height - 1, rows)
+    cols = np.where(np.isclose(fractional_cols, width, rtol=0, atol=EDGE_TOLERANCE), width - 1, cols)
+    inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    rows = np.where(inside, rows, 0).astype(np.int64)
+    cols = np.where(inside, cols, 0).astype(np.int64)
+    return rows, cols, inside
+
+
+def block_window(
+    block_row: int, block_col: int, block_shape: Tuple[int, int], height: int, width: int
+) -> Window:
+    """
+    Returns the raster window covered by a block, clipped to the raster extent.
+
+    Args:
+        block_row (int): Block row index.
+        block_col (int): Block column index.
+        block_shape (Tuple[int, int]): Block (rows, cols) size.
+        height (int): Number of raster rows.
+        width (int): Number of raster columns.
+
+    Returns:
+        Window: The block window.
+    """
+    block_height, block_width = block_shape
+    row_off = block_row * block_height
+    col_off = block_col * block_width
+    return Window(
+        col_off,
+        row_off,
+        min(block_width, width - col_off),
+        min(block_height, height - row_off),
+    )
+
+
+def group_by_block(
+    rows: np.ndarray, cols: np.ndarray, block_shape: Tuple[int, int]
+) -> List[Tuple[int, int, np.ndarray]]:
+    """
+    Groups pixel indices by the raster block that contains them.
+
+    Args:
+        rows (np.ndarray): Integer row indices (must be inside the raster).
+        cols (np.ndarray): Integer column indices (must be inside the raster).
+        block_shape (Tuple[int, int]): Block (rows, cols) size.
+
+    Returns:
+        List[Tuple[int, int, np.ndarray]]: (block_row, block_col, member positions)
+        for every touched block, in row-major block order.
+    """
+    if len(rows) == 0:
+        return []
+
+    block_height, block_width = block_shape
+    block_rows = rows // block_height
+    block_cols = cols // block_width
+    n_block_cols = int(block_cols.max()) + 1
+    block_ids = block_rows * n_block_cols + block_cols
+
+    order = np.argsort(block_ids, kind="stable")
+    sorted_ids = block_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    ends = np.r_[starts[1:], len(sorted_ids)]
+
+    return [
+        (int(block_rows[order[start]]), int(block_cols[order[start]]), order[start:end])
+        for start, end in zip(starts, ends)
+    ]
+
+
+def gather_from_blocks(
+    read_block: Callable[[int, int], np.ndarray],
+    rows: np.ndarray,
+    cols: np.ndarray,
+    block_shape: Tuple[int, int],
+    dtype: np.dtype = np.float64,
+    executor: Optional[Executor] = None,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    Gathers pixel values by reading every raster block touched by the indices exactly once.
+
+    Points are grouped by block id with a stable argsort so each block is read a
+    single time and its values are pulled with NumPy fancy indexing.  With an
+    executor the blocks are split into `workers` contiguous partitions that are
+    gathered concurrently; partitions write disjoint positions of the output.
+
+    Args:
+        read_block (Callable[[int, int], np.ndarray]): Returns the 2D array for a
+            (block_row, block_col) pair.  Must be safe to call from the executor's
+            threads when one is given.
+        rows (np.ndarray): Integer row indices (must be inside the raster).
+        cols (np.ndarray): Integer column indices (must be inside the raster).
+        block_shape (Tuple[int, int]): Block (rows, cols) size.
+        dtype (np.dtype): Output dtype.
+        executor (Executor, optional): Thread pool used to gather partitions in parallel.
+        workers (int): Number of partitions when an executor is given.
+
+    Returns:
+        np.ndarray: Pixel values aligned with `rows`/`cols`.
+    """
+    values = np.empty(len(rows), dtype=dtype)
+    groups = group_by_block(rows, cols, block_shape)
+    block_height, block_width = block_shape
+
+    def gather(partition: List[Tuple[int, int, np.ndarray]]) -> None:
+        for block_row, block_col, members in partition:
+            block = read_block(block_row, block_col)
+            values[members] = block[
+                rows[members] - block_row * block_height,
+                cols[members] - block_col * block_width,
+            ]
+
+    if executor is None or workers <= 1 or len(groups) <= 1:
+        gather(groups)
+        return values
+
+    bounds = np.linspace(0, len(groups), min(workers, len(groups)) + 1).astype(int)
+    futures = [
+        executor.submit(gather, groups[start:end])
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+    for future in futures:
+        future.result()
+    return values
+
+
+def nodata_mask(values: np.ndarray, nodata: Optional[float]) -> np.ndarray:
+    """
+    Returns a boolean mask of the values that are NoData.
+
+    Args:
+        values (np.ndarray): Sampled raster values.
+        nodata (Optional[float]): The dataset's NoData value, if any.
+
+    Returns:
+        np.ndarray: True where the value is NoData (or NaN).
+    """
+    if np.issubdtype(values.dtype, np.floating):
+        mask = np.isnan(values)
+    else:
+        mask = np.zeros(values.shape, dtype=bool)
+    if nodata is not None and not np.isnan(nodata):
+        mask |= values == nodata
+    return mask
+
+
+def bilinear_neighbours(
+    transform: Affine, x: np.ndarray, y: np.ndarray, height: int, width: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the four surrounding pixel centres and bilinear weights for each point.
+
+    Neighbours beyond the raster edge are clamped onto the edge pixels, which makes
+    the interpolation fall back to the edge values along the border.
+
+    Args:
+        transform (Affine): The raster's affine transform.
+        x (np.ndarray): X coordinates in the raster CRS.
+        y (np.ndarray): Y coordinates in the raster CRS.
+        height (int): Number of raster rows.
+        width (int): Number of raster columns.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (4, N) row indices, column indices
+        and weights, ordered upper-left, upper-right, lower-left, lower-right.
+    """
+    rows, cols = coords_to_pixels(transform, x, y)
+    # Shift so integer positions are pixel centres.
+    rows = rows - 0.5
+    cols = cols - 0.5
+    row0 = np.floor(rows)
+    col0 = np.floor(cols)
+    fr = rows - row0
+    fc = cols - col0
+
+    r0 = np.clip(row0, 0, height - 1).astype(np.int64)
+    r1 = np.clip(row0 + 1, 0, height - 1).astype(np.int64)
+    c0 = np.clip(col0, 0, width - 1).astype(np.int64)
+    c1 = np.clip(col0 + 1, 0, width - 1).astype(np.int64)
+
+    neighbour_rows = np.stack([r0, r0, r1, r1])
+    neighbour_cols = np.stack([c0, c1, c0, c1])
+    weights = np.stack(
+        [(1 - fr) * (1 - fc), (1 - fr) * fc, fr * (1 - fc), fr * fc]
+    )
+    return neighbour_rows, neighbour_cols, weights
+
+
+def interpolate_bilinear(
+    values: np.ndarray, weights: np.ndarray, nodata_fallback: str = "nearest"
+) -> np.ndarray:
+    """
+    Combines the four neighbour values of each point with bilinear weights.
+
+    Args:
+        values (np.ndarray): (4, N) neighbour values with NaN for NoData.
+        weights (np.ndarray): (4, N) bilinear weights from `bilinear_neighbours`.
+        nodata_fallback (str): What to do when a neighbour is NoData.  "nearest" uses
+            the nearest pixel centre (NaN if that one is NoData too); "ignore"
+            renormalizes the weights over the valid neighbours (NaN if none of the
+            valid neighbours carries weight).
+
+    Returns:
+        np.ndarray: Interpolated values, NaN where nothing valid is available.
+    """
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    all_valid = valid.all(axis=0)
+
+    result = np.full(values.shape[1], np.nan)
+    result[all_valid] = (filled * weights).sum(axis=0)[all_valid]
+
+    partial = ~all_valid
+    if nodata_fallback == "nearest":
+        nearest = values[np.argmax(weights, axis=0), np.arange(values.shape[1])]
+        result[partial] = nearest[partial]
+    elif nodata_fallback == "ignore":
+        valid_weights = np.where(valid, weights, 0.0)
+        total = valid_weights.sum(axis=0)
+        has_weight = partial & (total > 0)
+        result[has_weight] = (
+            (filled * valid_weights).sum(axis=0)[has_weight] / total[has_weight]
+        )
+    else:
+        raise ValueError(
+            f"nodata_fallback must be 'nearest' or 'ignore', got '{nodata_fallback}'."
+        )
+    return result
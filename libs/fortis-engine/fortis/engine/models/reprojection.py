@@ -0,0 +1,145 @@
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+import numpy as np
+import geopandas as gpd
+from pyproj import CRS, Transformer
+
+# Projected coordinates per pair of read-only source arrays (by id) and source CRS,
+# keyed by the target CRS WKT.  A finalizer on each array drops the entry together
+# with the coordinates it was computed from.
+_COORDINATE_CACHE: Dict[Tuple[int, int, str], Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+
+
+@lru_cache(maxsize=64)
+def _transformer(src_wkt: str, dst_wkt: str) -> Transformer:
+    return Transformer.from_crs(
+        CRS.from_wkt(src_wkt), CRS.from_wkt(dst_wkt), always_xy=True
+    )
+
+
+def get_transformer(src_crs: Any, dst_crs: Any) -> Transformer:
+    """
+    Returns a cached always-xy transformer for a pair of CRS.
+
+    Args:
+        src_crs: Source CRS (pyproj, rasterio or any user input pyproj accepts).
+        dst_crs: Target CRS.
+
+    Returns:
+        Transformer: The shared transformer for the CRS pair.
+    """
+    return _transformer(
+        CRS.from_user_input(src_crs).to_wkt(), CRS.from_user_input(dst_crs).to_wkt()
+    )
+
+
+def read_only_copy(values: np.ndarray) -> np.ndarray:
+    """
+    Returns a read-only float64 copy of an array, which `project_coordinates` can
+    memoize.
+
+    Args:
+        values (np.ndarray): The values.
+
+    Returns:
+        np.ndarray: The copy.
+    """
+    copy = np.array(values, dtype=float)
+    copy.flags.writeable = False
+    return copy
+
+
+def projected_xy(geometry: gpd.GeoSeries, crs: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the x/y coordinate arrays of point geometries in the requested CRS.
+
+    Coordinates are transformed as raw arrays with a cached transformer.  Geometry
+    arrays can be modified in place, so the result is not memoized; callers that
+    sample several grids should project the buildings' `x`/`y` arrays with
+    `project_coordinates` instead.
+
+    Args:
+        geometry (GeoSeries): Point geometries with a CRS set.
+        crs: Target CRS.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: X and Y coordinates in `crs`.
+    """
+    if geometry.crs is None:
+        raise ValueError("GeoSeries must have a CRS set.")
+
+    x = geometry.x.to_numpy(dtype=float)
+    y = geometry.y.to_numpy(dtype=float)
+    target = CRS.from_user_input(crs)
+    if geometry.crs == target:
+        return x, y
+    return _transform(get_transformer(geometry.crs, target), x, y)
+
+
+def project_coordinates(
+    x: np.ndarray, y: np.ndarray, src_crs: Any, dst_crs: Any
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns coordinate arrays in another CRS.
+
+    Arrays already in `dst_crs` are returned as they are.  When `x` and `y` are
+    read-only arrays that own their data, such as the buildings' coordinates (see
+    `read_only_copy`), the result is memoized per array pair and source CRS, is
+    read-only and must not be modified.  Other arrays may change in place and are
+    transformed on every call.
+
+    Args:
+        x (np.ndarray): X coordinates in `src_crs`.
+        y (np.ndarray): Y coordinates in `src_crs`.
+        src_crs: CRS of the coordinates.
+        dst_crs: Target CRS.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: X and Y coordinates in `dst_crs`.
+    """
+    if src_crs is None:
+        raise ValueError("Coordinates must have a CRS set.")
+    source = CRS.from_user_input(src_crs)
+    target = CRS.from_user_input(dst_crs)
+    if source == target:
+        return x, y
+    if not (_is_frozen(x) and _is_frozen(y)):
+        return _transform(get_transformer(source, target), x, y)
+
+    key = (id(x), id(y), source.to_wkt())
+    cached = _COORDINATE_CACHE.get(key)
+    if cached is None:
+        cached = _COORDINATE_CACHE[key] = {}
+        weakref.finalize(x, _COORDINATE_CACHE.pop, key, None)
+        weakref.finalize(y, _COORDINATE_CACHE.pop, key, None)
+    target_key = target.to_wkt()
+    if target_key not in cached:
+        px, py = _transform(get_transformer(source, target), x, y)
+        px.flags.writeable = False
+        py.flags.writeable = False
+        cached[target_key] = (px, py)
+    return cached[target_key]
+
+
+def clear_coordinate_cache() -> None:
+    """Drops every memoized set of projected coordinates."""
+    _COORDINATE_CACHE.clear()
+
+
+def _is_frozen(values: np.ndarray) -> bool:
+    """Whether an array owns its data and is read-only, so it cannot change."""
+    return isinstance(values, np.ndarray) and values.base is None and not values.flags.writeable
+
+
+def _transform(
+    transformer: Transformer, x: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Transforms coordinate arrays into new float64 arrays."""
+    if len(x) == 1:
+        # pyproj takes one-element arrays for scalars, through a deprecated
+        # array-to-scalar conversion.
+        px, py = transformer.transform(float(x[0]), float(y[0]))
+        return np.array([px], dtype=float), np.array([py], dtype=float)
+    px, py = transformer.transform(x, y)
+    return np.array(px, dtype=float), np.array(py, dtype=float)
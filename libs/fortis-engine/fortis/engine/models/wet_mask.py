@@ -0,0 +1,159 @@
+import os
+from typing import List, Optional, Tuple
+import numpy as np
+import rasterio
+from .raster_sampling import nodata_mask
+
+
+class WetMask:
+    """
+    Coarse pyramid of which raster blocks contain any positive flood depth.
+
+    Level 0 holds one flag per raster block.  Every further level ORs 2 x 2 cells of
+    the level below, up to a single cell for the whole raster, so large dry regions
+    can be ruled out with a handful of lookups.
+    """
+
+    def __init__(self, levels: List[np.ndarray]):
+        """
+        Initializes a WetMask object.
+
+        Args:
+            levels (List[np.ndarray]): Boolean arrays from per-block (level 0) to coarsest.
+        """
+        self.levels = levels
+
+    @classmethod
+    def build(cls, dataset: rasterio.DatasetReader, band: int = 1) -> "WetMask":
+        """
+        Scans a raster block by block and records the blocks holding positive depths.
+
+        Args:
+            dataset (rasterio.DatasetReader): The open depth raster.
+            band (int): Band to scan.
+
+        Returns:
+            WetMask: The wet mask pyramid.
+        """
+        wet = np.zeros(cls.block_grid(dataset, band), dtype=bool)
+        for (block_row, block_col), window in dataset.block_windows(band):
+            values = dataset.read(band, window=window)
+            valid = ~nodata_mask(values, dataset.nodata)
+            wet[block_row, block_col] = bool((values[valid] > 0).any())
+        return cls(cls._pyramid(wet))
+
+    @staticmethod
+    def block_grid(dataset: rasterio.DatasetReader, band: int = 1) -> Tuple[int, int]:
+        """Returns the number of block rows and columns of a raster band."""
+        block_height, block_width = dataset.block_shapes[band - 1]
+        return -(-dataset.height // block_height), -(-dataset.width // block_width)
+
+    @staticmethod
+    def _pyramid(wet: np.ndarray) -> List[np.ndarray]:
+        """Builds the coarser levels by OR-ing 2 x 2 cells until one cell is left."""
+        levels = [wet]
+        while levels[-1].size > 1:
+            level = levels[-1]
+            padded = np.zeros(
+                (level.shape[0] + level.shape[0] % 2, level.shape[1] + level.shape[1] % 2),
+                dtype=bool,
+            )
+            padded[: level.shape[0], : level.shape[1]] = level
+            levels.append(
+                padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).any(
+                    axis=(1, 3)
+                )
+            )
+        return levels
+
+    @classmethod
+    def load_or_build(
+        cls, dataset: rasterio.DatasetReader, path: Optional[str] = None
+    ) -> "WetMask":
+        """
+        Loads the wet mask persisted next to the raster, building and saving it if
+        missing, older than the raster, or saved for a different block grid (e.g. a
+        re-tiled raster or a `path` shared between rasters).
+
+        Args:
+            dataset (rasterio.DatasetReader): The open depth raster.
+            path (str, optional): Location of the .npz file.  Defaults to
+                `<raster>.wetmask.npz`.
+
+        Returns:
+            WetMask: The wet mask pyramid.
+        """
+        path = path or f"{dataset.name}.wetmask.npz"
+        source_mtime = os.path.getmtime(dataset.name) if os.path.exists(dataset.name) else None
+        if (
+            source_mtime is not None
+            and os.path.exists(path)
+            and os.path.getmtime(path) >= source_mtime
+        ):
+            with np.load(path) as stored:
+                if (
+                    "block_grid" in stored
+                    and tuple(stored["block_grid"].tolist()) == cls.block_grid(dataset)
+                ):
+                    levels = [stored[f"level{i}"] for i in range(int(stored["count"]))]
+                    return cls(levels)
+
+        mask = cls.build(dataset)
+        try:
+            np.savez_compressed(
+                path,
+                count=len(mask.levels),
+                block_grid=np.array(mask.levels[0].shape),
+                **{f"level{i}": level for i, level in enumerate(mask.levels)},
+            )
+        except OSError:
+            # Read-only locations still get the in-memory mask.
+            pass
+        return mask
+
+    def wet_blocks(self, block_rows: np.ndarray, block_cols: np.ndarray) -> np.ndarray:
+        """
+        Looks up whether each block contains any positive depth.
+
+        Args:
+            block_rows (np.ndarray): Block row indices.
+            block_cols (np.ndarray): Block column indices.
+
+        Returns:
+            np.ndarray: True for wet blocks.
+        """
+        return self.levels[0][block_rows, block_cols]
+
+    def any_wet(
+        self, block_row_min: int, block_row_max: int, block_col_min: int, block_col_max: int
+    ) -> bool:
+        """
+        Checks whether any block in an inclusive block range is wet.
+
+        The check starts on the coarsest level where the range spans at most 2 x 2
+        cells and refines towards level 0, stopping as soon as a level is all dry.
+
+        Args:
+            block_row_min (int): First block row.
+            block_row_max (int): Last block row.
+            block_col_min (int): First block column.
+            block_col_max (int): Last block column.
+
+        Returns:
+            bool: False when the whole range is dry.
+        """
+        start = 0
+        while (
+            start + 1 < len(self.levels)
+            and (block_row_max >> (start + 1)) - (block_row_min >> (start + 1)) <= 1
+            and (block_col_max >> (start + 1)) - (block_col_min >> (start + 1)) <= 1
+        ):
+            start += 1
+        for level in range(start, -1, -1):
+            cells = self.levels[level][
+                block_row_min >> level : (block_row_max >> level) + 1,
+                block_col_min >> level : (block_col_max >> level) + 1,
+            ]
+            if not cells.any():
+                return False
+        return True
@@ -0,0 +1,225 @@
+from typing import Callable, Optional, Tuple
+import numpy as np
+import shapely
+from affine import Affine
+from rasterio.features import rasterize
+from rasterio.windows import Window
+from rasterio.windows import transform as window_transform
+from .raster_sampling import coords_to_pixels, nodata_mask
+
+ZONAL_STATS = ("max", "mean", "min")
+
+
+def footprint_pixel_bounds(
+    geoms: np.ndarray, transform: Affine, height: int, width: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the clipped pixel bounding box of every footprint.
+
+    Args:
+        geoms (np.ndarray): Shapely polygons in the raster CRS.
+        transform (Affine): The raster's affine transform.
+        height (int): Number of raster rows.
+        width (int): Number of raster columns.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: row_min, row_max
+        (exclusive), col_min and col_max (exclusive).  Footprints outside the raster
+        get an empty box.
+    """
+    bounds = shapely.bounds(geoms)
+    corner_x = bounds[:, [0, 0, 2, 2]]
+    corner_y = bounds[:, [1, 3, 1, 3]]
+    rows, cols = coords_to_pixels(transform, corner_x, corner_y)
+    row_min = np.clip(np.floor(rows.min(axis=1)), 0, height).astype(np.int64)
+    row_max = np.clip(np.ceil(rows.max(axis=1)), 0, height).astype(np.int64)
+    col_min = np.clip(np.floor(cols.min(axis=1)), 0, width).astype(np.int64)
+    col_max = np.clip(np.ceil(cols.max(axis=1)), 0, width).astype(np.int64)
+    return row_min, row_max, col_min, col_max
+
+
+def overlap_passes(
+    row_min: np.ndarray, row_max: np.ndarray, col_min: np.ndarray, col_max: np.ndarray
+) -> np.ndarray:
+    """
+    Splits footprints into rasterization passes in which no two pixel bounding boxes
+    share a pixel.
+
+    Each footprint takes the first pass not used by an earlier footprint it shares
+    pixels with, so footprints that overlap nothing all land in pass 0.
+
+    Args:
+        row_min (np.ndarray): First row of each footprint's pixel bounding box.
+        row_max (np.ndarray): Row after the last.
+        col_min (np.ndarray): First column.
+        col_max (np.ndarray): Column after the last.
+
+    Returns:
+        np.ndarray: Pass number of each footprint.
+    """
+    # Boxes shrunk by a quarter pixel only intersect when they share a pixel.
+    boxes = shapely.box(col_min + 0.25, row_min + 0.25, col_max - 0.25, row_max - 0.25)
+    earlier, later = shapely.STRtree(boxes).query(boxes, predicate="intersects")
+    conflicting = earlier < later
+    earlier, later = earlier[conflicting], later[conflicting]
+    passes = np.zeros(len(boxes), dtype=np.int64)
+    if len(later) == 0:
+        return passes
+
+    order = np.argsort(later, kind="stable")
+    earlier, later = earlier[order], later[order]
+    offsets = np.searchsorted(later, np.arange(len(boxes) + 1))
+    # Footprints are visited in order, so the passes of earlier ones are final.
+    for member in np.unique(later):
+        used = set(passes[earlier[offsets[member] : offsets[member + 1]]].tolist())
+        layer = 0
+        while layer in used:
+            layer += 1
+        passes[member] = layer
+    return passes
+
+
+def zonal_reduce(
+    geoms: np.ndarray,
+    read_window: Callable[[Window], np.ndarray],
+    transform: Affine,
+    height: int,
+    width: int,
+    block_shape: Tuple[int, int],
+    nodata: Optional[float],
+    stat: str = "max",
+    all_touched: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces the raster values under every footprint.
+
+    Footprints are grouped by the raster block holding the corner of their pixel
+    bounding box.  Each group is rasterized in one batch over the window covering
+    all of its footprints, and the labelled pixels are reduced per footprint with
+    `np.bincount` (mean) or sorted `reduceat` (max/min).  Footprints of a group
+    that may share pixels are rasterized in separate passes (see `overlap_passes`),
+    so every footprint is reduced over all of its own pixels.
+
+    Args:
+        geoms (np.ndarray): Shapely polygons in the raster CRS.
+        read_window (Callable[[Window], np.ndarray]): Reads band values for a window.
+        transform (Affine): The raster's affine transform.
+        height (int): Number of raster rows.
+        width (int): Number of raster columns.
+        block_shape (Tuple[int, int]): Block (rows, cols) size used for grouping.
+        nodata (Optional[float]): The raster's NoData value.
+        stat (str): "max", "mean" or "min".
+        all_touched (bool): Burn every pixel touched by a footprint instead of only
+            those whose centre is inside it.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The statistic per footprint (NaN when no valid
+        pixel is covered) and the number of valid pixels used.
+    """
+    if stat not in ZONAL_STATS:
+        raise ValueError(f"stat must be one of {ZONAL_STATS}, got '{stat}'.")
+
+    n = len(geoms)
+    result = np.full(n, np.nan)
+    counts = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return result, counts
+
+    row_min, row_max, col_min, col_max = footprint_pixel_bounds(
+        geoms, transform, height, width
+    )
+    has_pixels = (row_max > row_min) & (col_max > col_min)
+    candidates = np.flatnonzero(has_pixels)
+    if len(candidates) == 0:
+        return result, counts
+
+    block_height, block_width = block_shape
+    n_block_cols = -(-width // block_width)
+    group_ids = (row_min[candidates] // block_height) * n_block_cols + (
+        col_min[candidates] // block_width
+    )
+    order = np.argsort(group_ids, kind="stable")
+    sorted_ids = group_ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    ends = np.r_[starts[1:], len(sorted_ids)]
+
+    for start, end in zip(starts, ends):
+        members = candidates[order[start:end]]
+        window = Window(
+            int(col_min[members].min()),
+            int(row_min[members].min()),
+            int(col_max[members].max() - col_min[members].min()),
+            int(row_max[members].max() - row_min[members].min()),
+        )
+        data = read_window(window)
+        valid = ~nodata_mask(data, nodata)
+        passes = overlap_passes(
+            row_min[members], row_max[members], col_min[members], col_max[members]
+        )
+        pass_labels = []
+        pass_values = []
+        for layer in range(int(passes.max()) + 1):
+            in_layer = np.flatnonzero(passes == layer)
+            labels = rasterize(
+                zip(geoms[members[in_layer]], (in_layer + 1).tolist()),
+                out_shape=data.shape,
+                transform=window_transform(window, transform),
+                fill=0,
+                all_touched=all_touched,
+                dtype="int32",
+            )
+            selected = (labels > 0) & valid
+            pass_labels.append(labels[selected] - 1)
+            pass_values.append(data[selected].astype(float))
+        label = np.concatenate(pass_labels)
+        values = np.concatenate(pass_values)
+        if len(label) == 0:
+            continue
+
+        group_counts = np.bincount(label, minlength=len(members))
+        counts[members] = group_counts
+        if stat == "mean":
+            sums = np.bincount(label, weights=values, minlength=len(members))
+            touched = group_counts > 0
+            result[members[touched]] = sums[touched] / group_counts[touched]
+        else:
+            label_order = np.argsort(label, kind="stable")
+            sorted_label = label[label_order]
+            label_starts = np.flatnonzero(
+                np.r_[True, sorted_label[1:] != sorted_label[:-1]]
+            )
+            reducer = np.maximum if stat == "max" else np.minimum
+            reduced = reducer.reduceat(values[label_order], label_starts)
+            result[members[sorted_label[label_starts]]] = reduced
+    return result, counts
+
+
+def fill_slivers(
+    values: np.ndarray,
+    counts: np.ndarray,
+    geoms: np.ndarray,
+    coverage: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    sample_coordinates: Callable[[np.ndarray, np.ndarray], np.ndarray],
+) -> None:
+    """
+    Gives footprints without any valid pixel the depth at a point on their surface.
+
+    Slivers smaller than a cell contain no pixel centre, so they are sampled at a
+    point inside them instead.  `values` is updated in place.
+
+    Args:
+        values (np.ndarray): Zonal statistic per footprint, from `zonal_reduce`.
+        counts (np.ndarray): Valid pixel count per footprint, from `zonal_reduce`.
+        geoms (np.ndarray): The footprints, in the raster CRS.
+        coverage (Callable): Returns True for coordinates inside the raster.
+        sample_coordinates (Callable): Samples the raster at covered coordinates.
+    """
+    empty = counts == 0
+    if not empty.any():
+        return
+    points = shapely.get_coordinates(shapely.point_on_surface(geoms[empty]))
+    inside = coverage(points[:, 0], points[:, 1])
+    fallback = np.full(len(points), np.nan)
+    if inside.any():
+        fallback[inside] = sample_coordinates(points[inside, 0], points[inside, 1])
+    values[empty] = fallback
@@ -3,6 +3,15 @@ from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
 
 
 class AbstractVulnerabilityFunction(ABC):
+    """
+    Base class of vulnerability functions.
+
+    Subclasses that can compute damage percentages without writing them into the
+    buildings also provide `damage_percentages(depth_in_structure, mask=None)`,
+    returning arrays keyed by the building field names.  It is required by
+    `HazusFloodAnalysis.calculate_results`; see `DefaultFloodFunction`.
+    """
+
     def __init__(self, **params):
         """
         Abstract Vulnerability Function.
@@ -0,0 +1,140 @@
+import re
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Hazus depth columns: "ft04m" is -4 ft, "ft00" is 0 ft, "ft24" is 24 ft.
+DEPTH_COLUMN_PATTERN = re.compile(r"^ft(\d+)(m)?$")
+
+
+def column_depth(column: str) -> Optional[int]:
+    """
+    Returns the depth (ft) of a Hazus depth column, or None for other columns.
+
+    Args:
+        column (str): Column name, e.g. "ft04m".
+
+    Returns:
+        Optional[int]: The depth, negative for "m" (minus) columns.
+    """
+    match = DEPTH_COLUMN_PATTERN.match(str(column))
+    if match is None:
+        return None
+    depth = int(match.group(1))
+    return -depth if match.group(2) == "m" else depth
+
+
+class DamageCurves:
+    """
+    Hazus depth-damage functions compiled into a dense curve x depth matrix.
+
+    Every curve shares the table's depth breakpoints, so the damage of any number of
+    buildings is one searchsorted over the breakpoints and one gather from the matrix.
+    """
+
+    def __init__(self, ids: np.ndarray, depths: np.ndarray, values: np.ndarray):
+        """
+        Initializes a DamageCurves object.
+
+        Args:
+            ids (np.ndarray): Damage function ID of each curve, sorted and unique.
+            depths (np.ndarray): Increasing depth breakpoints (ft).
+            values (np.ndarray): Damage percentages, one row per ID and one column per
+                breakpoint.
+        """
+        if len(depths) < 2:
+            raise ValueError("Damage curves need at least two depth breakpoints.")
+        if values.shape != (len(ids), len(depths)):
+            raise ValueError("values must have one row per ID and one column per depth.")
+        self.ids = ids
+        self.depths = depths
+        self.values = values
+
+    @classmethod
+    def from_table(cls, table: pd.DataFrame) -> "DamageCurves":
+        """
+        Compiles a damage function table indexed by damage function ID.
+
+        Args:
+            table (pd.DataFrame): Table with depth columns like 'ft04m', 'ft00',
+                'ft01', and a unique ID index.  Other columns are ignored.
+
+        Returns:
+            DamageCurves: The compiled curves.
+        """
+        if not table.index.is_unique:
+            raise ValueError("The index of the damage function table must be unique.")
+        columns = {
+            column: depth
+            for column in table.columns
+            if (depth := column_depth(column)) is not None
+        }
+        ordered = sorted(columns, key=columns.get)
+        ids = np.asarray(table.index, dtype=float)
+        order = np.argsort(ids, kind="stable")
+        return cls(
+            ids[order],
+            np.array([columns[column] for column in ordered], dtype=float),
+            table[ordered].to_numpy(dtype=float)[order],
+        )
+
+    def rows(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Returns the matrix row of each damage function ID.
+
+        Args:
+            ids (np.ndarray): Damage function IDs.  Missing values are allowed.
+
+        Returns:
+            np.ndarray: Row indices, -1 for IDs without a curve.
+        """
+        ids = np.asarray(pd.to_numeric(pd.Series(ids), errors="coerce"), dtype=float)
+        if len(self.ids) == 0:
+            return np.full(len(ids), -1, dtype=np.intp)
+        positions = np.searchsorted(self.ids, ids)
+        clipped = np.minimum(positions, len(self.ids) - 1)
+        return np.where(self.ids[clipped] == ids, clipped, -1)
+
+    def interpolate(self, ids: np.ndarray, depths: np.ndarray) -> np.ndarray:
+        """
+        Interpolates the damage percentage of each building on its curve.
+
+        Depths outside the breakpoints are extrapolated from the first or last
+        segment.
+
+        Args:
+            ids (np.ndarray): Damage function ID of each building.
+            depths (np.ndarray): Depth in structure (ft) of each building.
+
+        Returns:
+            np.ndarray: Damage percentages (float64), NaN for unknown IDs and
+            missing depths.
+        """
+        return self.interpolate_rows(self.rows(ids), depths)
+
+    def interpolate_rows(self, rows: np.ndarray, depths: np.ndarray) -> np.ndarray:
+        """
+        Interpolates on curves already resolved with `rows`.
+
+        Lets callers evaluating many depths per building resolve the IDs once.
+
+        Args:
+            rows (np.ndarray): Matrix row of each building, -1 for none.
+            depths (np.ndarray): Depth in structure (ft) of each building.
+
+        Returns:
+            np.ndarray: Damage percentages (float64), NaN for rows of -1 and missing
+            depths.
+        """
+        depths = np.asarray(depths, dtype=float)
+        # 'right' keeps depths on a breakpoint in the segment starting there.
+        upper = np.clip(np.searchsorted(self.depths, depths, side="right"), 1, len(self.depths) - 1)
+        lower = upper - 1
+        factor = (depths - self.depths[lower]) / (self.depths[upper] - self.depths[lower])
+
+        known = rows >= 0
+        result = np.full(len(rows), np.nan)
+        lower_values = self.values[rows[known], lower[known]]
+        upper_values = self.values[rows[known], upper[known]]
+        result[known] = lower_values + factor[known] * (upper_values - lower_values)
+        return result
@@ -0,0 +1,305 @@
+import hashlib
+import importlib.resources as pkg_resources
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from fortis.engine.vulnerability.damage_curves import DamageCurves
+from fortis.engine.vulnerability.damage_xref import DamageXref
+
+# Hazus tables shipped in fortis.data and the index each one is looked up by.
+TABLES: Dict[str, List[str]] = {
+    "flBldgDmgFn": ["BldgDmgFnID"],
+    "flContDmgFn": ["ContDmgFnId"],
+    "flInvDmgFn": ["InvDmgFnId"],
+    "flDmgXRef": [
+        "Occupancy",
+        "Basement",
+        "StoriesMin",
+        "StoriesMax",
+        "HazardR",
+        "HazardCV",
+        "HazardCA",
+    ],
+    "flDebris": [],
+    "flRsFnGBS": [],
+}
+# Depth-damage tables compiled into dense curve matrices.
+CURVE_TABLES = ("flBldgDmgFn", "flContDmgFn", "flInvDmgFn")
+# Bumped whenever the layout of compiled bundles changes.
+BUNDLE_VERSION = 1
+CURVE_ARRAYS = ("ids", "depths", "values")
+
+_REGISTRY: Dict[str, "DamageData"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def default_cache_dir() -> str:
+    """
+    Returns $FORTIS_CACHE_DIR, or ~/.cache/fortis.
+
+    `get_damage_data` writes a compiled bundle of a few megabytes there on first use.
+    Set FORTIS_CACHE_DIR to keep it elsewhere, e.g. in a temporary directory for
+    tests.
+    """
+    return os.environ.get(
+        "FORTIS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fortis")
+    )
+
+
+def source_digest() -> str:
+    """Returns a digest of the shipped CSV tables, which names their compiled bundle."""
+    digest = hashlib.sha256(f"v{BUNDLE_VERSION}".encode("utf-8"))
+    for name in TABLES:
+        digest.update(pkg_resources.files("fortis.data").joinpath(f"{name}.csv").read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class DamageData:
+    """
+    The Hazus flood tables as plain column arrays, plus the depth-damage curves
+    compiled into dense matrices.
+
+    A bundle is written once as a directory of .npy files, one record array per
+    table and one array per compiled curve matrix, and loaded memory mapped,
+    so every process using the same cache directory shares the same pages and
+    loading does no parsing.  Text columns are stored as fixed-width unicode, with
+    missing text as "".  Use `get_damage_data` rather than building bundles directly.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, Dict[str, np.ndarray]],
+        curves: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    ):
+        """
+        Initializes a DamageData object.
+
+        Args:
+            columns (Dict[str, Dict[str, np.ndarray]]): Column arrays of each table, in
+                column order.
+            curves (Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]): IDs, depth
+                breakpoints and values of each compiled curve table.
+        """
+        self.columns = columns
+        self.curve_arrays = curves
+        self._derived: Dict[Any, Any] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_csv(cls) -> "DamageData":
+        """Parses and compiles the CSV tables shipped in fortis.data."""
+        columns = {}
+        for name in TABLES:
+            with (
+                pkg_resources.files("fortis.data")
+                .joinpath(f"{name}.csv")
+                .open("r", encoding="utf-8-sig") as table_file
+            ):
+                table = pd.read_csv(table_file)
+            columns[name] = {
+                column: _column_array(table[column]) for column in table.columns
+            }
+        curves = {}
+        for name in CURVE_TABLES:
+            table = pd.DataFrame(columns[name]).set_index(TABLES[name])
+            compiled = DamageCurves.from_table(table)
+            curves[name] = (compiled.ids, compiled.depths, compiled.values)
+        return cls(columns, curves)
+
+    @classmethod
+    def from_directory(cls, path: str) -> "DamageData":
+        """
+        Loads a compiled bundle, memory mapping every array.
+
+        Args:
+            path (str): Directory written by `write`.
+
+        Returns:
+            DamageData: The bundle.
+        """
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        def load(file_name: str) -> np.ndarray:
+            return np.load(os.path.join(path, file_name), mmap_mode="r")
+
+        columns = {}
+        for name, table_columns in manifest["tables"].items():
+            records = load(f"{name}.npy")
+            columns[name] = {column: records[f"f{i}"] for i, column in enumerate(table_columns)}
+        curves = {
+            name: tuple(load(f"{name}.curves.{array}.npy") for array in CURVE_ARRAYS)
+            for name in manifest["curves"]
+        }
+        return cls(columns, curves)
+
+    def write(self, path: str) -> None:
+        """
+        Writes the bundle as a directory of .npy files.
+
+        The directory is assembled under a temporary name and renamed, so concurrent
+        readers never see a partial bundle.
+
+        Args:
+            path (str): Target directory.
+        """
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        partial = tempfile.mkdtemp(dir=parent, prefix=".partial-")
+        try:
+            for name, table_columns in self.columns.items():
+                # One record array per table; fields are named f0, f1, ... in column order.
+                records = np.rec.fromarrays(
+                    [np.asarray(values) for values in table_columns.values()],
+                    names=[f"f{i}" for i in range(len(table_columns))],
+                )
+                np.save(os.path.join(partial, f"{name}.npy"), np.asarray(records))
+            for name, arrays in self.curve_arrays.items():
+                for array, values in zip(CURVE_ARRAYS, arrays):
+                    np.save(os.path.join(partial, f"{name}.curves.{array}.npy"), values)
+            manifest = {
+                "version": BUNDLE_VERSION,
+                "tables": {name: list(cols) for name, cols in self.columns.items()},
+                "curves": list(self.curve_arrays),
+            }
+            with open(os.path.join(partial, "manifest.json"), "w", encoding="utf-8") as out:
+                json.dump(manifest, out)
+            os.replace(partial, path)
+        except OSError:
+            shutil.rmtree(partial, ignore_errors=True)
+            # Another process may have published the same bundle first.
+            if not os.path.isdir(path):
+                raise
+
+    def memoize(self, key: Any, build: Callable[[], Any]) -> Any:
+        """
+        Returns a value derived from the bundle, built once per process.
+
+        Args:
+            key: Cache key of the derived value.
+            build (Callable[[], Any]): Builds the value on first use.
+
+        Returns:
+            Any: The shared value.  Must not be modified.
+        """
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build()
+            return self._derived[key]
+
+    def table(self, name: str) -> pd.DataFrame:
+        """
+        Returns a table indexed by its lookup columns (see `TABLES`).
+
+        The DataFrame is shared by every caller in the process and must not be modified.
+
+        Args:
+            name (str): Table name, e.g. "flBldgDmgFn".
+
+        Returns:
+            pd.DataFrame: The table.
+        """
+
+        def build() -> pd.DataFrame:
+            table = pd.DataFrame({column: np.asarray(values) for column, values in self.columns[name].items()})
+            return table.set_index(TABLES[name]) if TABLES[name] else table
+
+        return self.memoize(("table", name), build)
+
+    def curves(self, name: str) -> DamageCurves:
+        """
+        Returns the compiled curves of a depth-damage table, sharing the bundle's arrays.
+
+        Args:
+            name (str): "flBldgDmgFn", "flContDmgFn" or "flInvDmgFn".
+
+        Returns:
+            DamageCurves: The curves.
+        """
+        return self.memoize(("curves", name), lambda: DamageCurves(*self.curve_arrays[name]))
+
+    def xref(self, flood_type: str) -> DamageXref:
+        """
+        Returns the damage function cross reference compiled for a flood type.
+
+        Args:
+            flood_type (str): The type of flood (R, CV, CA).
+
+        Returns:
+            DamageXref: The compiled cross reference.
+        """
+        return self.memoize(
+            ("xref", flood_type),
+            lambda: DamageXref(pd.DataFrame(self.columns["flDmgXRef"]), flood_type),
+        )
+
+
+def get_damage_data(cache_dir: Optional[str] = None) -> DamageData:
+    """
+    Returns the process-wide Hazus flood tables.
+
+    The first call in a process loads the compiled bundle from `cache_dir`, compiling
+    it from the shipped CSVs if it is missing or stale.  Later calls return the same
+    object.  When the cache directory cannot be written the tables are compiled in
+    memory instead.
+
+    Compiling writes a `damage-data-<digest>` directory into `cache_dir`, which
+    persists across processes, and removes the bundles of other digests, left by
+    earlier versions of the tables.
+
+    Args:
+        cache_dir (str, optional): Directory holding compiled bundles.  Defaults to
+            `default_cache_dir()`.
+
+    Returns:
+        DamageData: The shared tables.
+    """
+    root = os.path.abspath(cache_dir or default_cache_dir())
+    with _REGISTRY_LOCK:
+        data = _REGISTRY.get(root)
+        if data is None:
+            data = _REGISTRY[root] = _load_or_compile(
+                os.path.join(root, f"damage-data-{source_digest()}")
+            )
+        return data
+
+
+def clear_damage_data() -> None:
+    """Forgets every loaded bundle, e.g. after the shipped tables changed."""
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
+
+
+def _load_or_compile(path: str) -> DamageData:
+    """Loads the bundle at `path`, compiling and writing it first if needed."""
+    if os.path.isfile(os.path.join(path, "manifest.json")):
+        return DamageData.from_directory(path)
+    data = DamageData.from_csv()
+    try:
+        data.write(path)
+    except OSError:
+        return data
+    _remove_stale_bundles(path)
+    return DamageData.from_directory(path)
+
+
+def _remove_stale_bundles(path: str) -> None:
+    """Removes the bundles next to `path` compiled from other versions of the tables."""
+    parent, current = os.path.split(os.path.abspath(path))
+    for name in os.listdir(parent):
+        if name.startswith("damage-data-") and name != current:
+            # Processes still mapping an old bundle keep their open files on POSIX;
+            # where removal fails the bundle is left for a later run.
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+
+def _column_array(column: pd.Series) -> np.ndarray:
+    """Converts a parsed CSV column to an array that can be saved without pickling."""
+    if column.dtype == object:
+        return column.fillna("").astype(str).to_numpy(dtype=str)
+    return column.to_numpy()
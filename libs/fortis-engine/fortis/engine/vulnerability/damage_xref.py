@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+# Hazard flag column of the cross reference table for each flood type.
+HAZARD_COLUMNS = {"R": "HazardR", "CV": "HazardCV", "CA": "HazardCA"}
+
+
+def normalize_occupancy(occupancy: str) -> str:
+    """
+    Maps an occupancy to its cross reference occupancy.
+
+    RES3 sub-classes carry a letter suffix ("RES3A" ... "RES3F") that the cross
+    reference table does not distinguish, so it is dropped.
+
+    Args:
+        occupancy (str): The occupancy type.
+
+    Returns:
+        str: The occupancy as used in the cross reference table.
+    """
+    if occupancy.startswith("RES3") and not occupancy[-1].isdigit():
+        return occupancy[:-1]
+    return occupancy
+
+
+class DamageXref:
+    """
+    The damage function cross reference table compiled for one flood type.
+
+    Rows are grouped by (occupancy, basement) into a padded candidate matrix in table
+    order, so every building is resolved to its first matching row with a handful
+    of array operations, however many buildings there are.
+    """
+
+    def __init__(self, xref: pd.DataFrame, flood_type: str):
+        """
+        Initializes a DamageXref object.
+
+        Args:
+            xref (pd.DataFrame): The cross reference table (flDmgXRef) with Occupancy,
+                Basement, StoriesMin, StoriesMax, hazard flag and damage function ID
+                columns.
+            flood_type (str): The type of flood (R, CV, CA).  Other values match rows
+                of any hazard.
+        """
+        self.flood_type = flood_type
+        hazard_column = HAZARD_COLUMNS.get(flood_type)
+        rows = xref if hazard_column is None else xref[xref[hazard_column] == 1]
+        self.table = rows.reset_index(drop=True)
+
+        # One group per (occupancy, basement) pair, its rows in table order.
+        self.occupancies = pd.Index(self.table["Occupancy"].unique())
+        groups = (
+            self.occupancies.get_indexer(self.table["Occupancy"]) * 2
+            + (self.table["Basement"].to_numpy() == 1)
+        )
+        width = max(1, int(np.bincount(groups).max(initial=0)))
+        self.candidates = np.full((len(self.occupancies) * 2, width), -1, dtype=np.intp)
+        for group, positions in self.table.groupby(groups).indices.items():
+            self.candidates[group, : len(positions)] = positions
+        self.stories_min = self.table["StoriesMin"].to_numpy(dtype=float)
+        self.stories_max = self.table["StoriesMax"].to_numpy(dtype=float)
+
+    def resolve_rows(
+        self, occupancy: np.ndarray, basement: np.ndarray, stories: np.ndarray
+    ) -> np.ndarray:
+        """
+        Finds the first cross reference row matching each building.
+
+        Args:
+            occupancy (np.ndarray): Occupancy type of each building.
+            basement (np.ndarray): True (or 1) for buildings with a basement.
+            stories (np.ndarray): Number of stories of each building.
+
+        Returns:
+            np.ndarray: Row positions in `table`, -1 where no row matches.
+        """
+        # Normalize each distinct occupancy once rather than once per building.
+        codes, uniques = pd.factorize(pd.Series(occupancy), use_na_sentinel=True)
+        normalized = [normalize_occupancy(str(value)) for value in uniques]
+        occupancy_codes = np.append(self.occupancies.get_indexer(normalized), -1)[codes]
+
+        stories = np.asarray(stories, dtype=float)
+        known = occupancy_codes >= 0
+        groups = occupancy_codes[known] * 2 + (np.asarray(basement)[known] == 1)
+        known_stories = stories[known]
+
+        found = np.full(len(groups), -1, dtype=np.intp)
+        for candidate in self.candidates[groups].T:
+            # Rows earlier in the table win, as with a first-match lookup.
+            position = np.maximum(candidate, 0)
+            matches = (
+                (found < 0)
+                & (candidate >= 0)
+                & (known_stories >= self.stories_min[position])
+                & (known_stories <= self.stories_max[position])
+            )
+            found[matches] = candidate[matches]
+
+        rows = np.full(len(occupancy_codes), -1, dtype=np.intp)
+        rows[known] = found
+        return rows
+
+    def damage_ids(self, rows: np.ndarray, id_column: str) -> np.ndarray:
+        """
+        Gathers a damage function ID column for resolved cross reference rows.
+
+        Args:
+            rows (np.ndarray): Row positions from `resolve_rows`.
+            id_column (str): BldgDmgFnId, ContDmgFnId or InvDmgFnId.
+
+        Returns:
+            np.ndarray: The damage function IDs, 0 where no row matched or the row
+            has no ID.
+        """
+        ids = np.append(self.table[id_column].fillna(0).to_numpy(dtype=float), 0.0)
+        return ids[rows].astype(np.int64)
+
+    def resolve(
+        self,
+        occupancy: np.ndarray,
+        basement: np.ndarray,
+        stories: np.ndarray,
+        id_column: str,
+    ) -> np.ndarray:
+        """
+        Resolves one damage function ID column for every building.
+
+        Args:
+            occupancy (np.ndarray): Occupancy type of each building.
+            basement (np.ndarray): True (or 1) for buildings with a basement.
+            stories (np.ndarray): Number of stories of each building.
+            id_column (str): BldgDmgFnId, ContDmgFnId or InvDmgFnId.
+
+        Returns:
+            np.ndarray: The damage function IDs, 0 where none applies.
+        """
+        return self.damage_ids(self.resolve_rows(occupancy, basement, stories), id_column)
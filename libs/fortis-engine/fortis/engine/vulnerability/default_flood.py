@@ -1,17 +1,19 @@
-import re
+from typing import Dict, Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
 from fortis.engine.vulnerability.abstract_vulnerability_function import (
     AbstractVulnerabilityFunction,
 )
-import importlib.resources as pkg_resources
+from fortis.engine.vulnerability.damage_curves import DamageCurves
+from fortis.engine.vulnerability.damage_data import DamageData, get_damage_data
 
 class DefaultFloodFunction(AbstractVulnerabilityFunction):
     def __init__(
         self,
         buildings: AbstractBuildingPoints,
         flood_type,
+        damage_data: Optional[DamageData] = None,
     ):
         """
         Initializes a DefaultFloodFunction object.
@@ -19,51 +21,27 @@ class DefaultFloodFunction(AbstractVulnerabilityFunction):
         Args:
             buildings (BuildingPoints): BuildingPoints object.
             flood_type (str): The type of flood to analyze (R, CV, CA).
+            damage_data (DamageData, optional): The Hazus tables.  Defaults to the
+                process-wide tables from `get_damage_data`.
         """
         self.flood_type = flood_type
         self.buildings = buildings
 
-        # Use package resources to load CSV files from the fortis_data package.
-        with (
-            pkg_resources.files("fortis.data")
-            .joinpath("flBldgDmgFn.csv")
-            .open("r", encoding="utf-8-sig") as bdf_file
-        ):
-            self.bdf = pd.read_csv(bdf_file)
-        with (
-            pkg_resources.files("fortis.data")
-            .joinpath("flContDmgFn.csv")
-            .open("r", encoding="utf-8-sig") as cdf_file
-        ):
-            self.cdf = pd.read_csv(cdf_file)
-        with (
-            pkg_resources.files("fortis.data")
-            .joinpath("flInvDmgFn.csv")
-            .open("r", encoding="utf-8-sig") as idf_file
-        ):
-            self.idf = pd.read_csv(idf_file)
-        with (
-            pkg_resources.files("fortis.data")
-            .joinpath("flDmgXRef.csv")
-            .open("r", encoding="utf-8-sig") as xdf_file
-        ):
-            self.xdf = pd.read_csv(xdf_file)
-
-        # index is used later so very important these are set.
-        self.bdf = self.bdf.set_index("BldgDmgFnID")
-        self.cdf = self.cdf.set_index("ContDmgFnId")
-        self.idf = self.idf.set_index("InvDmgFnId")
-        self.xdf = self.xdf.set_index(
-            [
-                "Occupancy",
-                "Basement",
-                "StoriesMin",
-                "StoriesMax",
-                "HazardR",
-                "HazardCV",
-                "HazardCA",
-            ]
-        )
+        # The Hazus tables are loaded once per process and shared by every instance.
+        if damage_data is None:
+            damage_data = get_damage_data()
+        self.bdf = damage_data.table("flBldgDmgFn")
+        self.cdf = damage_data.table("flContDmgFn")
+        self.idf = damage_data.table("flInvDmgFn")
+        self.xdf = damage_data.table("flDmgXRef")
+
+        # Dense curve matrices used to interpolate the damage percentages.
+        self.bdf_curves = damage_data.curves("flBldgDmgFn")
+        self.cdf_curves = damage_data.curves("flContDmgFn")
+        self.idf_curves = damage_data.curves("flInvDmgFn")
+
+        # Cross reference resolved for all buildings at once.
+        self.xref = damage_data.xref(flood_type)
 
         # self.xRefExecuted = False
 
@@ -79,47 +57,140 @@ class DefaultFloodFunction(AbstractVulnerabilityFunction):
         Returns:
             int: The damage ID
         """
-        # Retrieve function ID from cross reference table
-        # Handle special case for RES3 occupancy
-        if occupancy.startswith("RES3") and not occupancy[-1].isdigit():
-            occupancy = occupancy[:-1]
-
-        conditions = [
-            (occupancy == self.xdf.index.get_level_values("Occupancy")),
-            (basement == self.xdf.index.get_level_values("Basement")),
-            (stories >= self.xdf.index.get_level_values("StoriesMin")),
-            (stories <= self.xdf.index.get_level_values("StoriesMax")),
-        ]
-
-        # This is incorrect.  It is riverine or coastal.  If coastal it uses all three based on depth (wave action)
-        if self.flood_type == "R":
-            conditions.append(self.xdf.index.get_level_values("HazardR") == 1)
-        elif self.flood_type == "CV":
-            conditions.append(self.xdf.index.get_level_values("HazardCV") == 1)
-        elif self.flood_type == "CA":
-            conditions.append(self.xdf.index.get_level_values("HazardCA") == 1)
-
-        self.xRef = self.xdf[np.logical_and.reduce(conditions)]
-
-        return (
-            0
-            if len(self.xRef[dmgIdField].values) == 0
-            else (
-                self.xRef[dmgIdField].values[0]
-                if not pd.isna(self.xRef[dmgIdField].values[0])
-                else 0
+        return int(
+            self.xref.resolve(
+                np.array([occupancy], dtype=object), np.array([basement]), np.array([stories]), dmgIdField
+            )[0]
+        )
+
+    def _resolved_damage_ids(
+        self, mask: Optional[np.ndarray] = None
+    ) -> Dict[str, Tuple[Union[pd.Series, np.ndarray], np.ndarray]]:
+        """
+        Resolves the damage function IDs of the buildings without modifying them.
+
+        Args:
+            mask (np.ndarray, optional): Boolean mask of the buildings to process.
+
+        Returns:
+            Dict[str, Tuple[Union[pd.Series, np.ndarray], np.ndarray]]: For each ID
+            column, the IDs with missing (NaN or 0) values filled from the cross
+            reference, and the mask of the filled buildings.
+        """
+        fields = self.buildings.fields
+        gdf = self.buildings.frame
+
+        id_columns = [(fields.bddf_id, "BldgDmgFnId"), (fields.cddf_id, "ContDmgFnId")]
+        if fields.iddf_id in gdf.columns:
+            id_columns.append((fields.iddf_id, "InvDmgFnId"))
+
+        missing = {}
+        for column, xref_column in id_columns:
+            if column in gdf.columns:
+                ids = pd.to_numeric(gdf[column], errors="coerce").to_numpy(dtype=float)
+                missing[column] = np.isnan(ids) | (ids == 0)
+            else:
+                missing[column] = np.ones(len(gdf), dtype=bool)
+            if mask is not None:
+                missing[column] &= mask
+
+        # Resolve the cross reference rows once, for the buildings that need any ID.
+        needed = np.logical_or.reduce(list(missing.values()))
+        rows = np.full(len(gdf), -1, dtype=np.intp)
+        if needed.any():
+            rows[needed] = self.xref.resolve_rows(
+                gdf[fields.occupancy_type].to_numpy()[needed],
+                gdf[fields.foundation_type].to_numpy()[needed] == 4,
+                gdf[fields.number_stories].to_numpy()[needed],
             )
+
+        resolved = {}
+        for column, xref_column in id_columns:
+            if column not in gdf.columns:
+                resolved[column] = (self.xref.damage_ids(rows, xref_column), missing[column])
+            elif missing[column].any():
+                ids = gdf[column].mask(missing[column], self.xref.damage_ids(rows, xref_column))
+                resolved[column] = (ids, missing[column])
+            else:
+                resolved[column] = (gdf[column], missing[column])
+        return resolved
+
+    def assign_damage_ids(self, mask: Optional[np.ndarray] = None):
+        """
+        Fills missing (NaN or 0) building, content and inventory damage function IDs
+        from the cross reference table, for all buildings at once.
+
+        Args:
+            mask (np.ndarray, optional): Boolean mask of the buildings to process.
+        """
+        gdf = self.buildings.frame
+        for column, (ids, filled) in self._resolved_damage_ids(mask).items():
+            if filled.any():
+                gdf[column] = ids
+
+    def damage_ids(self, mask: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Returns the building, content and inventory damage function IDs, with missing
+        (NaN or 0) IDs filled from the cross reference, leaving the buildings untouched.
+
+        Args:
+            mask (np.ndarray, optional): Boolean mask of the buildings to fill.
+
+        Returns:
+            Dict[str, np.ndarray]: IDs keyed by the building field names.
+        """
+        return {
+            column: np.asarray(ids)
+            for column, (ids, _) in self._resolved_damage_ids(mask).items()
+        }
+
+    def damage_percentages(
+        self, depth_in_structure: np.ndarray, mask: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Computes the damage function IDs and the building, content and inventory damage
+        percentages as arrays, leaving the buildings untouched.
+
+        Args:
+            depth_in_structure (np.ndarray): Depth in structure of each building.
+            mask (np.ndarray, optional): Boolean mask of the buildings to process.
+                Buildings outside the mask get NaN percentages.
+
+        Returns:
+            Dict[str, np.ndarray]: Arrays keyed by the building field names.
+        """
+        fields = self.buildings.fields
+        float_dtype = self.buildings.float_dtype
+        results = self.damage_ids(mask)
+        results[fields.building_damage_percent] = self._interpolate(
+            self.bdf_curves, results[fields.bddf_id], depth_in_structure, mask, float_dtype
+        )
+        results[fields.content_damage_percent] = self._interpolate(
+            self.cdf_curves, results[fields.cddf_id], depth_in_structure, mask, float_dtype
         )
+        if fields.iddf_id in results:
+            results[fields.inventory_damage_percent] = self._interpolate(
+                self.idf_curves, results[fields.iddf_id], depth_in_structure, mask, float_dtype
+            )
+        return results
+
+    def apply_damage_percentages(self, mask: Optional[np.ndarray] = None):
+        """
+        Interpolates the building, content and inventory damage percentages.
 
-    def apply_damage_percentages(self):
+        Args:
+            mask (np.ndarray, optional): Boolean mask of the buildings to process, e.g.
+                the depth grid coverage.  Buildings outside the mask are left as NaN.
+        """
          # Add ouptut columns to building_points
         fields = self.buildings.fields
 
-        # Already have the three IDs identified.
-        self._interpolate_from_lookup(self.bdf, fields.depth_in_structure, fields.building_damage_percent, fields.bddf_id)
-        self._interpolate_from_lookup(self.cdf, fields.depth_in_structure, fields.content_damage_percent, fields.cddf_id)
-        if fields.iddf_id in self.buildings.gdf.columns:
-            self._interpolate_from_lookup(self.idf, fields.depth_in_structure, fields.inventory_damage_percent, fields.iddf_id)
+        # Buildings without pre-assigned IDs get them from the cross reference.
+        self.assign_damage_ids(mask)
+        self._interpolate_from_lookup(self.bdf_curves, fields.depth_in_structure, fields.building_damage_percent, fields.bddf_id, mask)
+        self._interpolate_from_lookup(self.cdf_curves, fields.depth_in_structure, fields.content_damage_percent, fields.cddf_id, mask)
+        if fields.iddf_id in self.buildings.frame.columns:
+            self._interpolate_from_lookup(self.idf_curves, fields.depth_in_structure, fields.inventory_damage_percent, fields.iddf_id, mask)
 
 
     def apply_damage_percentages2(self):
@@ -133,7 +204,7 @@ class DefaultFloodFunction(AbstractVulnerabilityFunction):
         """
         # Add ouptut columns to building_points
         fields = self.buildings.fields
-        gdf = self.buildings.gdf
+        gdf = self.buildings.frame
 
         gdf["BuildingDamagePct"] = None
 
@@ -151,51 +222,10 @@ class DefaultFloodFunction(AbstractVulnerabilityFunction):
         )
         fracs = depths - depths.floordiv(1)
 
-        # Retrieve function IDs from cross reference table
-        bldgXrefIds = gdf.apply(
-            lambda row: self.get_damage_id_from_xref(
-                row[fields.occupancy_type],
-                1 if row[fields.foundation_type] == 4 else 0,
-                row[fields.number_stories],
-                "BldgDmgFnId",
-            ),
-            axis=1,
-        )
-        contXrefIds = gdf.apply(
-            lambda row: self.get_damage_id_from_xref(
-                row[fields.occupancy_type],
-                1 if row[fields.foundation_type] == 4 else 0,
-                row[fields.number_stories],
-                "ContDmgFnId",
-            ),
-            axis=1,
-        )
-        invXrefIds = gdf.apply(
-            lambda row: self.get_damage_id_from_xref(
-                row[fields.occupancy_type],
-                1 if row[fields.foundation_type] == 4 else 0,
-                row[fields.number_stories],
-                "InvDmgFnId",
-            ),
-            axis=1,
-        )
-
-        # Update building points with cross reference IDs if not provided
-        gdf[fields.bddf_id] = gdf[fields.bddf_id].apply(
-            lambda x: bldgXrefIds[x.name] if pd.isna(x) or x == 0 else x
-        )
-        gdf[fields.cddf_id] = gdf[fields.cddf_id].apply(
-            lambda x: contXrefIds[x.name] if pd.isna(x) or x == 0 else x
-        )
-        if fields.iddf_id in gdf.columns:
-            gdf[fields.iddf_id] = gdf.apply(
-                lambda row: invXrefIds[row.name]
-                if pd.isna(row[fields.iddf_id]) or row[fields.iddf_id] == 0
-                else row[fields.iddf_id],
-                axis=1,
-            )
-        else:
-            gdf[fields.iddf_id] = 0
+        # Retrieve function IDs from cross reference table if not provided
+        if fields.iddf_id not in gdf.columns:
+            gdf[fields.iddf_id] = np.nan
+        self.assign_damage_ids()
 
         gdf[fields.building_damage_percent] = self._calculate_damage_pct(
             l_indices, u_indices, fracs, gdf, fields.bddf_id, self.bdf
@@ -222,97 +252,50 @@ class DefaultFloodFunction(AbstractVulnerabilityFunction):
         )
         return lower_values + fracs * (upper_values - lower_values)
 
-    def _interpolate_from_lookup(self, lookup_df: pd.DataFrame, flooddepth_col: str, result_col: str, id_col_gdf: str):
+    def _interpolate_from_lookup(self, curves: DamageCurves, flooddepth_col: str, result_col: str, id_col_gdf: str, mask: Optional[np.ndarray] = None):
         """
-        Interpolates values from a lookup table, handling negative columns,
-        matching by an ID column in the gdf to a unique ID column in the lookup_df,
-        and adds the result to a specified column. Modifies the gdf in-place.
+        Interpolates damage percentages on compiled damage curves, matching by an ID
+        column in the gdf, and adds the result to a specified column.  Modifies the
+        gdf in-place.
 
         Args:
-            lookup_df: Dataframe with columns like 'ft04m', 'ft00', 'ft01', etc.,
-                and a *unique* ID column.  The ID column should be set as the index.
+            curves: The compiled damage function table.
             flooddepth_col: Name of the flood depth column in gdf.
             result_col: Name of the column in gdf to store the interpolated result.
             id_col_gdf: Name of the ID column in the gdf.
+            mask: Optional boolean mask of the rows to process; other rows stay NaN.
 
         Returns:
             None (Modifies the gdf in-place)
         """
 
-        gdf = self.buildings.gdf
+        gdf = self.buildings.frame
 
         # Check if the ID columns exist
         if id_col_gdf not in gdf.columns:
             raise ValueError(f"ID column '{id_col_gdf}' not found in gdf.")
 
-        if not lookup_df.index.is_unique:
-            raise ValueError("The index of lookup_df must be unique.")
-            
-        # Pre-compile the regex for efficiency
-        col_name_pattern = re.compile(r"^ft(\d+)(m)?$")
-
-        # Create mapping dictionaries *outside* the loop
-        def col_name_to_int(col_name):
-            match = col_name_pattern.match(col_name)
-            if match:
-                value = int(match.group(1))
-                return -value if match.group(2) == 'm' else value
-            return col_name  # Return original if no match
-
-        col_to_int_map = {
-            col: col_name_to_int(col)
-            for col in lookup_df.columns
-            if isinstance(col_name_to_int(col), int) # only map columns we can convert.
-        }
-        int_to_col_map = {value: key for key, value in col_to_int_map.items()}
-
-        # --- Main Interpolation Logic ---
-        gdf[result_col] = np.nan  # Initialize the result column
-
-        # Iterate over the unique IDs in the GDF
-        for unique_id in gdf[id_col_gdf].unique():
-
-            # Filter the gdf for the current ID (this is our primary subset)
-            gdf_subset = gdf[gdf[id_col_gdf] == unique_id]
-
-            # Efficiently check if the ID exists in the lookup_df
-            if unique_id not in lookup_df.index:
-                continue  # Skip if ID is not found
-            lookup_row = lookup_df.loc[unique_id] # a Series
-
-            # Get the valid lookup ints *for this row*
-            lookup_ints = np.array(sorted([col_to_int_map[col] for col in lookup_row.index if col in col_to_int_map]))
-
-            # 2. Find Floor and Ceiling (using the gdf_subset)
-            flood_values = gdf_subset[flooddepth_col].to_numpy()
-            # Use 'side=right' to handle the case where flood_value is exactly an integer.
-            insertion_points = np.searchsorted(lookup_ints, flood_values, side='right')
-            #Clip insertion points.  This is very important.
-            insertion_points = np.clip(insertion_points, 1, len(lookup_ints) -1)
-            
-            floor_indices = insertion_points - 1
-            ceil_indices = insertion_points
-
-            floor_ints = lookup_ints[floor_indices]
-            ceil_ints = lookup_ints[ceil_indices]
-            
-            # Map integer indices back to column names, handling potential missing mappings
-            floor_cols = [int_to_col_map.get(i) for i in floor_ints]
-            ceil_cols = [int_to_col_map.get(i) for i in ceil_ints]
-
-
-            # Handle edge cases:  If the flood depth is exactly on a lookup value, use that value directly.
-            floor_lookup_values = np.array([lookup_row[col] if col is not None else np.nan for col in floor_cols])
-            ceil_lookup_values = np.array([lookup_row[col] if col is not None else np.nan for col in ceil_cols])
-
-
-            # 4. Interpolate
-            interp_factor = np.where(
-                (ceil_ints - floor_ints) != 0,
-                (flood_values - floor_ints) / (ceil_ints - floor_ints),
-                0  # Avoid division by zero
-            )
-            interp_result = floor_lookup_values + interp_factor * (ceil_lookup_values - floor_lookup_values)
+        gdf[result_col] = self._interpolate(
+            curves,
+            gdf[id_col_gdf].to_numpy(),
+            gdf[flooddepth_col].to_numpy(dtype=float),
+            mask,
+            self.buildings.float_dtype,
+        )
 
-            # Assign to the *original* gdf using the index from the subset.
-            gdf.loc[gdf_subset.index, result_col] = interp_result  
\ No newline at end of file
+    @staticmethod
+    def _interpolate(
+        curves: DamageCurves,
+        ids: np.ndarray,
+        depths: np.ndarray,
+        mask: Optional[np.ndarray],
+        float_dtype: np.dtype,
+    ) -> np.ndarray:
+        """Interpolates damage percentages; buildings outside the mask and IDs without a curve are NaN."""
+        result = np.full(len(ids), np.nan, dtype=float_dtype)
+        depths = np.asarray(depths, dtype=float)
+        if mask is None:
+            result[:] = curves.interpolate(ids, depths)
+        else:
+            result[mask] = curves.interpolate(ids[mask], depths[mask])
+        return result
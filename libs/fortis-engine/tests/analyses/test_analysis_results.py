@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fortis.engine.analyses.analysis_results import AnalysisResults
+
+
+@pytest.fixture
+def inventory():
+    return pd.DataFrame({"Id": [10, 11, 12], "Loss": [0.0, 0.0, 0.0]}, index=[5, 6, 7])
+
+
+def test_export_joins_lazily_in_input_order(inventory):
+    results = AnalysisResults(
+        inventory,
+        {"Loss": np.array([1.0, 2.0, 3.0]), "DmgId": np.array([1, 2, 3])},
+        float_dtype=np.float32,
+        original_order=np.array([2, 0, 1]),
+    )
+
+    assert results["Loss"].dtype == np.float32
+    assert results["DmgId"].dtype == np.int64
+    assert results.nbytes == 3 * 4 + 3 * 8
+
+    exported = results.to_dataframe()
+    assert list(exported.columns) == ["Id", "Loss", "DmgId"]
+    assert list(exported.index) == [6, 7, 5]
+    assert list(exported["Loss"]) == [2.0, 3.0, 1.0]
+    assert (inventory["Loss"] == 0.0).all()
+    assert list(results.to_frame().columns) == ["Loss", "DmgId"]
+
+
+def test_rejects_misaligned_outputs(inventory):
+    with pytest.raises(ValueError, match="rows"):
+        AnalysisResults(inventory, {"Loss": np.zeros(2)})
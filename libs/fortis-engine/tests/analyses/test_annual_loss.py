@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from affine import Affine
+from fortis.engine.analyses.annual_loss import AnnualLoss, scenario_annual_loss
+from fortis.engine.analyses.scenario_runner import ScenarioRunner
+from fortis.engine.models.array_flood_depth_grid import ArrayFloodDepthGrid
+from fortis.engine.models.fast_buildings import FastBuildings
+
+RETURN_PERIODS = [10, 25, 100, 500]
+
+
+def integral(losses, probabilities):
+    """Trapezoidal integral of each row of losses over decreasing probabilities."""
+    return ((losses[:, 1:] + losses[:, :-1]) / 2 * -np.diff(probabilities)).sum(axis=1)
+
+
+@pytest.fixture
+def losses():
+    """Losses of 6 buildings (rows) in the RETURN_PERIODS scenarios (columns)."""
+    rng = np.random.default_rng(2)
+    matrix = np.sort(rng.uniform(0, 1_000, (6, 4)), axis=1)
+    matrix[0, 0] = np.nan
+    return matrix
+
+
+def test_aal_is_the_trapezoidal_integral(losses):
+    annual_loss = AnnualLoss(6, units=["a", "b", "a", None, "b", "b"])
+    for column, return_period in enumerate(RETURN_PERIODS):
+        annual_loss.add(return_period, losses[:, column])
+
+    probabilities = 1.0 / np.array(RETURN_PERIODS)
+    filled = np.nan_to_num(losses)
+    expected = integral(filled, probabilities)
+    np.testing.assert_allclose(annual_loss.building_aal, expected)
+    pd.testing.assert_series_equal(
+        annual_loss.unit_aal,
+        pd.Series([expected[[0, 2]].sum(), expected[[1, 4, 5]].sum()], index=pd.Index(["a", "b"])),
+    )
+    assert annual_loss.portfolio_aal == pytest.approx(expected.sum())
+
+    curve = annual_loss.ep_curve("b")
+    np.testing.assert_allclose(curve["loss"], filled[[1, 4, 5]].sum(axis=0))
+    np.testing.assert_allclose(curve["exceedance_probability"], probabilities)
+    np.testing.assert_allclose(annual_loss.ep_curve()["loss"], filled.sum(axis=0))
+
+
+def test_head_and_tail_segments(losses):
+    annual_loss = AnnualLoss(6, tail="constant", zero_loss_probability=0.5)
+    annual_loss.add_batch(RETURN_PERIODS, losses)
+
+    filled = np.nan_to_num(losses)
+    probabilities = np.concatenate([[0.5], 1.0 / np.array(RETURN_PERIODS), [0.0]])
+    curve = np.column_stack([np.zeros(6), filled, filled[:, -1]])
+    np.testing.assert_allclose(annual_loss.building_aal, integral(curve, probabilities))
+
+
+def test_scenarios_must_be_added_in_order():
+    annual_loss = AnnualLoss(2)
+    annual_loss.add(100, np.ones(2))
+    with pytest.raises(ValueError, match="increasing return period"):
+        annual_loss.add(50, np.ones(2))
+    with pytest.raises(ValueError, match="2 entries"):
+        annual_loss.add(200, np.ones(3))
+    with pytest.raises(ValueError, match="tail"):
+        AnnualLoss(2, tail="linear")
+
+
+def test_scenario_annual_loss_streams_the_runner(tmp_path):
+    rng = np.random.default_rng(8)
+    n = 20
+    pd.DataFrame(
+        {
+            "FltyId": np.arange(n),
+            "Occ": "RES1",
+            "Cost": rng.integers(100_000, 500_000, n),
+            "NumStories": 1,
+            "FoundationType": 7,
+            "FirstFloorHt": 1,
+            "Area": 2_000,
+            "ContentCost": 50_000,
+            "BldgDamageFnID": 213,
+            "CDDF_ID": 29,
+            "Latitude": rng.uniform(21.21, 21.69, n),
+            "Longitude": rng.uniform(-158.19, -157.71, n),
+        }
+    ).to_csv(tmp_path / "udf.csv", index=False)
+    buildings = FastBuildings(str(tmp_path / "udf.csv"))
+    rows, cols = np.mgrid[0:50, 0:50]
+    transform = Affine(0.01, 0.0, -158.2, 0.0, -0.01, 21.7)
+    grids = [
+        ArrayFloodDepthGrid(scale * (rows + cols) / 10.0, transform, "EPSG:4326")
+        for scale in (3.0, 1.0, 2.0)
+    ]
+    runner = ScenarioRunner(buildings, batch_size=2)
+
+    streamed = scenario_annual_loss(runner, grids, [500, 10, 100], units=["x"] * n)
+
+    expected = AnnualLoss(n)
+    expected.add_batch([10, 100, 500], runner.run([grids[1], grids[2], grids[0]]))
+    np.testing.assert_allclose(streamed.building_aal, expected.building_aal)
+    assert streamed.unit_aal["x"] == pytest.approx(expected.portfolio_aal)
+    assert streamed.return_periods == [10, 100, 500]
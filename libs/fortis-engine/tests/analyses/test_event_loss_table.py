@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+import pytest
+from affine import Affine
+from fortis.engine.analyses.event_loss_table import (
+    EventLossTable,
+    EventLossWriter,
+    scenario_event_losses,
+)
+from fortis.engine.analyses.hazus_flood import HazusFloodAnalysis
+from fortis.engine.analyses.scenario_runner import ScenarioRunner
+from fortis.engine.models.array_flood_depth_grid import ArrayFloodDepthGrid
+from fortis.engine.models.fast_buildings import FastBuildings
+from fortis.engine.vulnerability.default_flood import DefaultFloodFunction
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(4)
+    n = 50
+    return pd.DataFrame(
+        {
+            "event_id": np.repeat([3, 1, 7, 3, 9], 10),
+            "building": rng.integers(0, 12, n),
+            "building_loss": rng.uniform(0, 1_000, n),
+            "content_loss": rng.uniform(0, 500, n),
+        }
+    )
+
+
+def test_table_round_trips_and_aggregates(rows, tmp_path):
+    path = str(tmp_path / "elt")
+    with EventLossWriter(path, float_dtype="float64", row_group_size=15) as writer:
+        for start in range(0, len(rows), 10):
+            writer.write(rows.iloc[start : start + 10])
+
+    table = EventLossTable(path)
+    assert len(table) == 50
+    assert table.row_groups == [20, 20, 10]
+
+    frame = table.to_frame()
+    np.testing.assert_array_equal(frame["event_id"], rows["event_id"])
+    np.testing.assert_allclose(frame["building_loss"], rows["building_loss"])
+    assert (frame["inventory_loss"] == 0).all()
+    assert set(table.to_frame(events=[7])["event_id"]) == {7}
+
+    total = rows["building_loss"] + rows["content_loss"]
+    pd.testing.assert_series_equal(
+        table.event_losses(),
+        total.groupby(rows["event_id"]).sum().rename("total_loss").rename_axis(None),
+        check_index_type=False,
+    )
+    rates = {1: 0.1, 3: 0.01, 7: 0.5}
+    weighted = total * rows["event_id"].map(rates).fillna(0.0)
+    expected = weighted.groupby(rows["building"]).sum().reindex(range(12), fill_value=0.0)
+    np.testing.assert_allclose(table.building_losses(12, event_rates=rates), expected)
+    np.testing.assert_allclose(
+        table.building_losses(12, "content_loss"),
+        rows["content_loss"].groupby(rows["building"]).sum().reindex(range(12), fill_value=0.0),
+    )
+    with pytest.raises(ValueError, match="Unknown loss column"):
+        table.event_losses("debris")
+
+
+def test_table_is_readable_before_close(rows, tmp_path):
+    path = str(tmp_path / "elt")
+    writer = EventLossWriter(path, row_group_size=20)
+    writer.write(rows.iloc[:25])
+
+    assert len(EventLossTable(path)) == 25
+    writer.close()
+    assert len(EventLossTable(path)) == 25
+
+
+def test_writer_only_replaces_event_loss_tables(rows, tmp_path):
+    path = tmp_path / "elt"
+    with EventLossWriter(str(path)) as writer:
+        writer.write(rows)
+    with EventLossWriter(str(path)) as writer:
+        writer.write(rows.iloc[:5])
+    assert len(EventLossTable(str(path))) == 5
+
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "keep.txt").write_text("data")
+    with pytest.raises(ValueError, match="not an event loss table"):
+        EventLossWriter(str(other))
+    assert (other / "keep.txt").exists()
+    (other / "manifest.json").write_text("{}")
+    with pytest.raises(ValueError, match="overwrite=True"):
+        EventLossWriter(str(other))
+
+    EventLossWriter(str(other), overwrite=True).close()
+    assert len(EventLossTable(str(other))) == 0
+    assert not (other / "keep.txt").exists()
+    (tmp_path / "empty").mkdir()
+    EventLossWriter(str(tmp_path / "empty")).close()
+
+
+def test_analysis_writes_wet_buildings_only(tmp_path):
+    rng = np.random.default_rng(6)
+    n = 30
+    pd.DataFrame(
+        {
+            "FltyId": np.arange(n),
+            "Occ": rng.choice(["RES1", "IND2"], n),
+            "Cost": rng.integers(100_000, 500_000, n),
+            "NumStories": 1,
+            "FoundationType": 7,
+            "FirstFloorHt": 1,
+            "Area": 2_000,
+            "ContentCost": 50_000,
+            "Latitude": rng.uniform(21.21, 21.69, n),
+            "Longitude": rng.uniform(-158.19, -157.71, n),
+        }
+    ).to_csv(tmp_path / "udf.csv", index=False)
+    buildings = FastBuildings(str(tmp_path / "udf.csv"))
+    buildings.spatial_sort()
+    transform = Affine(0.01, 0.0, -158.2, 0.0, -0.01, 21.7)
+    rows, cols = np.mgrid[0:50, 0:50]
+    grids = {
+        11: ArrayFloodDepthGrid((rows - 25) / 5.0, transform, "EPSG:4326"),
+        12: ArrayFloodDepthGrid(np.full((25, 50), 3.0), transform, "EPSG:4326", out_of_bounds="mask"),
+    }
+
+    path = str(tmp_path / "elt")
+    expected = {}
+    with EventLossWriter(path, float_dtype="float64") as writer:
+        for event_id, grid in grids.items():
+            analysis = HazusFloodAnalysis(buildings, DefaultFloodFunction(buildings, "R"), grid)
+            written = analysis.write_event_losses(writer, event_id)
+            loss = buildings.restore_order(
+                np.nan_to_num(analysis.calculate_results()[buildings.fields.building_loss])
+            )
+            expected[event_id] = loss
+            assert 0 < written < n
+
+    frame = EventLossTable(path).to_frame()
+    for event_id, loss in expected.items():
+        event = frame[frame["event_id"] == event_id]
+        assert set(event["building"]) == set(np.flatnonzero(loss > 0))
+        np.testing.assert_allclose(event["building_loss"], loss[event["building"]])
+    assert "BldgLossUSD" not in buildings.frame.columns
+
+    catalog_path = str(tmp_path / "catalog")
+    with EventLossWriter(catalog_path, float_dtype="float64") as writer:
+        runner = ScenarioRunner(buildings, batch_size=1)
+        written = scenario_event_losses(runner, list(grids.values()), list(grids), writer)
+    catalog = EventLossTable(catalog_path).to_frame()
+    assert written == len(frame)
+    pd.testing.assert_frame_equal(catalog, frame)
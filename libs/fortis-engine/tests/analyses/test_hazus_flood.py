@@ -1,9 +1,15 @@
 import os
 import pytest
 import numpy as np
+import pandas as pd
 from fortis.engine.analyses.hazus_flood import HazusFloodAnalysis
+from fortis.engine.analyses.hazus_tables import DEBRIS_WEIGHT_COLUMNS
+from fortis.engine.models.building_schema import COMPACT_SCHEMA
 from fortis.engine.models.fast_buildings import FastBuildings
 from fortis.engine.models.flood_depth_grid import FloodDepthGrid
+from fortis.engine.vulnerability.abstract_vulnerability_function import (
+    AbstractVulnerabilityFunction,
+)
 from fortis.engine.vulnerability.default_flood import DefaultFloodFunction
 
 
@@ -42,6 +48,155 @@ def test_calculate_losses(small_udf_buildings, vulnerability_func, flood_depth_g
     assert all(result[small_udf_buildings.fields.flood_depth] > 0.0)
     # Check that damage is calculated as expected from the vulnerability function.
     assert all(result[small_udf_buildings.fields.building_loss] > 1.0)
+    # The lookups leave no scratch columns behind; the debris weights are outputs.
+    assert not {"FoundType", "merge_key", "depth_offset"} & set(result.columns)
+    assert set(DEBRIS_WEIGHT_COLUMNS) <= set(result.columns)
+
+
+def test_calculate_losses_skips_uncovered_buildings(small_udf_buildings, vulnerability_func):
+    """Buildings outside the depth grid keep NaN results instead of being processed."""
+
+    class PartialFloodDepthGrid:
+        def get_depth_vectorized(self, geometry):
+            return self.get_depth_with_coverage(geometry)[0]
+
+        def get_depth_with_coverage(self, geometry):
+            covered = np.arange(len(geometry)) % 2 == 0
+            return np.where(covered, 6.0, np.nan), covered
+
+    fields = small_udf_buildings.fields
+    analysis = HazusFloodAnalysis(
+        small_udf_buildings, vulnerability_func, PartialFloodDepthGrid()
+    )
+    analysis.calculate_losses()
+
+    result = small_udf_buildings.gdf
+    covered = analysis.covered
+    assert (result.loc[covered, fields.building_loss] > 1.0).all()
+    assert result.loc[~covered, fields.building_loss].isna().all()
+    assert result.loc[~covered, fields.debris_total].isna().all()
+    assert result.loc[~covered, fields.restoration_minimum].isna().all()
+
+
+def test_rerun_with_a_smaller_grid_clears_uncovered_rows(
+    small_udf_buildings, vulnerability_func, flood_depth_grid
+):
+    """A second run resets the rows the new grid does not cover."""
+
+    class FirstRowOnlyGrid:
+        def get_depth_vectorized(self, geometry):
+            return self.get_depth_with_coverage(geometry)[0]
+
+        def get_depth_with_coverage(self, geometry):
+            covered = np.arange(len(geometry)) == 0
+            return np.where(covered, 6.0, np.nan), covered
+
+    fields = small_udf_buildings.fields
+    HazusFloodAnalysis(small_udf_buildings, vulnerability_func, flood_depth_grid).calculate_losses()
+    first = small_udf_buildings.gdf.copy()
+    outputs = [*DEBRIS_WEIGHT_COLUMNS, fields.debris_total, fields.restoration_minimum]
+    assert first[outputs].iloc[1:].notna().any().all()
+
+    HazusFloodAnalysis(small_udf_buildings, vulnerability_func, FirstRowOnlyGrid()).calculate_losses()
+    result = small_udf_buildings.gdf
+    assert result[[fields.building_loss, *outputs]].iloc[1:].isna().all().all()
+    pd.testing.assert_series_equal(result[outputs].iloc[0], first[outputs].iloc[0])
+
+
+def test_calculate_losses_with_footprints(small_udf_buildings, vulnerability_func):
+    """Footprint zonal depths replace point depths, matched to buildings by index."""
+
+    class ZonalFloodDepthGrid:
+        def get_depth_vectorized(self, geometry):
+            raise AssertionError("point depths should not be sampled")
+
+        def get_zonal_depth_with_coverage(self, footprints, stat):
+            assert stat == "mean"
+            return np.full(len(footprints), 6.0), np.ones(len(footprints), dtype=bool)
+
+    gdf = small_udf_buildings.gdf
+    footprints = gdf.geometry.buffer(0.0001).iloc[::-1]
+    analysis = HazusFloodAnalysis(
+        small_udf_buildings,
+        vulnerability_func,
+        ZonalFloodDepthGrid(),
+        footprints=footprints,
+        zonal_stat="mean",
+    )
+    analysis.calculate_losses()
+
+    assert (gdf[small_udf_buildings.fields.flood_depth] == 6.0).all()
+    assert (gdf[small_udf_buildings.fields.building_loss] > 1.0).all()
+
+    with pytest.raises(ValueError, match=".*footprints.*"):
+        HazusFloodAnalysis(
+            small_udf_buildings, vulnerability_func, ZonalFloodDepthGrid(), footprints=footprints[1:]
+        ).calculate_losses()
+
+
+def test_calculate_results_leaves_the_inventory_untouched(
+    small_udf_buildings, vulnerability_func, flood_depth_grid
+):
+    gdf = small_udf_buildings.gdf
+    before = gdf.copy()
+    analysis = HazusFloodAnalysis(small_udf_buildings, vulnerability_func, flood_depth_grid)
+
+    results = analysis.calculate_results(float_dtype="float32")
+
+    pd.testing.assert_frame_equal(gdf, before)
+    fields = small_udf_buildings.fields
+    assert results[fields.building_loss].dtype == np.float32
+    assert "FinishWt" in results.columns
+
+    analysis.calculate_losses()
+    exported = results.to_dataframe()
+    assert list(exported.index) == list(gdf.index)
+    for column in results.columns:
+        np.testing.assert_allclose(
+            exported[column].astype(float), gdf[column].astype(float), rtol=1e-6, err_msg=column
+        )
+
+
+def test_calculate_results_needs_damage_percentages(small_udf_buildings, flood_depth_grid):
+    class ApplyOnlyFunction(AbstractVulnerabilityFunction):
+        def apply_damage_percentages(self, building_points):
+            pass
+
+    analysis = HazusFloodAnalysis(small_udf_buildings, ApplyOnlyFunction(), flood_depth_grid)
+    with pytest.raises(ValueError, match="ApplyOnlyFunction has no damage_percentages"):
+        analysis.calculate_results()
+
+
+def test_missing_foundation_type_under_the_compact_schema(flood_depth_grid):
+    """Buildings with a missing foundation type get no debris instead of failing the run."""
+    df = pd.DataFrame(
+        {
+            "FltyId": [1, 2, 3],
+            "Occ": ["RES1", "RES1", "COM1"],
+            "Cost": 100_000,
+            "NumStories": 1,
+            "FoundationType": [4, np.nan, 7],
+            "FirstFloorHt": 1,
+            "Area": 1_000,
+            "ContentCost": 50_000,
+            "BldgDamageFnID": [112, 105, 217],
+            "CDDF_ID": [29, 29, 0],
+            "Latitude": 21.5,
+            "Longitude": -158.0,
+        }
+    )
+    buildings = FastBuildings.from_dataframe(df, schema=COMPACT_SCHEMA)
+    assert buildings.frame["FoundationType"].dtype == "Int8"
+
+    HazusFloodAnalysis(
+        buildings, DefaultFloodFunction(buildings, flood_type="R"), flood_depth_grid
+    ).calculate_losses()
+
+    debris = buildings.frame[buildings.fields.debris_total]
+    assert debris[[0, 2]].notna().all()
+    assert np.isnan(debris[1])
+    assert (buildings.frame[buildings.fields.building_loss] > 0).all()
+
 
 def test_calculate_losses_with_example_files():
     example_csv_path = os.path.join(os.path.dirname(__file__), '../../../../examples/HI_Honolulu_UDF_sample.csv')
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from fortis.engine.analyses.interval_table import IntervalTable
+
+
+def test_lookup_matches_half_open_intervals_per_key():
+    table = IntervalTable.from_frame(
+        pd.DataFrame(
+            {
+                "Occ": ["B", "A", "A", "B", "A"],
+                "Found": ["Slab", "Slab", "Slab", "Slab", "Footing"],
+                "Min": [0, 4, 0, -4, 0],
+                "Max": [24, 8, 4, 0, 25],
+                "Wt": [5.0, 2.0, 1.0, 4.0, 3.0],
+            }
+        ),
+        ["Occ", "Found"],
+        "Min",
+        "Max",
+        ["Wt"],
+    )
+    occupancy = np.array(["A", "A", "A", "A", "B", "B", "C", "B", "A"], dtype=object)
+    found = np.array(["Slab", "Slab", "Slab", "Footing", "Slab", "Slab", "Slab", "Footing", "Slab"])
+    depths = np.array([0.0, 3.99, 4.0, 10.0, -4.0, 24.0, 1.0, 1.0, np.nan])
+
+    rows, keyed = table.lookup(table.key_codes(occupancy, found), depths)
+
+    np.testing.assert_array_equal(keyed, [True] * 6 + [False, False, True])
+    np.testing.assert_array_equal(
+        table.gather(rows, "Wt"), [1.0, 1.0, 2.0, 3.0, 4.0, np.nan, np.nan, np.nan, np.nan]
+    )
+    assert table.gather(rows, "Wt", np.float32).dtype == np.float32
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+from affine import Affine
+from fortis.engine.analyses.hazus_flood import HazusFloodAnalysis
+from fortis.engine.analyses.scenario_runner import ScenarioRunner
+from fortis.engine.models.array_flood_depth_grid import ArrayFloodDepthGrid
+from fortis.engine.models.fast_buildings import FastBuildings
+from fortis.engine.vulnerability.default_flood import DefaultFloodFunction
+
+TRANSFORM = Affine(0.01, 0.0, -158.2, 0.0, -0.01, 21.7)
+
+
+@pytest.fixture
+def buildings(tmp_path):
+    """FAST UDF inventory of 40 buildings, some with IDs left to the cross reference."""
+    rng = np.random.default_rng(5)
+    n = 40
+    occupancy = rng.choice(["RES1", "IND2", "RES3E", "COM1"], n)
+    damage_ids = {"RES1": (213, 29), "IND2": (559, 384), "RES3E": (204, 81), "COM1": (0, 0)}
+    df = pd.DataFrame(
+        {
+            "FltyId": np.arange(n),
+            "Occ": occupancy,
+            "Cost": rng.integers(100_000, 2_000_000, n),
+            "NumStories": 1,
+            "FoundationType": rng.choice([4, 7], n),
+            "FirstFloorHt": rng.choice([0, 1, 3], n),
+            "Area": rng.integers(1_000, 10_000, n),
+            "ContentCost": rng.integers(50_000, 1_000_000, n),
+            "BldgDamageFnID": [damage_ids[o][0] for o in occupancy],
+            "CDDF_ID": [damage_ids[o][1] for o in occupancy],
+            "Latitude": rng.uniform(21.21, 21.69, n),
+            "Longitude": rng.uniform(-158.19, -157.71, n),
+        }
+    )
+    path = tmp_path / "udf.csv"
+    df.to_csv(path, index=False)
+    return FastBuildings(str(path))
+
+
+def depth_grids():
+    rows, cols = np.mgrid[0:50, 0:50]
+    grids = [
+        ArrayFloodDepthGrid(scale * (rows + cols) / 8.0, TRANSFORM, "EPSG:4326")
+        for scale in (0.5, 1.0, 2.0)
+    ]
+    # Covers the northern half of the buildings only.
+    grids.append(
+        ArrayFloodDepthGrid(
+            np.full((25, 50), 4.0), TRANSFORM, "EPSG:4326", out_of_bounds="mask"
+        )
+    )
+    return grids
+
+
+def test_runner_matches_the_analysis_for_every_scenario(buildings):
+    grids = depth_grids()
+    runner = ScenarioRunner(buildings, batch_size=3)
+    fields = buildings.fields
+
+    matrices = {
+        output: runner.run(grids, output=output)
+        for output in ["building_loss", "content_loss", "debris_total", "total_loss"]
+    }
+
+    for column, grid in enumerate(grids):
+        results = HazusFloodAnalysis(
+            buildings, DefaultFloodFunction(buildings, flood_type="R"), grid
+        ).calculate_results()
+        np.testing.assert_allclose(matrices["building_loss"][:, column], results[fields.building_loss])
+        np.testing.assert_allclose(matrices["content_loss"][:, column], results[fields.content_loss])
+        np.testing.assert_allclose(matrices["debris_total"][:, column], results[fields.debris_total])
+        np.testing.assert_allclose(
+            matrices["total_loss"][:, column],
+            results[fields.building_loss] + np.nan_to_num(results[fields.content_loss]),
+        )
+    assert np.isnan(matrices["total_loss"][:, 3]).any()
+    # Pixel indices are computed once per grid layout: 50 x 50 and 25 x 50.
+    assert len(runner._pixels) == 2
+    assert "BldgDamageFnID" in buildings.frame and (buildings.frame["BldgDamageFnID"] == 0).any()
+
+
+def test_runner_reads_raster_paths(buildings, write_depth_raster):
+    rows, cols = np.mgrid[0:50, 0:50]
+    data = ((rows + cols) / 8.0).astype("float32")
+    path = write_depth_raster(data=data, transform=TRANSFORM)
+    runner = ScenarioRunner(buildings)
+
+    from_path = runner.run([str(path)])
+    in_memory = runner.run([ArrayFloodDepthGrid(data, TRANSFORM, "EPSG:4326")])
+
+    np.testing.assert_allclose(from_path, in_memory)
+
+
+def test_runner_writes_into_out(buildings):
+    grids = depth_grids()[:2]
+    runner = ScenarioRunner(buildings, batch_size=1)
+    out = np.zeros((len(runner), 2), dtype=np.float32)
+
+    assert runner.run(grids, out=out) is out
+    np.testing.assert_allclose(out, runner.run(grids), rtol=1e-6)
+    with pytest.raises(ValueError, match="shape"):
+        runner.run(grids, out=np.zeros((len(runner), 3)))
+    with pytest.raises(ValueError, match="output"):
+        runner.run(grids, output="restoration")
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from affine import Affine
+from fortis.engine.analyses.hazus_flood import HazusFloodAnalysis
+from fortis.engine.analyses.result_writers import CsvResultWriter
+from fortis.engine.analyses.streaming_hazus_flood import (
+    StreamingHazusFloodAnalysis,
+    estimate_chunk_size,
+)
+from fortis.engine.models.array_flood_depth_grid import ArrayFloodDepthGrid
+from fortis.engine.models.building_schema import COMPACT_SCHEMA
+from fortis.engine.models.fast_buildings import FastBuildings
+from fortis.engine.vulnerability.default_flood import DefaultFloodFunction
+
+
+@pytest.fixture
+def udf_csv(tmp_path):
+    """FAST UDF file with 30 buildings spread over the depth grid."""
+    rng = np.random.default_rng(3)
+    n = 30
+    occupancy = rng.choice(["RES1", "IND2", "RES3E"], n)
+    damage_ids = {"RES1": (213, 29), "IND2": (559, 384), "RES3E": (204, 81)}
+    df = pd.DataFrame(
+        {
+            "FltyId": np.arange(n),
+            "Occ": occupancy,
+            "Cost": rng.integers(100_000, 2_000_000, n),
+            "NumStories": 1,
+            "FoundationType": rng.choice([4, 7], n),
+            "FirstFloorHt": 1,
+            "Area": rng.integers(1_000, 10_000, n),
+            "ContentCost": rng.integers(50_000, 1_000_000, n),
+            "BldgDamageFnID": [damage_ids[o][0] for o in occupancy],
+            "CDDF_ID": [damage_ids[o][1] for o in occupancy],
+            "Latitude": rng.uniform(21.21, 21.69, n),
+            "Longitude": rng.uniform(-158.19, -157.71, n),
+        }
+    )
+    path = tmp_path / "udf.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def depth_grid():
+    rows, cols = np.mgrid[0:50, 0:50]
+    return ArrayFloodDepthGrid(
+        (rows + cols) / 8.0, Affine(0.01, 0.0, -158.2, 0.0, -0.01, 21.7), "EPSG:4326"
+    )
+
+
+def test_streaming_matches_in_memory_analysis(udf_csv, depth_grid, tmp_path):
+    buildings = FastBuildings(udf_csv)
+    HazusFloodAnalysis(
+        buildings, DefaultFloodFunction(buildings, flood_type="R"), depth_grid
+    ).calculate_losses()
+    expected_path = tmp_path / "expected.csv"
+    buildings.frame.to_csv(expected_path, index=False)
+
+    output = tmp_path / "streamed.csv"
+    streaming = StreamingHazusFloodAnalysis(
+        udf_csv,
+        DefaultFloodFunction(None, flood_type="R"),
+        depth_grid,
+        CsvResultWriter(str(output)),
+        chunk_size=7,
+        spatial_order="hilbert",
+    )
+
+    assert streaming.run() == 30
+    assert streaming.chunks_processed == 5
+    expected = pd.read_csv(expected_path)
+    pd.testing.assert_frame_equal(pd.read_csv(output)[expected.columns], expected)
+
+
+def test_estimate_chunk_size_scales_with_budget(udf_csv):
+    small = estimate_chunk_size(udf_csv, memory_budget=100_000)
+    large = estimate_chunk_size(udf_csv, memory_budget=10_000_000)
+
+    assert 1 <= small < large
+    assert large == pytest.approx(small * 100, rel=0.05)
+    assert estimate_chunk_size(udf_csv, memory_budget=1) == 1
+
+
+def test_csv_writer_rejects_mismatched_chunks(tmp_path):
+    writer = CsvResultWriter(str(tmp_path / "out.csv"))
+    writer.write(pd.DataFrame({"a": [1], "b": [2]}))
+    writer.write(pd.DataFrame({"b": [4], "a": [3]}))
+    with pytest.raises(ValueError, match=".*columns.*"):
+        writer.write(pd.DataFrame({"a": [5]}))
+    writer.close()
+
+    assert pd.read_csv(tmp_path / "out.csv").to_dict("list") == {"a": [1, 3], "b": [2, 4]}
+
+
+def test_compact_schema_keeps_dtypes_through_the_analysis(udf_csv, depth_grid):
+    reference = FastBuildings(udf_csv)
+    HazusFloodAnalysis(
+        reference, DefaultFloodFunction(reference, flood_type="R"), depth_grid
+    ).calculate_losses()
+
+    buildings = FastBuildings(udf_csv, schema=COMPACT_SCHEMA)
+    HazusFloodAnalysis(
+        buildings, DefaultFloodFunction(buildings, flood_type="R"), depth_grid
+    ).calculate_losses()
+
+    gdf, fields = buildings.gdf, buildings.fields
+    assert isinstance(gdf[fields.occupancy_type].dtype, pd.CategoricalDtype)
+    assert gdf[fields.foundation_type].dtype == np.int8
+    for column in (
+        fields.flood_depth,
+        fields.depth_in_structure,
+        fields.building_damage_percent,
+        fields.building_loss,
+        fields.content_loss,
+        fields.debris_total,
+        fields.restoration_minimum,
+    ):
+        assert gdf[column].dtype == np.float32, column
+        np.testing.assert_allclose(gdf[column], reference.gdf[column], rtol=1e-5)
+    assert "merge_key" not in gdf.columns
@@ -1,7 +1,21 @@
 import pytest
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import rasterio
+from rasterio.transform import from_origin
 from fortis.engine.models.abstract_building_points import AbstractBuildingPoints
+from fortis.engine.vulnerability.damage_data import clear_damage_data
+
+
+@pytest.fixture(autouse=True, scope="session")
+def damage_data_cache(tmp_path_factory):
+    """Compiles the damage data bundle into a temporary directory, not ~/.cache/fortis."""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("FORTIS_CACHE_DIR", str(tmp_path_factory.mktemp("fortis-cache")))
+        clear_damage_data()
+        yield
+        clear_damage_data()
 
 
 class DummyBuildingPoints(AbstractBuildingPoints):
@@ -43,6 +57,50 @@ class DummyBuildingPoints(AbstractBuildingPoints):
         return self._gdf
 
 
+@pytest.fixture
+def write_depth_raster(tmp_path):
+    """
+    Factory fixture writing a tiled GeoTIFF to a temporary directory.
+
+    The default grid is 64 x 64 cells of 1 unit at origin (0, 64) in EPSG:4326
+    with 16 x 16 blocks, where each cell holds `row * 100 + col`.
+    """
+
+    def _write(
+        name="depth.tif",
+        data=None,
+        transform=None,
+        nodata=-9999.0,
+        block_size=16,
+        crs="EPSG:4326",
+    ):
+        if data is None:
+            rows, cols = np.mgrid[0:64, 0:64]
+            data = (rows * 100 + cols).astype("float32")
+        if transform is None:
+            transform = from_origin(0, data.shape[0], 1, 1)
+        path = tmp_path / name
+        with rasterio.open(
+            path,
+            "w",
+            driver="GTiff",
+            height=data.shape[0],
+            width=data.shape[1],
+            count=1,
+            dtype=data.dtype,
+            crs=crs,
+            transform=transform,
+            nodata=nodata,
+            tiled=True,
+            blockxsize=block_size,
+            blockysize=block_size,
+        ) as dst:
+            dst.write(data, 1)
+        return str(path)
+
+    return _write
+
+
 @pytest.fixture
 def small_udf_buildings():
     data = [
@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+import geopandas as gpd
+from affine import Affine
+from shapely.geometry import Point, box
+from fortis.engine.models.array_flood_depth_grid import ArrayFloodDepthGrid
+from fortis.engine.models.flood_depth_grid import FloodDepthGrid
+
+
+def make_grid(**kwargs):
+    """64 x 64 grid with value row * 100 + col, origin (0, 64) and 1 unit cells."""
+    rows, cols = np.mgrid[0:64, 0:64]
+    array = (rows * 100 + cols).astype("float32")
+    array[5, 5] = -9999.0
+    return ArrayFloodDepthGrid(
+        array, Affine(1.0, 0.0, 0.0, 0.0, -1.0, 64.0), "EPSG:4326", nodata=-9999.0, **kwargs
+    )
+
+
+def test_get_depth():
+    grid = make_grid()
+    assert grid.get_depth(20.5, 40.5) == 2320.0
+    assert np.isnan(grid.get_depth(5.5, 58.5))
+    with pytest.raises(ValueError, match=".*outside.*"):
+        grid.get_depth(100, 0)
+
+
+def test_get_depth_vectorized_and_coverage():
+    points = gpd.GeoSeries(
+        [Point(0.5, 63.5), Point(100, 0.5), Point(20.5, 40.5), Point(5.5, 58.5)],
+        crs="EPSG:4326",
+    )
+
+    with pytest.raises(ValueError, match=".*outside.*"):
+        make_grid().get_depth_vectorized(points)
+    depths, covered = make_grid(out_of_bounds="mask", fill_value=-1.0).get_depth_with_coverage(
+        points
+    )
+
+    np.testing.assert_array_equal(covered, [True, False, True, True])
+    np.testing.assert_array_equal(depths, [0.0, -1.0, 2320.0, np.nan])
+
+
+def test_matches_file_backed_grid(write_depth_raster):
+    """The in-memory grid returns the same depths as the raster it was read from."""
+    path = write_depth_raster()
+    rng = np.random.default_rng(7)
+    points = gpd.GeoSeries(
+        gpd.points_from_xy(rng.uniform(0, 64, 200), rng.uniform(0, 64, 200)),
+        crs="EPSG:4326",
+    )
+    footprints = gpd.GeoSeries([box(10, 50, 13, 52), box(14, 30, 18, 34)], crs="EPSG:4326")
+
+    for interpolation in ("nearest", "bilinear"):
+        array_grid = ArrayFloodDepthGrid.from_file(path, interpolation=interpolation)
+        with FloodDepthGrid(path, sampling="block", interpolation=interpolation) as grid:
+            np.testing.assert_allclose(
+                array_grid.get_depth_vectorized(points), grid.get_depth_vectorized(points)
+            )
+            np.testing.assert_allclose(
+                array_grid.get_zonal_depth(footprints, "mean"),
+                grid.get_zonal_depth(footprints, "mean"),
+            )
+
+
+def test_invalid_array():
+    with pytest.raises(ValueError, match=".*2D.*"):
+        ArrayFloodDepthGrid(np.zeros(3), Affine.identity(), "EPSG:4326")
+
+
+def test_zonal_depth_of_overlapping_footprints():
+    """Overlapping and touching footprints are each reduced over all of their pixels."""
+    array = np.zeros((8, 8), dtype="float32")
+    array[2, 2] = 9.0
+    grid = ArrayFloodDepthGrid(array, Affine(1.0, 0.0, 0.0, 0.0, -1.0, 8.0), "EPSG:4326")
+    footprints = gpd.GeoSeries(
+        [box(1, 4, 4, 7), box(2, 3, 5, 6), box(0, 5, 3, 8), box(6, 0, 8, 2)],
+        crs="EPSG:4326",
+    )
+
+    np.testing.assert_array_equal(grid.get_zonal_depth(footprints, "max"), [9.0, 9.0, 9.0, 0.0])
+    np.testing.assert_array_equal(grid.get_zonal_depth(footprints[:1], "max"), [9.0])
+    np.testing.assert_allclose(grid.get_zonal_depth(footprints, "mean"), [1.0, 1.0, 1.0, 0.0])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from fortis.engine.models.block_cache import BlockCache
+
+
+def test_hits_and_misses():
+    cache = BlockCache(max_bytes=1024)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return np.zeros(8, dtype="float64")
+
+    cache.get("a", loader)
+    cache.get("a", loader)
+
+    assert len(calls) == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert cache.current_bytes == 64
+
+
+def test_lru_eviction_respects_budget():
+    cache = BlockCache(max_bytes=128)
+
+    def block():
+        return np.zeros(8, dtype="float64")  # 64 bytes
+
+    cache.get("a", block)
+    cache.get("b", block)
+    cache.get("a", block)  # "a" becomes most recently used
+    cache.get("c", block)  # evicts "b"
+
+    assert cache.evictions == 1
+    assert cache.current_bytes <= 128
+    cache.get("a", block)
+    assert cache.stats()["hits"] == 2
+    cache.get("b", block)
+    assert cache.stats()["misses"] == 4
+
+
+def test_zero_budget_disables_storage():
+    cache = BlockCache(max_bytes=0)
+    cache.get("a", lambda: np.zeros(4))
+    cache.get("a", lambda: np.zeros(4))
+
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+
+def test_negative_budget_rejected():
+    with pytest.raises(ValueError):
+        BlockCache(max_bytes=-1)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fortis.engine.models.building_mapping import BuildingMapping
+from fortis.engine.models.building_schema import COMPACT_SCHEMA, BuildingSchema
+
+
+def test_apply_compact_schema():
+    fields = BuildingMapping()
+    df = pd.DataFrame(
+        {
+            fields.occupancy_type: ["RES1", "COM1", "RES1"],
+            fields.foundation_type: [4, 7, None],
+            fields.number_stories: [1, 2, 3],
+            fields.building_cost: [1.5e5, 2.5e5, 3.5e5],
+            "Other": ["a", "b", "c"],
+        }
+    )
+
+    COMPACT_SCHEMA.apply(df, fields)
+
+    assert isinstance(df[fields.occupancy_type].dtype, pd.CategoricalDtype)
+    assert df[fields.foundation_type].dtype == pd.Int8Dtype()
+    assert df[fields.number_stories].dtype == np.int8
+    assert df[fields.building_cost].dtype == np.float32
+    assert df["Other"].dtype == object
+
+
+def test_schema_float_dtype():
+    assert BuildingSchema("float64").float_dtype == np.float64
+    with pytest.raises(ValueError, match=".*float_dtype.*"):
+        BuildingSchema("float16")
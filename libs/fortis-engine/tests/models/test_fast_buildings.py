@@ -0,0 +1,85 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from affine import Affine
+from fortis.engine.models import fast_buildings
+from fortis.engine.models.abstract_flood_depth_grid import building_depths_with_coverage
+from fortis.engine.models.array_flood_depth_grid import ArrayFloodDepthGrid
+from fortis.engine.models.building_schema import COMPACT_SCHEMA
+from fortis.engine.models.fast_buildings import FastBuildings
+
+
+@pytest.fixture
+def udf_csv(tmp_path):
+    df = pd.DataFrame(
+        {
+            "FltyId": [1, 2, 3],
+            "Occ": ["RES1", "COM1", "RES1"],
+            "Cost": [1.5e5, 2.5e5, 3.5e5],
+            "NumStories": [1, 2, 1],
+            "FoundationType": [4, 7, 7],
+            "Notes": ["a", "b", "c"],
+            "Latitude": [21.3, 21.4, 21.5],
+            "Longitude": [-157.8, -157.9, -158.0],
+        }
+    )
+    path = tmp_path / "udf.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_cache_serves_later_loads_without_parsing(udf_csv, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    first = FastBuildings(udf_csv, schema=COMPACT_SCHEMA, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the CSV should not be parsed on a cache hit")
+
+    monkeypatch.setattr(fast_buildings.pd, "read_csv", fail)
+    second = FastBuildings(udf_csv, schema=COMPACT_SCHEMA, cache_dir=cache_dir)
+
+    pd.testing.assert_frame_equal(second.gdf, first.gdf)
+    assert second.gdf.crs == "EPSG:4326"
+    assert isinstance(second.gdf["Occ"].dtype, pd.CategoricalDtype)
+    assert second.schema is COMPACT_SCHEMA
+
+
+def test_cache_key_changes_with_contents_and_options(udf_csv, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    FastBuildings(udf_csv, cache_dir=cache_dir)
+    FastBuildings(udf_csv, cache_dir=cache_dir, schema=COMPACT_SCHEMA)
+    FastBuildings(udf_csv, cache_dir=cache_dir, mapped_columns_only=True)
+    assert len(os.listdir(cache_dir)) == 3
+
+    with open(udf_csv, "a") as csv:
+        csv.write("4,RES2,1.0,1,7,d,21.6,-158.1\n")
+    assert len(FastBuildings(udf_csv, cache_dir=cache_dir).gdf) == 4
+    assert len(os.listdir(cache_dir)) == 4
+
+
+def test_mapped_columns_only(udf_csv):
+    buildings = FastBuildings(udf_csv, mapped_columns_only=True)
+
+    assert "Notes" not in buildings.gdf.columns
+    assert {"FltyId", "Occ", "Cost", "Latitude", "Longitude"} <= set(buildings.gdf.columns)
+
+
+def test_geometry_is_only_built_on_request(udf_csv):
+    buildings = FastBuildings(udf_csv, spatial_order="hilbert")
+    depth_grid = ArrayFloodDepthGrid(
+        np.full((10, 10), 2.0), Affine(0.1, 0.0, -158.5, 0.0, -0.1, 22.0), "EPSG:4326"
+    )
+    depths, covered = building_depths_with_coverage(depth_grid, buildings)
+
+    assert buildings._gdf is None
+    assert "geometry" not in buildings.frame.columns
+    np.testing.assert_array_equal(buildings.x, buildings.frame["Longitude"])
+    assert (depths == 2.0).all() and covered.all()
+
+    gdf = buildings.gdf
+    assert buildings.frame is gdf
+    np.testing.assert_array_equal(gdf.geometry.x, buildings.x)
+    assert gdf.crs == "EPSG:4326"
+    assert list(buildings.frame_in_original_order()["FltyId"]) == [1, 2, 3]
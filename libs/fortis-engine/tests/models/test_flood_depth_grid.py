@@ -1,7 +1,7 @@
 import pytest
 import numpy as np
 import geopandas as gpd
-from shapely.geometry import Point
+from shapely.geometry import Point, box
 import rasterio
 from unittest.mock import MagicMock
 from fortis.engine.models.flood_depth_grid import FloodDepthGrid
@@ -120,4 +120,254 @@ def test_get_depth_vectorized_invalid_input(mock_raster):
     """Test vectorized depth retrieval with invalid input."""
     with FloodDepthGrid("dummy.tif") as grid:
         with pytest.raises(TypeError, match=".*must be a GeoSeries.*"):
-            grid.get_depth_vectorized([Point(0, 0)])  # List instead of GeoSeries
\ No newline at end of file
+            grid.get_depth_vectorized([Point(0, 0)])  # List instead of GeoSeries
+
+
+def test_get_depth_vectorized_block_sampling(write_depth_raster):
+    """Block sampling gathers the same cells as point sampling."""
+    path = write_depth_raster()
+    points = gpd.GeoSeries([
+        Point(0.5, 63.5),   # row 0, col 0
+        Point(20.5, 40.5),  # row 23, col 20 (different block)
+        Point(63.9, 0.1),   # row 63, col 63
+        Point(17.2, 60.7),  # row 3, col 17
+    ], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, sampling="point") as grid:
+        expected = grid.get_depth_vectorized(points)
+    with FloodDepthGrid(path, sampling="block") as grid:
+        depths = grid.get_depth_vectorized(points)
+
+    np.testing.assert_array_equal(depths, np.array([0.0, 2320.0, 6363.0, 317.0]))
+    np.testing.assert_array_equal(depths, expected)
+
+
+def test_get_depth_vectorized_block_sampling_nodata(write_depth_raster):
+    """NoData cells come back as NaN in block sampling mode."""
+    data = np.ones((32, 32), dtype="float32")
+    data[0, 0] = -9999.0
+    path = write_depth_raster(data=data)
+    points = gpd.GeoSeries([Point(0.5, 31.5), Point(1.5, 31.5)], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, sampling="block") as grid:
+        depths = grid.get_depth_vectorized(points)
+
+    assert np.isnan(depths[0])
+    assert depths[1] == 1.0
+
+
+def test_get_depth_vectorized_block_sampling_out_of_bounds(write_depth_raster):
+    """Block sampling still rejects points outside the raster."""
+    path = write_depth_raster()
+    points = gpd.GeoSeries([Point(0.5, 0.5), Point(100, 0.5)], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, sampling="block") as grid:
+        with pytest.raises(ValueError, match=".*outside the raster bounds.*"):
+            grid.get_depth_vectorized(points)
+
+
+def test_invalid_sampling_mode(write_depth_raster):
+    """Unknown sampling modes are rejected."""
+    with pytest.raises(ValueError, match=".*sampling must be one of.*"):
+        FloodDepthGrid(write_depth_raster(), sampling="fast")
+
+
+def test_block_cache_serves_warm_reruns(write_depth_raster):
+    """Repeated block sampling hits the block cache instead of re-reading."""
+    path = write_depth_raster()
+    points = gpd.GeoSeries([Point(0.5, 63.5), Point(20.5, 40.5)], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, sampling="block") as grid:
+        first = grid.get_depth_vectorized(points)
+        second = grid.get_depth_vectorized(points)
+
+        assert grid.cache.misses == 2
+        assert grid.cache.hits == 2
+        np.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.parametrize("sampling", ["block", "point"])
+@pytest.mark.parametrize("preload", ["memory", "memmap"])
+def test_sampling_with_preload(write_depth_raster, tmp_path, preload, sampling):
+    """Preloaded bands return the same depths without touching the block cache."""
+    path = write_depth_raster()
+    points = gpd.GeoSeries([Point(20.5, 40.5), Point(63.9, 0.1)], crs="EPSG:4326")
+    memmap_path = str(tmp_path / "band.npy")
+
+    with FloodDepthGrid(
+        path, sampling=sampling, preload=preload, memmap_path=memmap_path
+    ) as grid:
+        grid.data.sample = None  # point sampling must not read through GDAL
+        depths = grid.get_depth_vectorized(points)
+        assert grid.get_depth(20.5, 40.5) == 2320.0
+        assert grid.cache.misses == 0
+
+    np.testing.assert_array_equal(depths, np.array([2320.0, 6363.0]))
+
+
+def test_cache_bytes_needs_block_reads(write_depth_raster):
+    path = write_depth_raster()
+    with pytest.raises(ValueError, match="cache_bytes"):
+        FloodDepthGrid(path, cache_bytes=1024)
+    with pytest.raises(ValueError, match="cache_bytes has no effect with preload"):
+        FloodDepthGrid(path, sampling="block", preload="memory", cache_bytes=1024)
+    with FloodDepthGrid(path, sampling="block", cache_bytes=1024) as grid:
+        assert grid.cache.max_bytes == 1024
+
+
+def test_get_depth_bilinear(write_depth_raster):
+    """Bilinear interpolation blends the four surrounding cell centres."""
+    data = np.array([[0, 10], [20, 30]], dtype="float32")
+    path = write_depth_raster(data=data)
+    points = gpd.GeoSeries([
+        Point(1.0, 1.0),    # midway between all four centres
+        Point(0.5, 1.5),    # upper-left centre
+        Point(1.0, 1.5),    # between upper-left and upper-right
+        Point(0.1, 1.9),    # beyond the first centre, clamped to the edge
+    ], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, interpolation="bilinear") as grid:
+        depths = grid.get_depth_vectorized(points)
+        single = grid.get_depth(1.0, 1.0)
+
+    np.testing.assert_array_almost_equal(depths, [15.0, 0.0, 5.0, 0.0])
+    assert single == pytest.approx(15.0)
+
+
+def test_get_depth_bilinear_reads_each_block_once(write_depth_raster):
+    """Neighbours that straddle blocks are gathered from a single pass of block reads."""
+    path = write_depth_raster()
+    points = gpd.GeoSeries([Point(16.0, 48.0), Point(15.9, 48.1)], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, sampling="block", interpolation="bilinear") as grid:
+        grid.get_depth_vectorized(points)
+        assert grid.cache.misses == 4
+        assert grid.cache.hits == 0
+
+
+@pytest.mark.parametrize(
+    "fallback, expected",
+    [
+        # Weights at (0.9, 0.9) are 0.24 (NoData), 0.16, 0.36 and 0.24.
+        ("nearest", 20.0),
+        ("ignore", (10 * 0.16 + 20 * 0.36 + 30 * 0.24) / 0.76),
+    ],
+)
+def test_get_depth_bilinear_nodata_fallback(write_depth_raster, fallback, expected):
+    """NoData neighbours either fall back to nearest or are dropped from the weights."""
+    data = np.array([[-9999, 10], [20, 30]], dtype="float32")
+    path = write_depth_raster(data=data)
+    points = gpd.GeoSeries([Point(0.9, 0.9)], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, interpolation="bilinear", nodata_fallback=fallback) as grid:
+        depths = grid.get_depth_vectorized(points)
+
+    assert depths[0] == pytest.approx(expected)
+
+
+def test_get_depth_with_coverage_mask_mode(write_depth_raster):
+    """Out-of-extent points get the fill value and are reported in the coverage mask."""
+    path = write_depth_raster()
+    points = gpd.GeoSeries(
+        [Point(0.5, 63.5), Point(100, 0.5), Point(20.5, 40.5), Point(-3, -3)],
+        crs="EPSG:4326",
+    )
+
+    for sampling in ("point", "block"):
+        with FloodDepthGrid(
+            path, sampling=sampling, out_of_bounds="mask", fill_value=-1.0
+        ) as grid:
+            depths, covered = grid.get_depth_with_coverage(points)
+            assert grid.get_depth(100, 0.5) == -1.0
+
+        np.testing.assert_array_equal(covered, [True, False, True, False])
+        np.testing.assert_array_equal(depths, [0.0, -1.0, 2320.0, -1.0])
+
+
+def test_parallel_block_sampling_matches_serial(write_depth_raster):
+    """Thread-parallel sampling reads through per-thread handles and merges in order."""
+    path = write_depth_raster()
+    rng = np.random.default_rng(42)
+    points = gpd.GeoSeries(
+        gpd.points_from_xy(rng.uniform(0, 64, 500), rng.uniform(0, 64, 500)),
+        crs="EPSG:4326",
+    )
+
+    with FloodDepthGrid(path, sampling="block") as grid:
+        expected = grid.get_depth_vectorized(points)
+    with FloodDepthGrid(path, sampling="block", workers=4) as grid:
+        depths = grid.get_depth_vectorized(points)
+        assert 0 < len(grid._thread_handles) <= 4
+        assert all(handle is not grid.data for handle in grid._thread_handles)
+        assert grid.cache.misses == 16
+
+    np.testing.assert_array_equal(depths, expected)
+    assert grid._thread_handles == []
+
+
+def test_workers_must_be_positive(write_depth_raster):
+    with pytest.raises(ValueError, match=".*workers.*"):
+        FloodDepthGrid(write_depth_raster(), workers=0)
+
+
+def test_skip_dry_blocks_without_reading(write_depth_raster):
+    """Points in dry blocks get the dry value and their blocks are never read."""
+    data = np.zeros((64, 64), dtype="float32")
+    data[40, 50] = 1.5  # block (2, 3)
+    path = write_depth_raster(data=data)
+    points = gpd.GeoSeries([Point(50.5, 23.5), Point(1.5, 62.5)], crs="EPSG:4326")
+
+    with FloodDepthGrid(path, sampling="block", skip_dry=True) as grid:
+        depths = grid.get_depth_vectorized(points)
+        assert grid.cache.misses == 1
+
+        dry_only = gpd.GeoSeries([Point(1.5, 62.5), Point(5.5, 60.5)], crs="EPSG:4326")
+        np.testing.assert_array_equal(grid.get_depth_vectorized(dry_only), [0.0, 0.0])
+        assert grid.cache.misses == 1
+
+    np.testing.assert_array_equal(depths, [1.5, 0.0])
+
+
+def test_skip_dry_needs_block_reads(write_depth_raster):
+    path = write_depth_raster()
+    with pytest.raises(ValueError, match="skip_dry"):
+        FloodDepthGrid(path, skip_dry=True)
+    with FloodDepthGrid(path, interpolation="bilinear", skip_dry=True) as grid:
+        assert grid.dry_value == 0.0
+
+
+@pytest.mark.parametrize(
+    "stat, expected",
+    [("max", [1312.0, 3317.0]), ("min", [1210.0, 3014.0]), ("mean", [1261.0, 3165.5])],
+)
+def test_get_zonal_depth(write_depth_raster, stat, expected):
+    """Footprints are reduced over the pixels whose centres they contain."""
+    path = write_depth_raster()
+    footprints = gpd.GeoSeries([box(10, 50, 13, 52), box(14, 30, 18, 34)], crs="EPSG:4326")
+
+    with FloodDepthGrid(path) as grid:
+        depths = grid.get_zonal_depth(footprints, stat)
+
+    np.testing.assert_allclose(depths, expected)
+
+
+def test_get_zonal_depth_slivers_and_coverage(write_depth_raster):
+    """Slivers fall back to a point inside them; outside footprints follow out_of_bounds."""
+    data = np.arange(64 * 64, dtype="float32").reshape(64, 64)
+    data[0:4, 0:4] = -9999.0
+    path = write_depth_raster(data=data)
+    footprints = gpd.GeoSeries(
+        [box(20.1, 40.1, 20.3, 40.3), box(100, 100, 101, 101), box(0, 61, 3, 64)],
+        crs="EPSG:4326",
+    )
+
+    with FloodDepthGrid(path, out_of_bounds="mask", fill_value=-1.0) as grid:
+        depths, covered = grid.get_zonal_depth_with_coverage(footprints)
+    with FloodDepthGrid(path) as grid:
+        with pytest.raises(ValueError, match=".*outside.*"):
+            grid.get_zonal_depth(footprints)
+        with pytest.raises(ValueError, match=".*stat.*"):
+            grid.get_zonal_depth(footprints[:1], "median")
+
+    np.testing.assert_array_equal(covered, [True, False, True])
+    np.testing.assert_array_equal(depths, [23 * 64 + 20, -1.0, np.nan])
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+import geopandas as gpd
+from shapely.geometry import Point
+from rasterio.transform import from_origin
+from fortis.engine.models.flood_depth_grid import FloodDepthGrid
+from fortis.engine.models import flood_depth_grid_stack
+from fortis.engine.models.flood_depth_grid_stack import FloodDepthGridStack
+
+
+@pytest.fixture
+def points():
+    return gpd.GeoSeries(
+        [Point(0.5, 63.5), Point(20.5, 40.5), Point(63.9, 0.1)], crs="EPSG:4326"
+    )
+
+
+def test_stack_shared_transform(write_depth_raster, points):
+    """Grids on the same transform return one column per grid."""
+    base = write_depth_raster("rp10.tif")
+    rows, cols = np.mgrid[0:64, 0:64]
+    doubled = write_depth_raster("rp100.tif", data=((rows * 100 + cols) * 2).astype("float32"))
+
+    with FloodDepthGridStack.from_files([base, doubled], names=["rp10", "rp100"]) as stack:
+        assert len(stack._shared_transform_groups()) == 1
+        depths = stack.get_depth_matrix(points)
+        np.testing.assert_array_equal(stack.get_depths(20.5, 40.5), [2320.0, 4640.0])
+
+    assert depths.shape == (3, 2)
+    np.testing.assert_array_equal(depths[:, 0], [0.0, 2320.0, 6363.0])
+    np.testing.assert_array_equal(depths[:, 1], [0.0, 4640.0, 12726.0])
+
+
+def test_stack_matches_individual_grids_on_different_transforms(write_depth_raster, points):
+    """Grids on different transforms fall back to their own pixel indices."""
+    base = write_depth_raster("a.tif")
+    data = np.arange(128 * 128, dtype="float32").reshape(128, 128)
+    finer = write_depth_raster("b.tif", data=data, transform=from_origin(0, 64, 0.5, 0.5))
+
+    with FloodDepthGridStack.from_files([base, finer]) as stack:
+        assert len(stack._shared_transform_groups()) == 2
+        depths = stack.get_depth_matrix(points)
+
+    for column, path in enumerate([base, finer]):
+        with FloodDepthGrid(path) as grid:
+            np.testing.assert_array_equal(depths[:, column], grid.get_depth_vectorized(points))
+
+
+def test_stack_projects_once_per_crs(write_depth_raster, points, monkeypatch):
+    """Grids sharing a CRS reuse one projection whatever their transform or interpolation."""
+    calls = []
+    projected_xy = flood_depth_grid_stack.projected_xy
+
+    def counting(geometry, crs):
+        calls.append(crs)
+        return projected_xy(geometry, crs)
+
+    monkeypatch.setattr(flood_depth_grid_stack, "projected_xy", counting)
+    base = write_depth_raster("a.tif")
+    data = np.arange(128 * 128, dtype="float32").reshape(128, 128)
+    finer = write_depth_raster("b.tif", data=data, transform=from_origin(0, 64, 0.5, 0.5))
+
+    with FloodDepthGridStack(
+        [
+            FloodDepthGrid(base, sampling="block"),
+            FloodDepthGrid(finer, sampling="block"),
+            FloodDepthGrid(finer, interpolation="bilinear"),
+        ]
+    ) as stack:
+        assert len(stack._shared_transform_groups()) == 2
+        stack.get_depth_matrix(points)
+
+    assert len(calls) == 1
+
+
+def test_stack_with_non_raster_grid(write_depth_raster, points):
+    """Depth grids that are not FloodDepthGrid use their own vectorized sampling."""
+
+    class ConstantGrid:
+        def get_depth_vectorized(self, geometry):
+            return np.full(len(geometry), 3.0)
+
+    with FloodDepthGridStack(
+        [FloodDepthGrid(write_depth_raster(), sampling="block"), ConstantGrid()]
+    ) as stack:
+        depths = stack.get_depth_matrix(points)
+
+    np.testing.assert_array_equal(depths[:, 1], [3.0, 3.0, 3.0])
+
+
+def test_stack_keeps_bilinear_interpolation(write_depth_raster):
+    """Bilinear members are interpolated, not read from the pixel containing the point."""
+    path = write_depth_raster()
+    off_centre = gpd.GeoSeries([Point(20.2, 40.9), Point(5.7, 10.3)], crs="EPSG:4326")
+
+    with FloodDepthGridStack(
+        [
+            FloodDepthGrid(path, sampling="block"),
+            FloodDepthGrid(path, sampling="block", interpolation="bilinear"),
+        ]
+    ) as stack:
+        assert len(stack._shared_transform_groups()) == 1
+        depths = stack.get_depth_matrix(off_centre)
+
+    with FloodDepthGrid(path, interpolation="bilinear") as grid:
+        expected = grid.get_depth_vectorized(off_centre)
+    np.testing.assert_allclose(depths[:, 1], expected)
+    assert not np.allclose(depths[:, 0], expected)
+
+
+def test_stack_requires_grids():
+    with pytest.raises(ValueError):
+        FloodDepthGridStack([])
+
+
+def test_stack_masks_points_outside_grids(write_depth_raster):
+    """Grids in mask mode report per-grid coverage instead of raising."""
+    points = gpd.GeoSeries([Point(0.5, 63.5), Point(100, 0.5)], crs="EPSG:4326")
+
+    with FloodDepthGridStack.from_files(
+        [write_depth_raster("a.tif"), write_depth_raster("b.tif")], out_of_bounds="mask"
+    ) as stack:
+        depths, covered = stack.get_depth_matrix_with_coverage(points)
+
+    np.testing.assert_array_equal(covered, [[True, True], [False, False]])
+    assert np.isnan(depths[1]).all()
+    np.testing.assert_array_equal(depths[0], [0.0, 0.0])
+
+
+def test_stack_snaps_only_points_on_the_edge(write_depth_raster):
+    """Points on the bottom/right edge are sampled; points just beyond it are not."""
+    points = gpd.GeoSeries(
+        [Point(64.0, 0.0), Point(64.5, 10.5), Point(10.5, -0.5)], crs="EPSG:4326"
+    )
+
+    with FloodDepthGridStack.from_files([write_depth_raster()], out_of_bounds="mask") as stack:
+        depths, covered = stack.get_depth_matrix_with_coverage(points)
+
+    np.testing.assert_array_equal(covered[:, 0], [True, False, False])
+    assert depths[0, 0] == 6363.0
@@ -0,0 +1,32 @@
+import os
+import numpy as np
+import pandas as pd
+from fortis.engine.models.inventory_cache import InventoryCache
+
+
+def test_columns_round_trip_without_pickle(tmp_path):
+    df = pd.DataFrame(
+        {
+            "Occ": pd.Categorical(["RES1", "COM1", None, "RES1"]),
+            "FoundationType": pd.array([7, None, 4, 2], dtype="Int8"),
+            "Notes": ["a", np.nan, "c", "d"],
+            "Name": pd.array(["x", "y", None, "z"], dtype="string"),
+            "Cost": [1.5, 2.5, np.nan, 4.0],
+            "NumStories": np.array([1, 2, 3, 1], dtype=np.int8),
+        },
+        index=pd.Index([10, 11, 12, 13], name="FltyId"),
+    )
+    x, y = np.arange(4.0), np.arange(4.0) + 10
+    cache = InventoryCache(str(tmp_path))
+    cache.store("key", df, x, y, "EPSG:4326")
+    assert os.listdir(tmp_path) == ["key"]
+
+    loaded, loaded_x, loaded_y, crs = cache.load("key")
+    pd.testing.assert_frame_equal(loaded, df)
+    np.testing.assert_array_equal(loaded_x, x)
+    np.testing.assert_array_equal(loaded_y, y)
+    assert "WGS 84" in crs
+    for name in os.listdir(tmp_path / "key"):
+        if name.endswith(".npy"):
+            np.load(tmp_path / "key" / name, allow_pickle=False)
+    assert cache.load("missing") is None
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+import geopandas as gpd
+from shapely.geometry import Point
+from rasterio.transform import from_origin
+from fortis.engine.models.mosaic_flood_depth_grid import MosaicFloodDepthGrid
+
+
+@pytest.fixture
+def tiles(write_depth_raster):
+    """Two 32 x 32 tiles overlapping on x in [24, 32]: the left holds 1.0, the right 2.0."""
+    left = write_depth_raster(
+        "tile_a.tif", data=np.full((32, 32), 1.0, dtype="float32"),
+        transform=from_origin(0, 32, 1, 1),
+    )
+    right_data = np.full((32, 32), 2.0, dtype="float32")
+    right_data[0, 0] = -9999.0  # NoData at x in [24, 25), y in [31, 32)
+    right = write_depth_raster(
+        "tile_b.tif", data=right_data, transform=from_origin(24, 32, 1, 1),
+    )
+    return [left, right]
+
+
+@pytest.fixture
+def points():
+    return gpd.GeoSeries(
+        [Point(5, 5), Point(50, 5), Point(28, 5), Point(24.5, 31.5)], crs="EPSG:4326"
+    )
+
+
+@pytest.mark.parametrize(
+    "precedence, expected",
+    [
+        ("first", [1.0, 2.0, 1.0, 1.0]),
+        ("last", [1.0, 2.0, 2.0, 1.0]),  # NoData in the last tile falls through
+        ("max", [1.0, 2.0, 2.0, 1.0]),
+        ("min", [1.0, 2.0, 1.0, 1.0]),
+    ],
+)
+def test_mosaic_overlap_precedence(tiles, points, precedence, expected):
+    with MosaicFloodDepthGrid(tiles, precedence=precedence) as mosaic:
+        depths = mosaic.get_depth_vectorized(points)
+
+    np.testing.assert_array_equal(depths, expected)
+
+
+def test_mosaic_coverage_and_bounded_handles(tiles):
+    points = gpd.GeoSeries([Point(5, 5), Point(100, 5), Point(50, 5)], crs="EPSG:4326")
+
+    with MosaicFloodDepthGrid(tiles, max_open=1, out_of_bounds="mask") as mosaic:
+        assert mosaic.opens == 0  # tiles are opened lazily
+        depths, covered = mosaic.get_depth_with_coverage(points)
+        assert len(mosaic.open_tiles()) == 1
+        assert mosaic.opens == 2
+        assert mosaic.get_depth(50, 5) == 2.0
+
+    np.testing.assert_array_equal(covered, [True, False, True])
+    assert np.isnan(depths[1])
+
+
+def test_mosaic_raises_outside_every_tile(tiles):
+    points = gpd.GeoSeries([Point(100, 5)], crs="EPSG:4326")
+
+    with MosaicFloodDepthGrid(tiles) as mosaic:
+        with pytest.raises(ValueError, match=".*outside the raster bounds.*"):
+            mosaic.get_depth_vectorized(points)
+
+
+def test_mosaic_rejects_mixed_crs(write_depth_raster):
+    a = write_depth_raster("a.tif")
+    b = write_depth_raster("b.tif", crs="EPSG:3857")
+    with pytest.raises(ValueError, match=".*CRS.*"):
+        MosaicFloodDepthGrid([a, b])
@@ -1,6 +1,11 @@
+import os
+import tempfile
+import zipfile
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point
+import pytest
+from shapely.geometry import Point, box
+from fortis.engine.models.flood_depth_grid import FloodDepthGrid
 from fortis.engine.models.nsi_points import NSIPoints
 
 
@@ -33,3 +38,52 @@ def test_gdf_property(monkeypatch):
     assert "geometry" in gdf.columns
     assert gdf.crs == "EPSG:4326"
     assert len(gdf) == 2
+
+
+@pytest.fixture
+def nsi_zip(tmp_path):
+    """Zip archive holding a small NSI-like gpkg."""
+    gdf = gpd.GeoDataFrame(
+        {
+            "OccupancyType": ["RES1", "COM1", "RES1", "IND2"],
+            "NumStories": [1, 2, 1, 3],
+            "val_struct": [1.0, 2.0, 3.0, 4.0],
+            "notes": ["a", "b", "c", "d"],
+        },
+        geometry=[Point(1, 1), Point(10, 10), Point(20, 50), Point(70, 70)],
+        crs="EPSG:4326",
+    )
+    gpkg_path = tmp_path / "nsi.gpkg"
+    gdf.to_file(gpkg_path, driver="GPKG")
+    zip_path = tmp_path / "nsi.zip"
+    with zipfile.ZipFile(zip_path, "w") as z:
+        z.write(gpkg_path, "nested/nsi.gpkg")
+    return str(zip_path)
+
+
+def test_reads_gpkg_in_place_with_pushdown(nsi_zip, write_depth_raster, monkeypatch):
+    """The gpkg is read through /vsizip/ with the mapped columns and the grid extent."""
+
+    def fail(*args, **kwargs):
+        raise AssertionError("nothing should be extracted")
+
+    monkeypatch.setattr(tempfile, "mkdtemp", fail)
+    with FloodDepthGrid(write_depth_raster()) as grid:
+        points = NSIPoints(nsi_zip, mapped_columns_only=True, bbox=grid.extent())
+
+    assert list(points.gdf["OccupancyType"]) == ["RES1", "COM1", "RES1"]
+    assert "notes" not in points.gdf.columns
+    assert "val_struct" not in points.gdf.columns
+    assert points.gdf.crs == "EPSG:4326"
+
+
+def test_mask_and_cache_key(nsi_zip, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    near = NSIPoints(nsi_zip, mask=box(0, 0, 15, 15), cache_dir=cache_dir)
+    far = NSIPoints(nsi_zip, mask=box(60, 60, 80, 80), cache_dir=cache_dir)
+
+    assert len(near.gdf) == 2
+    assert list(far.gdf["notes"]) == ["d"]
+    assert len(os.listdir(cache_dir)) == 2
+    with pytest.raises(ValueError, match=".*bbox.*"):
+        NSIPoints(nsi_zip, bbox=(0, 0, 1, 1), mask=box(0, 0, 1, 1))
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Point
+from fortis.engine.models import reprojection
+from fortis.engine.models.fast_buildings import FastBuildings
+from fortis.engine.models.reprojection import (
+    get_transformer,
+    project_coordinates,
+    projected_xy,
+    read_only_copy,
+)
+
+
+def test_projected_xy_matches_to_crs():
+    points = gpd.GeoSeries([Point(-157.8, 21.3), Point(-158.1, 21.6)], crs="EPSG:4326")
+
+    x, y = projected_xy(points, "EPSG:3857")
+    expected = points.to_crs("EPSG:3857")
+
+    np.testing.assert_allclose(x, expected.x.to_numpy())
+    np.testing.assert_allclose(y, expected.y.to_numpy())
+
+
+def test_projected_xy_follows_geometry_changes():
+    points = gpd.GeoSeries([Point(-157.8, 21.3)], crs="EPSG:4326")
+
+    first = projected_xy(points, "EPSG:3857")
+    points.iloc[0] = Point(-158.1, 21.6)
+    second = projected_xy(points, "EPSG:3857")
+
+    assert projected_xy(points, "EPSG:4326")[0][0] == -158.1
+    np.testing.assert_allclose(second, projected_xy(points.copy(), "EPSG:3857"))
+    assert first[0][0] != second[0][0]
+
+
+def test_project_coordinates_matches_projected_xy():
+    x = np.array([-157.8, -158.1])
+    y = np.array([21.3, 21.6])
+    points = gpd.GeoSeries(gpd.points_from_xy(x, y), crs="EPSG:4326")
+
+    projected = project_coordinates(x, y, "EPSG:4326", "EPSG:3857")
+
+    np.testing.assert_allclose(projected, projected_xy(points, "EPSG:3857"))
+    assert project_coordinates(x, y, "EPSG:4326", "EPSG:4326")[0] is x
+
+
+def test_project_coordinates_memoizes_read_only_arrays_only():
+    x = read_only_copy([-157.8, -158.1])
+    y = read_only_copy([21.3, 21.6])
+
+    first = project_coordinates(x, y, "EPSG:4326", "EPSG:3857")
+    assert project_coordinates(x, y, "EPSG:4326", "EPSG:3857")[0] is first[0]
+    assert not first[0].flags.writeable
+
+    # Another y array or source CRS is another entry.
+    other_y = read_only_copy([21.0, 21.1])
+    np.testing.assert_allclose(
+        project_coordinates(x, other_y, "EPSG:4326", "EPSG:3857")[1],
+        project_coordinates(np.array(x), np.array(other_y), "EPSG:4326", "EPSG:3857")[1],
+    )
+    assert project_coordinates(x, y, "EPSG:4269", "EPSG:3857")[0] is not first[0]
+
+    # Writeable arrays can change in place, so they are never memoized.
+    writeable = np.array(x)
+    before = project_coordinates(writeable, y, "EPSG:4326", "EPSG:3857")
+    writeable[0] = -150.0
+    after = project_coordinates(writeable, y, "EPSG:4326", "EPSG:3857")
+    assert after[0][0] != before[0][0]
+
+
+def test_cache_entry_dropped_with_coordinates():
+    x = read_only_copy([0.0])
+    y = read_only_copy([0.0])
+    project_coordinates(x, y, "EPSG:4326", "EPSG:3857")
+    key = next(key for key in reprojection._COORDINATE_CACHE if key[:2] == (id(x), id(y)))
+
+    del x
+    assert key not in reprojection._COORDINATE_CACHE
+
+
+def test_building_coordinates_ignore_frame_edits():
+    df = pd.DataFrame({"Longitude": [-157.8, -158.1], "Latitude": [21.3, 21.6]})
+    buildings = FastBuildings.from_dataframe(df)
+    x = buildings.x
+
+    buildings.frame["Longitude"] = [0.0, 0.0]
+
+    assert not x.flags.writeable
+    np.testing.assert_array_equal(buildings.x, [-157.8, -158.1])
+
+
+def test_transformer_is_shared_per_crs_pair():
+    assert get_transformer("EPSG:4326", "EPSG:3857") is get_transformer(
+        "EPSG:4326", "EPSG:3857"
+    )
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from fortis.engine.models.spatial_ordering import (
+    hilbert_codes,
+    morton_codes,
+    spatial_order,
+)
+
+
+def _grid_points(size):
+    y, x = np.mgrid[0:size, 0:size]
+    return x.ravel().astype(float), y.ravel().astype(float)
+
+
+def test_hilbert_order_visits_adjacent_cells():
+    """Consecutive points along the Hilbert curve are always neighbouring cells."""
+    x, y = _grid_points(8)
+    order = np.argsort(hilbert_codes(x, y, bits=3))
+    steps = np.abs(np.diff(x[order])) + np.abs(np.diff(y[order]))
+    assert (steps == 1).all()
+    assert len(np.unique(hilbert_codes(x, y, bits=3))) == 64
+
+
+def test_morton_codes_interleave_bits():
+    x = np.array([0.0, 1.0, 0.0, 1.0, 3.0])
+    y = np.array([0.0, 0.0, 1.0, 1.0, 3.0])
+    np.testing.assert_array_equal(morton_codes(x, y, bits=2), [0, 1, 2, 3, 15])
+
+
+def test_spatial_order_puts_missing_coordinates_last():
+    x = np.array([np.nan, 0.0, 10.0, 0.5])
+    y = np.array([np.nan, 0.0, 10.0, 0.5])
+    order = spatial_order(x, y, "morton")
+    assert order[-1] == 0
+
+
+def test_spatial_order_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        spatial_order(np.zeros(2), np.zeros(2), "peano")
+
+
+def test_spatial_sort_and_restore(small_udf_buildings):
+    """Sorting keeps a permutation that puts per-building results back in input order."""
+    fields = small_udf_buildings.fields
+    ids_before = small_udf_buildings.gdf[fields.id].to_numpy()
+
+    small_udf_buildings.spatial_sort("hilbert")
+    ids_sorted = small_udf_buildings.gdf[fields.id].to_numpy()
+
+    assert sorted(ids_sorted) == sorted(ids_before)
+    np.testing.assert_array_equal(ids_before[small_udf_buildings.original_order], ids_sorted)
+    np.testing.assert_array_equal(small_udf_buildings.restore_order(ids_sorted), ids_before)
+    np.testing.assert_array_equal(
+        small_udf_buildings.gdf_in_original_order()[fields.id].to_numpy(), ids_before
+    )
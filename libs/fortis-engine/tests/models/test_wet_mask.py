@@ -0,0 +1,56 @@
+import os
+import numpy as np
+import rasterio
+from fortis.engine.models.wet_mask import WetMask
+
+
+def _mostly_dry(size=64, block=16):
+    data = np.full((size, size), -9999.0, dtype="float32")
+    data[0:4, 0:4] = 0.0       # zero depth is dry
+    data[40, 50] = 1.5         # one wet cell in block (2, 3)
+    return data
+
+
+def test_build_marks_wet_blocks_and_pyramid(write_depth_raster):
+    path = write_depth_raster(data=_mostly_dry())
+    with rasterio.open(path) as dataset:
+        mask = WetMask.build(dataset)
+
+    assert mask.levels[0].shape == (4, 4)
+    assert mask.levels[0].sum() == 1
+    assert mask.levels[0][2, 3]
+    assert mask.levels[-1].shape == (1, 1) and mask.levels[-1][0, 0]
+    assert not mask.any_wet(0, 1, 0, 1)
+    assert mask.any_wet(0, 3, 0, 3)
+    assert not mask.any_wet(0, 3, 0, 2)
+    np.testing.assert_array_equal(
+        mask.wet_blocks(np.array([2, 0]), np.array([3, 0])), [True, False]
+    )
+
+
+def test_load_or_build_persists_next_to_raster(write_depth_raster):
+    path = write_depth_raster(data=_mostly_dry())
+    with rasterio.open(path) as dataset:
+        built = WetMask.load_or_build(dataset)
+        assert os.path.exists(f"{path}.wetmask.npz")
+        loaded = WetMask.load_or_build(dataset)
+
+    assert len(loaded.levels) == len(built.levels)
+    for a, b in zip(loaded.levels, built.levels):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_load_or_build_rebuilds_for_another_block_grid(write_depth_raster, tmp_path):
+    """A saved mask is only reused for a raster with the same block grid."""
+    mask_path = str(tmp_path / "shared.wetmask.npz")
+    coarse = write_depth_raster("coarse.tif", data=_mostly_dry(), block_size=32)
+    fine = write_depth_raster("fine.tif", data=_mostly_dry(), block_size=16)
+    with rasterio.open(coarse) as dataset:
+        assert WetMask.load_or_build(dataset, mask_path).levels[0].shape == (2, 2)
+    os.utime(mask_path, (os.path.getmtime(fine) + 10,) * 2)
+
+    with rasterio.open(fine) as dataset:
+        mask = WetMask.load_or_build(dataset, mask_path)
+        assert mask.levels[0].shape == (4, 4)
+        assert mask.levels[0][2, 3]
+        assert WetMask.load_or_build(dataset, mask_path).levels[0].shape == (4, 4)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fortis.engine.vulnerability.damage_curves import DamageCurves, column_depth
+
+
+@pytest.fixture
+def curves():
+    table = pd.DataFrame(
+        {
+            "Source": ["A", "B"],
+            "ft00": [0, 10],
+            "ft01m": [0, 5],
+            "ft02": [40, 30],
+            "ft01": [20, 20],
+        },
+        index=pd.Index([7, 3], name="BldgDmgFnID"),
+    )
+    return DamageCurves.from_table(table)
+
+
+def test_column_depth():
+    assert column_depth("ft04m") == -4
+    assert column_depth("ft12") == 12
+    assert column_depth("Source") is None
+
+
+def test_from_table_sorts_ids_and_depths(curves):
+    np.testing.assert_array_equal(curves.ids, [3, 7])
+    np.testing.assert_array_equal(curves.depths, [-1, 0, 1, 2])
+    np.testing.assert_array_equal(curves.values, [[5, 10, 20, 30], [0, 0, 20, 40]])
+
+
+def test_interpolate_gathers_every_building_at_once(curves):
+    ids = np.array([7, 3, 3.0, 5, np.nan, 7, 7])
+    depths = np.array([1.5, -0.5, 1.0, 1.0, 1.0, 3.0, np.nan])
+
+    result = curves.interpolate(ids, depths)
+
+    # Unknown and missing IDs or depths are NaN; depths past the last breakpoint
+    # are extrapolated from the last segment.
+    np.testing.assert_array_equal(result, [30, 7.5, 20, np.nan, np.nan, 60, np.nan])
+
+
+def test_duplicate_ids_are_rejected():
+    table = pd.DataFrame({"ft00": [0, 1], "ft01": [1, 2]}, index=[1, 1])
+    with pytest.raises(ValueError, match="unique"):
+        DamageCurves.from_table(table)
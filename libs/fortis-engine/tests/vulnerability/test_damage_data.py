@@ -0,0 +1,71 @@
+import os
+import numpy as np
+import pandas as pd
+import importlib.resources as pkg_resources
+from fortis.engine.vulnerability import damage_data
+from fortis.engine.vulnerability.damage_data import DamageData, get_damage_data
+from fortis.engine.vulnerability.default_flood import DefaultFloodFunction
+
+
+def test_bundle_is_compiled_once_and_memory_mapped(tmp_path, monkeypatch):
+    damage_data.clear_damage_data()
+    data = get_damage_data(str(tmp_path))
+    assert get_damage_data(str(tmp_path)) is data
+    (bundle,) = os.listdir(tmp_path)
+    assert os.path.isfile(tmp_path / bundle / "manifest.json")
+    assert isinstance(data.curves("flBldgDmgFn").values, np.memmap)
+
+    # A new process loads the bundle without parsing the CSVs.
+    damage_data.clear_damage_data()
+
+    def fail():
+        raise AssertionError("the CSVs should not be parsed once compiled")
+
+    monkeypatch.setattr(DamageData, "from_csv", staticmethod(fail))
+    reloaded = get_damage_data(str(tmp_path))
+    assert reloaded is not data
+    damage_data.clear_damage_data()
+
+
+def test_compiling_removes_stale_bundles(tmp_path):
+    stale = tmp_path / "damage-data-0000000000000000"
+    stale.mkdir()
+    (stale / "manifest.json").write_text("{}")
+    (tmp_path / "other").mkdir()
+
+    damage_data.clear_damage_data()
+    get_damage_data(str(tmp_path))
+    damage_data.clear_damage_data()
+
+    assert not stale.exists()
+    assert sorted(os.listdir(tmp_path)) == [f"damage-data-{damage_data.source_digest()}", "other"]
+
+
+def test_tables_match_the_shipped_csvs(tmp_path):
+    data = DamageData.from_directory(_compiled(tmp_path))
+    with pkg_resources.files("fortis.data").joinpath("flDmgXRef.csv").open(
+        "r", encoding="utf-8-sig"
+    ) as xref_file:
+        expected = pd.read_csv(xref_file).set_index(damage_data.TABLES["flDmgXRef"])
+
+    pd.testing.assert_frame_equal(
+        data.table("flDmgXRef").drop(columns="Description"),
+        expected.drop(columns="Description"),
+    )
+    assert data.table("flDmgXRef") is data.table("flDmgXRef")
+
+
+def test_flood_functions_share_the_compiled_tables(tmp_path):
+    data = DamageData.from_directory(_compiled(tmp_path))
+    first = DefaultFloodFunction(None, "R", damage_data=data)
+    second = DefaultFloodFunction(None, "R", damage_data=data)
+
+    assert first.bdf_curves is second.bdf_curves
+    assert first.xref is second.xref
+    assert DefaultFloodFunction(None, "CV", damage_data=data).xref is not first.xref
+
+
+def _compiled(tmp_path) -> str:
+    path = str(tmp_path / "bundle")
+    DamageData.from_csv().write(path)
+    return path
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from fortis.engine.vulnerability.damage_xref import DamageXref, normalize_occupancy
+
+
+def xref_table():
+    return pd.DataFrame(
+        {
+            "BldgDmgFnId": [1, 2, 3, 4, 5],
+            "ContDmgFnId": [11, 12, np.nan, 14, 15],
+            "Occupancy": ["RES1", "RES1", "RES1", "RES3", "RES1"],
+            "HazardR": [1, 1, 1, 1, 0],
+            "HazardCV": [0, 0, 0, 1, 1],
+            "HazardCA": [0, 0, 0, 1, 1],
+            "Basement": [0, 0, 1, 0, 0],
+            "StoriesMin": [1, 1, 1, 1, 1],
+            "StoriesMax": [1, 3, 3, 1000, 1000],
+        }
+    )
+
+
+def test_normalize_occupancy():
+    assert normalize_occupancy("RES3E") == "RES3"
+    assert normalize_occupancy("RES3") == "RES3"
+    assert normalize_occupancy("RES1") == "RES1"
+
+
+def test_resolve_takes_the_first_matching_row():
+    xref = DamageXref(xref_table(), "R")
+    occupancy = np.array(["RES1", "RES1", "RES1", "RES3B", "COM1", None, "RES1"], dtype=object)
+    basement = np.array([0, 0, 1, 0, 0, 0, 0])
+    stories = np.array([1, 2, 2, 7, 1, 1, 9])
+
+    rows = xref.resolve_rows(occupancy, basement, stories)
+
+    np.testing.assert_array_equal(rows, [0, 1, 2, 3, -1, -1, -1])
+    np.testing.assert_array_equal(xref.damage_ids(rows, "BldgDmgFnId"), [1, 2, 3, 4, 0, 0, 0])
+    np.testing.assert_array_equal(xref.damage_ids(rows, "ContDmgFnId"), [11, 12, 0, 14, 0, 0, 0])
+
+
+def test_resolve_filters_by_hazard():
+    xref = DamageXref(xref_table(), "CV")
+    ids = xref.resolve(np.array(["RES1"], dtype=object), np.array([0]), np.array([1]), "BldgDmgFnId")
+
+    np.testing.assert_array_equal(ids, [5])
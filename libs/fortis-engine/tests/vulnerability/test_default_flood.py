@@ -39,3 +39,22 @@ def test_apply_damage_percentages(default_flood_function, small_udf_buildings):
         .equals(round(small_udf_buildings.gdf["InventoryDamagePct"].astype(float), 6))
     ), "Inventory Damage Pct is not as expected"
     """
+
+
+def test_assign_damage_ids_fills_only_missing_ids(default_flood_function, small_udf_buildings):
+    fields = small_udf_buildings.fields
+    gdf = small_udf_buildings.gdf
+    original = gdf[fields.bddf_id].copy()
+    gdf.loc[gdf.index[:3], fields.bddf_id] = float("nan")
+
+    default_flood_function.assign_damage_ids()
+
+    for label in gdf.index[:3]:
+        row = gdf.loc[label]
+        assert gdf.at[label, fields.bddf_id] == default_flood_function.get_damage_id_from_xref(
+            row[fields.occupancy_type],
+            1 if row[fields.foundation_type] == 4 else 0,
+            row[fields.number_stories],
+            "BldgDmgFnId",
+        )
+    assert (gdf[fields.bddf_id][3:] == original[3:]).all()